@@ -16,6 +16,7 @@ import os
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright
 from pymidscene import PlaywrightAgent
+from pymidscene.web_integration.playwright import get_persistent_page
 
 # 加载 .env 文件中的环境变量
 load_dotenv()
@@ -32,41 +33,54 @@ async def main():
         return
 
     async with async_playwright() as p:
-        # 启动浏览器
-        browser = await p.chromium.launch(headless=False, channel='chrome')
-        page = await browser.new_page()
+        # 复用持久化浏览器上下文（登录态 / 缓存跨运行保留）；Chromium 独占用户数据目录，
+        # 每个示例用自己的目录。要跳过浏览器启动，可传 cdp_url 连接已运行的 Chrome
+        page, owns_context = await get_persistent_page(
+            p, user_data_dir="~/.pymidscene/profile-basic", channel='chrome'
+        )
 
         # 创建 Agent
         agent = PlaywrightAgent(page, cache_id="basic_demo")
 
         # 访问百度
         await page.goto("https://www.baidu.com")
-        await asyncio.sleep(1)
-
-        # 使用自然语言进行自动化操作
-        await agent.ai_click("搜索输入框")
-        await agent.ai_input("搜索框", "PyMidscene AI 自动化")
-        await agent.ai_click("百度一下按钮")
-        
-        await asyncio.sleep(2)
-
-        # 提取数据
-        result = await agent.ai_query({
-            "title": "页面标题",
-            "has_results": "是否显示搜索结果，布尔值"
-        })
+        await page.wait_for_load_state("networkidle", timeout=5000)
+
+        # 使用自然语言进行自动化操作（多个动作合并为一次 AI 规划调用）
+        await agent.ai_batch([
+            {"click": "搜索输入框"},
+            {"input": ("搜索框", "PyMidscene AI 自动化")},
+            {"click": "百度一下按钮"},
+        ])
+
+        # 事件驱动等待：搜索结果渲染完成即继续，而不是固定 sleep
+        await page.wait_for_load_state("networkidle", timeout=5000)
+        await page.wait_for_selector("#content_left", state="visible", timeout=5000)
+
+        # 提取数据 + 断言验证（同一张截图，一次 AI 调用）
+        result = await agent.ai_query_assert(
+            {
+                "title": "页面标题",
+                "has_results": "是否显示搜索结果，布尔值"
+            },
+            "页面显示了搜索结果",
+        )
         print(f"查询结果: {result.get('data')}")
-
-        # 断言验证
-        await agent.ai_assert("页面显示了搜索结果")
         print("✅ 断言通过")
 
-        # 生成报告
-        report_path = agent.finish()
+        # 生成报告（后台渲染，与关闭浏览器重叠）
+        agent.finish(background=True)
+        if owns_context:
+            await page.context.close()
+        report_path = await agent.await_report()
         print(f"📄 报告已生成: {report_path}")
 
-        await browser.close()
-
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # 可选: 装了 uvloop(pip install "pymidscene[speedups]")就跑在 libuv 事件循环上
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
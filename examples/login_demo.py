@@ -13,6 +13,7 @@ from pathlib import Path
 from dotenv import load_dotenv
 from playwright.async_api import async_playwright
 from pymidscene import PlaywrightAgent
+from pymidscene.web_integration.playwright import get_persistent_page
 
 # 加载 .env 文件
 load_dotenv()
@@ -31,33 +32,47 @@ async def main():
     html_url = f"file:///{html_path.as_posix()}"
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=False, channel='chrome')
-        page = await browser.new_page()
+        # 复用持久化浏览器上下文（登录态 / 缓存跨运行保留）；Chromium 独占用户数据目录，
+        # 每个示例用自己的目录。要跳过浏览器启动，可传 cdp_url 连接已运行的 Chrome
+        page, owns_context = await get_persistent_page(
+            p, user_data_dir="~/.pymidscene/profile-login", channel='chrome'
+        )
 
         # 创建 Agent（启用缓存）
         agent = PlaywrightAgent(page)
 
         # 访问登录页面
         await page.goto(html_url)
-        await asyncio.sleep(1)
+        await page.wait_for_load_state("networkidle", timeout=5000)
 
         # AI 自动化登录流程
-        await agent.ai_input("用户名输入框", "admin")
-        await agent.ai_input("密码输入框", "123456")
+        # 两个输入框互不相关：同一张截图上并发定位，再依次输入
+        await agent.ai_input_many([
+            ("用户名输入框", "admin"),
+            ("密码输入框", "123456"),
+        ])
         await agent.ai_click("登录按钮")
-        
-        await asyncio.sleep(1)
+
+        # 事件驱动等待：状态提示一出现就继续，而不是固定 sleep
+        await page.wait_for_selector("#status.success", state="visible", timeout=5000)
 
         # 验证登录成功
         await agent.ai_assert("页面显示登录成功")
         print("✅ 登录成功！")
 
-        # 生成可视化报告
-        report_path = agent.finish()
+        # 生成可视化报告（后台渲染，与关闭浏览器重叠）
+        agent.finish(background=True)
+        if owns_context:
+            await page.context.close()
+        report_path = await agent.await_report()
         print(f"📄 报告: {report_path}")
 
-        await browser.close()
-
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # 可选: 装了 uvloop(pip install "pymidscene[speedups]")就跑在 libuv 事件循环上
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())
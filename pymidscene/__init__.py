@@ -6,47 +6,96 @@ PyMidscene - Python port of Midscene AI automation framework
 
     agent = PlaywrightAgent(page)
     await agent.ai_click("搜索按钮")
+
+可选加速依赖(``pip install "pymidscene[speedups]"``):
+    - orjson: dump / JSON 序列化
+    - uvloop: 非 Windows 平台的 libuv 事件循环, 用 ``uvloop.run(main())``
+      代替 ``asyncio.run(main())``(见 examples/)
+    - h2: OpenAI 兼容协议的模型请求走 HTTP/2
+    - msgpack: 定位 memo(``*.locate-memo.mpk``)以二进制格式落盘
 """
 
-# 核心类 - 直接导出
-from pymidscene.web_integration.playwright import PlaywrightAgent, WebPage
-from pymidscene.core.agent.agent import Agent
+import importlib
+import importlib.util
+from typing import TYPE_CHECKING, Any
+
+# 公开名称 -> "模块:属性",首次访问时才导入(PEP 562)。
+# `from pymidscene import Point` 不再顺带加载 playwright / PIL / 报告生成器。
+_LAZY_ATTRS = {
+    # 核心类
+    "PlaywrightAgent": "pymidscene.web_integration.playwright:PlaywrightAgent",
+    "WebPage": "pymidscene.web_integration.playwright:WebPage",
+    "Agent": "pymidscene.core.agent.agent:Agent",
+    # Android 入口 (需要 adbutils)
+    "AndroidAgent": "pymidscene.android:AndroidAgent",
+    "AndroidDevice": "pymidscene.android:AndroidDevice",
+    "AndroidDeviceOpt": "pymidscene.android:AndroidDeviceOpt",
+    "agent_from_adb_device": "pymidscene.android:agent_from_adb_device",
+    "get_connected_devices": "pymidscene.android:get_connected_devices",
+    # iOS 入口 - 只依赖 httpx (已是主依赖)
+    "IOSAgent": "pymidscene.ios:IOSAgent",
+    "IOSDevice": "pymidscene.ios:IOSDevice",
+    "IOSDeviceOpt": "pymidscene.ios:IOSDeviceOpt",
+    "IOSWebDriverClient": "pymidscene.ios:IOSWebDriverClient",
+    "agent_from_webdriver_agent": "pymidscene.ios:agent_from_webdriver_agent",
+    "check_ios_environment": "pymidscene.ios:check_ios_environment",
+    # 基础类型
+    "Point": "pymidscene.shared.types:Point",
+    "Size": "pymidscene.shared.types:Size",
+    "Rect": "pymidscene.shared.types:Rect",
+    "LocateResultElement": "pymidscene.shared.types:LocateResultElement",
+    "CacheConfig": "pymidscene.shared.types:CacheConfig",
+    "CacheStrategy": "pymidscene.shared.types:CacheStrategy",
+    # 日志
+    "logger": "pymidscene.shared.logger:logger",
+}
+
+# Android 是否可用只看 adbutils 装没装, 不为此导入整个 android 包
+_HAS_ANDROID = importlib.util.find_spec("adbutils") is not None
 
-# Android 入口 - 条件导入, adbutils 未装则占位
-try:
-    from pymidscene.android import (  # noqa: F401
+if TYPE_CHECKING:  # pragma: no cover
+    from pymidscene.web_integration.playwright import PlaywrightAgent, WebPage
+    from pymidscene.core.agent.agent import Agent
+    from pymidscene.android import (
         AndroidAgent,
         AndroidDevice,
         AndroidDeviceOpt,
         agent_from_adb_device,
         get_connected_devices,
     )
-    _HAS_ANDROID = True
-except ImportError:  # pragma: no cover
-    _HAS_ANDROID = False
-
-# iOS 入口 - 只依赖 httpx (已是主依赖), 无条件导入
-from pymidscene.ios import (  # noqa: F401
-    IOSAgent,
-    IOSDevice,
-    IOSDeviceOpt,
-    IOSWebDriverClient,
-    agent_from_webdriver_agent,
-    check_ios_environment,
-)
-
-# 基础类型
-from pymidscene.shared.types import (
-    Point,
-    Size,
-    Rect,
-    LocateResultElement,
-    CacheConfig,
-    CacheStrategy,
-)
-
-# 日志
-from pymidscene.shared.logger import logger
+    from pymidscene.ios import (
+        IOSAgent,
+        IOSDevice,
+        IOSDeviceOpt,
+        IOSWebDriverClient,
+        agent_from_webdriver_agent,
+        check_ios_environment,
+    )
+    from pymidscene.shared.types import (
+        Point,
+        Size,
+        Rect,
+        LocateResultElement,
+        CacheConfig,
+        CacheStrategy,
+    )
+    from pymidscene.shared.logger import logger
+
+
+def __getattr__(name: str) -> Any:
+    target = _LAZY_ATTRS.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = target.split(":")
+    value = getattr(importlib.import_module(module_name), attr)
+    # 缓存到模块字典, 之后的访问不再经过 __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
+
 
 # 版本信息
 __version__ = "0.7.0"
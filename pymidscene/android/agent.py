@@ -194,9 +194,27 @@ class AndroidAgent:
 
     # ==================== 日志 / 报告 ====================
 
-    def finish(self) -> Optional[str]:
-        """结束会话并生成 HTML 报告."""
-        return self._agent.finish()
+    def finish(self, background: bool = False) -> Optional[str]:
+        """
+        结束会话并生成 HTML 报告.
+
+        Args:
+            background: 在线程池里渲染报告并立即返回 None,
+                之后用 ``await agent.await_report()`` 取路径
+        """
+        return self._agent.finish(background=background)
+
+    async def flush_recording(self) -> None:
+        """等待后台"操作后"截图全部完成(配合 ``pipeline_recording=True``)"""
+        await self._agent.flush_recording()
+
+    async def await_report(self) -> Optional[str]:
+        """等待后台报告渲染完成(配合 ``finish(background=True)``); 未在后台启动时直接生成."""
+        return await self._agent.await_report()
+
+    def close(self) -> None:
+        """释放底层 Agent 复用的 HTTP / SDK 客户端(不断开设备)."""
+        self._agent.close()
 
     def save_report(self) -> Optional[str]:
         """手动保存报告."""
@@ -239,11 +257,14 @@ class AndroidAgent:
         if exc_type and self._agent.session_recorder:
             if self._agent.session_recorder.current_step:
                 self._agent.session_recorder.fail_step(str(exc_val))
-        self.finish()
         try:
-            await self._device.destroy()
-        except Exception:
-            pass
+            await self._agent.await_report()
+        finally:
+            self._agent.close()
+            try:
+                await self._device.destroy()
+            except Exception:
+                pass
         # 不吞异常
         return False
 
@@ -8,67 +8,123 @@ PyMidscene Core 模块
 - HTML 可视化报告
 """
 
-from .types import (
-    ScreenshotItem,
-    UIContext,
-    ServiceTaskInfo,
-    ServiceDump,
-    ServiceError,
-    ExecutionRecorderItem,
-    ExecutionTask,
-    ExecutionDump,
-    GroupedActionDump,
-    PlanningAction,
-    PlanningAIResponse,
-)
+import importlib
+from typing import TYPE_CHECKING, Any
 
-from .dump import (
-    ExecutionRecorder,
-    SessionRecorder,
-    GroupedExecutionRecorder,
-    ServiceDumpBuilder,
-    create_execution_recorder,
-    create_session_recorder,
-    create_grouped_recorder,
-)
+# 公开名称 -> "子模块:属性",首次访问时才导入(PEP 562)。
+# 只用到类型定义时不再顺带加载 PIL / 报告 HTML 生成器等重依赖。
+_LAZY_ATTRS = {
+    "ScreenshotItem": ".types:ScreenshotItem",
+    "UIContext": ".types:UIContext",
+    "ServiceTaskInfo": ".types:ServiceTaskInfo",
+    "ServiceDump": ".types:ServiceDump",
+    "ServiceError": ".types:ServiceError",
+    "ExecutionRecorderItem": ".types:ExecutionRecorderItem",
+    "ExecutionTask": ".types:ExecutionTask",
+    "ExecutionDump": ".types:ExecutionDump",
+    "PlanningAction": ".types:PlanningAction",
+    "PlanningAIResponse": ".types:PlanningAIResponse",
+    "ExecutionRecorder": ".dump:ExecutionRecorder",
+    "SessionRecorder": ".dump:SessionRecorder",
+    "GroupedExecutionRecorder": ".dump:GroupedExecutionRecorder",
+    "ServiceDumpBuilder": ".dump:ServiceDumpBuilder",
+    "create_execution_recorder": ".dump:create_execution_recorder",
+    "create_session_recorder": ".dump:create_session_recorder",
+    "create_grouped_recorder": ".dump:create_grouped_recorder",
+    "MidsceneRunManager": ".run_manager:MidsceneRunManager",
+    "get_default_run_manager": ".run_manager:get_default_run_manager",
+    "ElementMarker": ".element_marker:ElementMarker",
+    "MarkerStyle": ".element_marker:MarkerStyle",
+    "ActionMarker": ".element_marker:ActionMarker",
+    "get_default_marker": ".element_marker:get_default_marker",
+    "HTMLReportGenerator": ".report_generator:HTMLReportGenerator",
+    "ReportSession": ".report_generator:ReportSession",
+    "ReportStep": ".report_generator:ReportStep",
+    "get_default_report_generator": ".report_generator:get_default_report_generator",
+    "JSCompatibleReportGenerator": ".js_report_generator:JSCompatibleReportGenerator",
+    # GroupedActionDump 取 js_report_generator 的定义(原先后导入的覆盖了 .types 的)
+    "GroupedActionDump": ".js_report_generator:GroupedActionDump",
+    "JSExecutionDump": ".js_report_generator:ExecutionDump",
+    "JSExecutionTask": ".js_report_generator:ExecutionTask",
+    "MatchedElement": ".js_report_generator:MatchedElement",
+    "AIUsage": ".js_report_generator:AIUsage",
+    "TaskTiming": ".js_report_generator:TaskTiming",
+    "get_js_report_generator": ".js_report_generator:get_js_report_generator",
+    "MidsceneLogManager": ".logging_system:MidsceneLogManager",
+    "MidsceneFormatter": ".logging_system:MidsceneFormatter",
+    "get_log_manager": ".logging_system:get_log_manager",
+    "reset_log_manager": ".logging_system:reset_log_manager",
+}
 
-from .run_manager import (
-    MidsceneRunManager,
-    get_default_run_manager,
-)
+if TYPE_CHECKING:  # pragma: no cover
+    from .types import (
+        ScreenshotItem,
+        UIContext,
+        ServiceTaskInfo,
+        ServiceDump,
+        ServiceError,
+        ExecutionRecorderItem,
+        ExecutionTask,
+        ExecutionDump,
+        PlanningAction,
+        PlanningAIResponse,
+    )
+    from .dump import (
+        ExecutionRecorder,
+        SessionRecorder,
+        GroupedExecutionRecorder,
+        ServiceDumpBuilder,
+        create_execution_recorder,
+        create_session_recorder,
+        create_grouped_recorder,
+    )
+    from .run_manager import (
+        MidsceneRunManager,
+        get_default_run_manager,
+    )
+    from .element_marker import (
+        ElementMarker,
+        MarkerStyle,
+        ActionMarker,
+        get_default_marker,
+    )
+    from .report_generator import (
+        HTMLReportGenerator,
+        ReportSession,
+        ReportStep,
+        get_default_report_generator,
+    )
+    from .js_report_generator import (
+        JSCompatibleReportGenerator,
+        GroupedActionDump,
+        ExecutionDump as JSExecutionDump,
+        ExecutionTask as JSExecutionTask,
+        MatchedElement,
+        AIUsage,
+        TaskTiming,
+        get_js_report_generator,
+    )
+    from .logging_system import (
+        MidsceneLogManager,
+        MidsceneFormatter,
+        get_log_manager,
+        reset_log_manager,
+    )
 
-from .element_marker import (
-    ElementMarker,
-    MarkerStyle,
-    ActionMarker,
-    get_default_marker,
-)
 
-from .report_generator import (
-    HTMLReportGenerator,
-    ReportSession,
-    ReportStep,
-    get_default_report_generator,
-)
 
-from .js_report_generator import (
-    JSCompatibleReportGenerator,
-    GroupedActionDump,
-    ExecutionDump as JSExecutionDump,
-    ExecutionTask as JSExecutionTask,
-    MatchedElement,
-    AIUsage,
-    TaskTiming,
-    get_js_report_generator,
-)
+def __getattr__(name: str) -> Any:
+    target = _LAZY_ATTRS.get(name)
+    if target is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name, attr = target.split(":")
+    value = getattr(importlib.import_module(module_name, __name__), attr)
+    globals()[name] = value
+    return value
 
-from .logging_system import (
-    MidsceneLogManager,
-    MidsceneFormatter,
-    get_log_manager,
-    reset_log_manager,
-)
 
+def __dir__() -> list:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
 
 __all__ = [
     # Types
@@ -4,9 +4,15 @@ Agent 核心类 - 对应 packages/core/src/agent/agent.ts
 这是 PyMidscene 的核心入口，提供 AI 驱动的自动化能力。
 """
 
-from typing import Optional, Dict, Any, List, Union, Tuple
+from typing import Optional, Dict, Any, Callable, List, Union, Tuple
+import contextlib
+import contextvars
+import functools
 import inspect
 import os
+import random
+import re
+import threading
 import time
 import asyncio
 
@@ -18,13 +24,19 @@ from ..ai_model.prompts import (
     extract_data_prompt,
     parse_xml_extraction_response,
 )
-from ..agent.task_cache import TaskCache, PlanningCache, LocateCache
+from ..agent.task_cache import (
+    TaskCache, PlanningCache, LocateCache, LocateMemo, MatchCacheResult,
+)
 from ..dump import ExecutionRecorder, SessionRecorder, create_session_recorder
+from ..report_generator import ReportStep
 from ..types import ScreenshotItem
 from ...web_integration.base import AbstractInterface
 from ...shared.types import Size, Rect, LocateResultElement
 from ...shared.logger import logger
 from ...shared.utils import (
+    dumps_json,
+    dumps_json_bytes,
+    loads_json,
     resize_image_base64,
     resize_image_base64_to_size,
 )
@@ -37,6 +49,206 @@ from ...shared.env import (
     INTENT_INSIGHT,
     INTENT_PLANNING,
 )
+from ...shared.env.constants import MIDSCENE_STRUCTURED_OUTPUT
+
+# 超过这个长度的模型响应放到工作线程解析: safe_parse_json 的 json_repair 兜底是
+# 纯 Python, 大段提取结果在事件循环上解析会卡住其他并发中的定位
+OFFLOAD_PARSE_MIN_CHARS = 32 * 1024
+
+# stream_locate: 流式响应里一出现完整的 bbox(数组或 doubao 的字符串形式)就断开
+_BBOX_COMPLETE_RE = re.compile(r'"bbox"\s*:\s*(?:\[\s*-?\d[^\]]*\]|"[^"]+")')
+# 当前 AI 调用的提前结束条件; 随 asyncio.to_thread 的上下文带进工作线程
+_response_stop_pattern: "contextvars.ContextVar[Optional[re.Pattern[str]]]" = (
+    contextvars.ContextVar("_response_stop_pattern", default=None)
+)
+
+# 当前 AI 调用的 OpenAI response_format(结构化输出); 同样随上下文带进工作线程,
+# 只在 httpx(OpenAI 兼容)路径下发
+_response_format: "contextvars.ContextVar[Optional[Dict[str, Any]]]" = (
+    contextvars.ContextVar("_response_format", default=None)
+)
+# aiAssert 的结构化输出 schema: 端点按 schema 约束解码, 省掉 JSON 修复兜底
+_ASSERT_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "assert",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "pass": {"type": "boolean"},
+                "thought": {"type": "string"},
+            },
+            "required": ["pass", "thought"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def _structured_output_enabled() -> bool:
+    """MIDSCENE_STRUCTURED_OUTPUT 是否开启(默认关闭: 不少兼容端点不支持 json_schema)"""
+    raw = os.environ.get(MIDSCENE_STRUCTURED_OUTPUT, "")
+    return raw.strip().lower() in ("1", "true", "yes", "on")
+
+
+# 预热连接请求的超时(秒): 只为提前完成 DNS + TCP + TLS 握手, 不等慢响应
+PREWARM_TIMEOUT = 5.0
+
+# 建连超时(秒): 端点不可达时尽快进入重试, 不等满整个读超时
+CONNECT_TIMEOUT = 10.0
+# 重试等待: 指数退避(1s, 2s, 4s ... 上限 8s)加随机抖动, 避免并发请求同时重试;
+# 429/503 带 Retry-After 秒数时按它等待(同样不超过上限)
+RETRY_MAX_DELAY = 8.0
+RETRY_JITTER = 0.5
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """第 ``attempt`` 次(从 0 开始)重试前的等待秒数"""
+    delay = float(2 ** attempt)
+    if retry_after:
+        try:
+            delay = max(float(retry_after), 0.0)
+        except ValueError:  # HTTP-date 形式不解析, 按指数退避
+            pass
+    return min(delay, RETRY_MAX_DELAY) + random.uniform(0, RETRY_JITTER)
+
+
+# base URL 已带版本段(/v1、/v3、/v1beta ...)时直接拼 /chat/completions
+_API_VERSION_SUFFIX_RE = re.compile(r'/v\d+[a-z]*$')
+
+
+@functools.lru_cache(maxsize=32)
+def _chat_completions_url(base_url: str) -> str:
+    """OpenAI 兼容协议的 chat/completions 地址(每个 base URL 只解析一次)"""
+    base = base_url.rstrip("/")
+    if _API_VERSION_SUFFIX_RE.search(base):
+        return f"{base}/chat/completions"
+    return f"{base}/v1/chat/completions"
+
+
+def _new_http_client() -> "httpx.Client":
+    import httpx
+
+    return httpx.Client(
+        trust_env=False,
+        http2=HAS_H2,
+        timeout=120,
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=64),
+    )
+
+
+def _inflight_key(messages: List[Dict[str, Any]]) -> Tuple[Tuple[Any, ...], List[str]]:
+    """
+    在途请求去重用的消息键: 文本原样, 图片 data URL 只取对象身份
+
+    不序列化整条消息 —— 几 MB 的截图每次都要在事件循环里编码一遍。同一帧的
+    消息共用同一个 data URL 对象(``_build_messages`` 复用 image 片段), 按
+    ``id()`` 比较即可; 返回的 URL 列表须和键一起保留到请求结束, 保证 id 不被复用。
+    """
+    parts: List[Any] = []
+    images: List[str] = []
+    for message in messages:
+        content = message.get("content")
+        if not isinstance(content, list):
+            parts.append((message.get("role"), content))
+            continue
+        items: List[Any] = []
+        for part in content:
+            image_url = part.get("image_url") if isinstance(part, dict) else None
+            if isinstance(image_url, dict) and isinstance(image_url.get("url"), str):
+                images.append(image_url["url"])
+                items.append(("image", id(image_url["url"]), image_url.get("detail")))
+            elif isinstance(part, dict) and part.get("type") == "text":
+                items.append(("text", part.get("text")))
+            else:
+                items.append(("part", dumps_json(part)))
+        parts.append((message.get("role"), tuple(items)))
+    return tuple(parts), images
+
+
+def _parse_json_content(content: str) -> Any:
+    """提取(可能包在 markdown 代码块里的)JSON 并容错解析"""
+    from ...shared.utils import fast_extract_json
+
+    return fast_extract_json(content)
+
+
+try:  # httpx 的 HTTP/2 支持依赖 h2(`pip install "httpx[http2]"`)
+    import h2  # noqa: F401
+    HAS_H2 = True
+except ImportError:
+    HAS_H2 = False
+
+
+class _FrameReuseInterface:
+    """
+    ``reuse_screenshot()`` 期间包装 interface
+
+    只读调用(``screenshot`` / ``get_*``)原样透传; 其余调用(点击 / 输入 /
+    滚动 / 按键 ...)执行后让复用的截图作废, 下一次定位重新截图。
+    """
+
+    _READ_ONLY_PREFIXES = ("get_", "screenshot")
+
+    def __init__(self, inner: AbstractInterface, invalidate):
+        self._inner = inner
+        self._invalidate = invalidate
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._inner, name)
+        if not callable(attr) or name.startswith(self._READ_ONLY_PREFIXES):
+            return attr
+        invalidate = self._invalidate
+
+        if inspect.iscoroutinefunction(attr):
+            async def _async_write(*args, **kwargs):
+                try:
+                    return await attr(*args, **kwargs)
+                finally:
+                    invalidate()
+            return _async_write
+
+        def _write(*args, **kwargs):
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                invalidate()
+        return _write
+
+
+class _ReusedFrame:
+    """``reuse_screenshot()`` 最外层块截到的帧, 嵌套块共用"""
+
+    __slots__ = ("frame", "version")
+
+    def __init__(self) -> None:
+        self.frame: Optional[Tuple[str, Size]] = None
+        # 截图开始时的页面版本; 之后有写操作(版本号变了)这一帧即作废
+        self.version = -1
+
+
+class _ReuseScope:
+    """
+    一次 ``reuse_screenshot()`` 进入对应的状态
+
+    经 ContextVar 按异步任务隔离: 并发的 ai_click / ai_input 各自记自己的
+    "操作前"截图, 互不覆盖。``action_frame`` 只属于本层块。
+    """
+
+    __slots__ = ("owner", "reused", "action_frame")
+
+    def __init__(self, owner: "Agent", reused: _ReusedFrame) -> None:
+        self.owner = owner
+        self.reused = reused
+        # 本层块内第一次用到的帧(作废后仍保留, 用作"操作前"截图)
+        self.action_frame: Optional[str] = None
+
+
+# 当前异步任务所在的 reuse_screenshot() 块; asyncio 任务创建时复制上下文
+_reuse_scope: "contextvars.ContextVar[Optional[_ReuseScope]]" = (
+    contextvars.ContextVar("_reuse_scope", default=None)
+)
 
 
 class Agent:
@@ -63,6 +275,49 @@ class Agent:
         })
     """
 
+    # 配了 cache_id 时的 YAML 任务缓存(事件循环内的写入延迟合并落盘)
+    task_cache: Optional[TaskCache] = None
+    # 进程内定位 LRU(同一帧截图 + 同一描述 → 直接复用结果,不调 AI)
+    locate_memo: Optional[LocateMemo] = None
+    # 串行化页面写操作(click / input);AI 定位阶段可并发,写 DOM 必须排队
+    _dom_lock: Optional[asyncio.Lock] = None
+    # finish(background=True) 时在线程池里渲染报告,await_report() 取结果
+    _report_future: Optional["asyncio.Future[Optional[str]]"] = None
+    # 页面版本号: 每次页面写操作 +1, reuse_screenshot() 复用的帧据此判断是否作废
+    _page_version: int = 0
+    # 进行中的 reuse_screenshot() 最外层块数; 第一个进入时包装 interface, 最后一个退出时还原
+    _reuse_bursts: int = 0
+    _unwrapped_interface: Optional[AbstractInterface] = None
+    # OpenAI 兼容协议的持久 httpx 客户端(连接池 + keep-alive),首次请求时创建
+    _http_client: Optional[Any] = None
+    # 保护 _http_client / _sdk_clients 的创建与关闭(每个 Agent 一把, __init__ 中创建)
+    _http_client_lock: threading.Lock
+    # 原生 SDK 客户端(anthropic / google-genai),按 (家族, api_key, base_url) 复用
+    _sdk_clients: Optional[Dict[Tuple[str, Optional[str], Optional[str]], Any]] = None
+    # 同时在途的 AI 请求上限(None 不限制);信号量在事件循环内惰性创建
+    max_concurrency: Optional[int] = None
+    _ai_semaphore: Optional[asyncio.Semaphore] = None
+    # 在途 AI 请求 (intent, 提前结束条件, 结构化输出, 消息键) -> (Future, 图片 URL),
+    # 相同请求共用一次调用
+    _inflight_calls: Optional[
+        Dict[Tuple[Any, ...], Tuple["asyncio.Future[Dict[str, Any]]", List[str]]]
+    ] = None
+    # ai_locate_queued() 的微批处理器(多个协程的定位合并到同一张截图)
+    _locate_batcher: Optional[Any] = None
+    # pipeline_recording 时在后台截取"操作后"截图, finish 前统一等待
+    pipeline_recording: bool = False
+    _recording_tasks: Optional[set] = None
+    # ai_locate_with_scroll_retry 投机并发的屏数(1 表示逐屏串行)
+    max_parallel_scroll_attempts: int = 1
+    # 最近一帧截图 → 已拼好的 image_url 消息片段(同一帧多次请求不重复拼 data URL)
+    _image_part: Optional[Tuple[str, Dict[str, Any]]] = None
+    # 构造时在后台预热模型 endpoint 连接的任务(持有引用防止被回收)
+    _prewarm_task: Optional["asyncio.Task[None]"] = None
+    # close() 之后为 True; 预热线程不再创建新的 httpx 客户端
+    _closed: bool = False
+    # 定位请求改为流式, 读到完整 bbox 即断开(不等模型把后面的内容说完)
+    stream_locate: bool = False
+
     def __init__(
         self,
         interface: AbstractInterface,
@@ -73,6 +328,12 @@ class Agent:
         enable_recording: bool = True,  # 默认启用记录
         driver_type: str = "playwright",
         report_dir: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        perceptual_locate_memo: bool = False,
+        pipeline_recording: bool = False,
+        max_parallel_scroll_attempts: int = 1,
+        prewarm_connection: bool = False,
+        stream_locate: bool = False,
     ):
         """
         初始化 Agent
@@ -90,9 +351,31 @@ class Agent:
             enable_recording: 是否启用执行记录（默认启用）
             driver_type: 驱动类型（playwright, selenium 等）
             report_dir: 报告保存目录（默认为当前目录）
+            max_concurrency: 同时在途的 AI 请求上限(并发定位时遵守 provider
+                的 RPM / 并发限制;默认不限制)
+            perceptual_locate_memo: 定位 memo 精确未命中时再按截图的感知哈希
+                (dHash)查找, 画面无肉眼可见变化时跳过 AI 调用(默认关闭)
+            pipeline_recording: ai_click / ai_input / ai_input_many / ai_scroll /
+                ai_action 的"操作后"报告截图改在后台
+                截取, 动作立即返回、与下一步重叠执行; 需在结束前
+                ``await agent.flush_recording()``(``async with`` /
+                ``finish(background=True)`` / ``await_report()`` 会自动等待)
+            max_parallel_scroll_attempts: 滚动重试定位时一次投机截取并发定位的
+                屏数(默认 1, 即逐屏串行; 调大用更多 AI 调用换更低延迟)
+            prewarm_connection: 在事件循环中构造时, 后台向模型 endpoint 发一个
+                HEAD 建好连接, 第一次 AI 调用不再付 DNS + TLS 握手的延迟(默认关闭;
+                短脚本 / 单元测试里构造 Agent 不会因此访问模型服务)
+            stream_locate: OpenAI 兼容协议的元素定位请求改为流式(SSE), 读到完整
+                bbox 就断开, 模型在 bbox 之后还长篇输出时省掉这段等待。提前断开的
+                请求没有 token 用量统计, 连接也不回池(默认关闭)
         """
         self.interface = interface
         self.driver_type = driver_type
+        self.max_concurrency = max_concurrency
+        self.pipeline_recording = pipeline_recording
+        self.max_parallel_scroll_attempts = max_parallel_scroll_attempts
+        self.stream_locate = stream_locate
+        self._http_client_lock = threading.Lock()
 
         # 初始化模型配置管理器
         if model_config:
@@ -113,6 +396,18 @@ class Agent:
             )
             logger.info(f"Task cache initialized: {cache_id}")
 
+        # 定位 LRU:配了 cache_id 时落盘到缓存目录,跨运行复用
+        self.locate_memo = LocateMemo(
+            maxsize=1024,
+            persist_path=(
+                self.task_cache.locate_memo_path
+                if self.task_cache and self.task_cache.is_cache_result_used
+                else None
+            ),
+            read_only=bool(self.task_cache and self.task_cache.read_only_mode),
+            perceptual=perceptual_locate_memo,
+        )
+
         # 初始化会话记录器（新的日志系统）
         self.enable_recording = enable_recording
         self.session_recorder: Optional[SessionRecorder] = None
@@ -137,6 +432,50 @@ class Agent:
             f"recording={'enabled' if enable_recording else 'disabled'}"
         )
 
+        if prewarm_connection:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                self._prewarm_task = loop.create_task(
+                    asyncio.to_thread(self._prewarm_connection)
+                )
+
+    def _prewarm_connection(self) -> None:
+        """
+        向模型 endpoint 发一个 HEAD, 让复用的 httpx 连接池提前完成握手
+
+        只对走 httpx 的 OpenAI 兼容协议生效(gemini / claude 用各自 SDK);
+        状态码无所谓, 任何失败都忽略 —— 真正的请求会照常报错。
+        """
+        try:
+            config = self._get_model_config(INTENT_INSIGHT)
+            if config.model_family in ("gemini", "claude") or not config.openai_base_url:
+                return
+            # Agent 已 close 时不再新建客户端(否则新客户端没人关闭)
+            client = self._get_open_http_client()
+            if client is None:
+                return
+            client.head(config.openai_base_url, timeout=PREWARM_TIMEOUT)
+            logger.debug(f"Model endpoint connection prewarmed: {config.openai_base_url}")
+        except Exception as exc:  # noqa: BLE001
+            logger.debug(f"Model endpoint prewarm skipped: {exc}")
+
+    def _get_dom_lock(self) -> asyncio.Lock:
+        """惰性创建页面写锁(需在事件循环内创建)。"""
+        if self._dom_lock is None:
+            self._dom_lock = asyncio.Lock()
+        return self._dom_lock
+
+    def _get_ai_semaphore(self) -> Optional[asyncio.Semaphore]:
+        """惰性创建 AI 并发信号量(未配置 max_concurrency 时返回 None)。"""
+        if self.max_concurrency is None:
+            return None
+        if self._ai_semaphore is None:
+            self._ai_semaphore = asyncio.Semaphore(max(1, self.max_concurrency))
+        return self._ai_semaphore
+
     def _get_model_config(self, intent: str = INTENT_DEFAULT) -> ModelConfig:
         """获取模型配置"""
         return self.model_config_manager.get_model_config(intent)
@@ -173,9 +512,23 @@ class Agent:
         a systematic miss factor of `dpr`. Shrinking the screenshot to CSS
         dimensions first is what JS does and collapses both spaces to CSS.
         Returns (screenshot_b64_css_space, size).
+
+        在 ``reuse_screenshot()`` 块内, 页面未被写过时直接复用上一帧。
         """
-        screenshot_b64 = await self.interface.screenshot()
-        size = await self.interface.get_size()
+        scope = self._current_reuse_scope()
+        if scope is not None:
+            reused = scope.reused
+            if reused.frame is not None and reused.version == self._page_version:
+                logger.debug("Reusing screenshot captured earlier in this burst")
+                if scope.action_frame is None:
+                    scope.action_frame = reused.frame[0]
+                return reused.frame
+        version = self._page_version
+
+        # 截图与视口尺寸互不依赖, 两次驱动往返并发进行
+        screenshot_b64, size = await asyncio.gather(
+            self.interface.screenshot(), self.interface.get_size()
+        )
         dpr = float(size.get('dpr') or 1)
         css_width = int(size.get('width', 0))
         css_height = int(size.get('height', 0))
@@ -199,8 +552,60 @@ class Agent:
                     f"Original error: {exc}"
                 ) from exc
 
+        if scope is not None:
+            scope.reused.frame = (screenshot_b64, size)
+            scope.reused.version = version
+            if scope.action_frame is None:
+                scope.action_frame = screenshot_b64
         return screenshot_b64, size
 
+    def _current_reuse_scope(self) -> Optional[_ReuseScope]:
+        """当前异步任务所在的、属于本 Agent 的 ``reuse_screenshot()`` 块"""
+        scope = _reuse_scope.get()
+        if scope is None or scope.owner is not self:
+            return None
+        return scope
+
+    def invalidate_screenshot(self) -> None:
+        """让 ``reuse_screenshot()`` 中复用的截图作废(页面已变化)"""
+        self._page_version += 1
+
+    @contextlib.asynccontextmanager
+    async def reuse_screenshot(self):
+        """
+        在一段连续的 AI 调用之间复用同一张截图
+
+        块内第一次需要截图时正常截图, 之后的定位 / 查询 / 断言直接复用这张图,
+        省掉每次 ``page.screenshot()`` 的编码与 IPC 往返。任何页面写操作
+        (点击 / 输入 / 滚动 / 按键 ...)都会让这张图作废, 下一次调用重新截图;
+        也可以手动调用 ``invalidate_screenshot()``(如页面自行跳转)。
+
+        示例:
+            async with agent.reuse_screenshot():
+                title = await agent.ai_string("页面标题")
+                await agent.ai_assert("显示了搜索结果")
+        """
+        parent = self._current_reuse_scope()
+        outermost = parent is None
+        if outermost:
+            if self._reuse_bursts == 0:
+                self._unwrapped_interface = self.interface
+                self.interface = _FrameReuseInterface(
+                    self.interface, self.invalidate_screenshot
+                )
+            self._reuse_bursts += 1
+        reused = _ReusedFrame() if outermost else parent.reused
+        token = _reuse_scope.set(_ReuseScope(self, reused))
+        try:
+            yield self
+        finally:
+            _reuse_scope.reset(token)
+            if outermost:
+                self._reuse_bursts -= 1
+                if self._reuse_bursts == 0:
+                    self.interface = self._unwrapped_interface
+                    self._unwrapped_interface = None
+
     async def _capture_recording_screenshot(self) -> str:
         """
         Capture a screenshot for report recording, normalized to CSS-space
@@ -213,12 +618,23 @@ class Agent:
         the report animation mid-stream swaps its underlying image to a
         different natural size — the click-replay scale-back then uses the
         wrong origin and the image flies to the top-left corner.
+
+        在 ``reuse_screenshot()`` 块内与 AI 截图共用同一帧(ai_click / ai_input
+        的"操作前"截图与随后定位用的截图是同一张, 不必截两次)。
         """
-        screenshot_b64 = await self.interface.screenshot()
-        try:
-            size = await self.interface.get_size()
-        except Exception as exc:
-            logger.debug(f"get_size failed in recording capture: {exc}")
+        if self._current_reuse_scope() is not None:
+            screenshot_b64, _ = await self._capture_ai_screenshot()
+            return screenshot_b64
+
+        screenshot_b64, size = await asyncio.gather(
+            self.interface.screenshot(),
+            self.interface.get_size(),
+            return_exceptions=True,
+        )
+        if isinstance(screenshot_b64, BaseException):
+            raise screenshot_b64
+        if isinstance(size, BaseException):
+            logger.debug(f"get_size failed in recording capture: {size}")
             return screenshot_b64
 
         dpr = float(size.get('dpr') or 1)
@@ -235,6 +651,66 @@ class Agent:
 
         return screenshot_b64
 
+    def _record_element_location(
+        self, element: LocateResultElement, description: Optional[str] = None
+    ) -> None:
+        """把定位结果记到当前步骤(标记在构建报告时才画)"""
+        self.session_recorder.record_element_location(
+            bbox=element.bbox_int,
+            center=element.center_int,
+            description=description or element.description,
+            draw_marker=True,
+        )
+
+    async def _resume_action_step(self, step: Optional[ReportStep]) -> None:
+        """
+        定位结束后切回动作步骤(click / input)并补记"操作前"截图
+
+        定位会开启并完成自己的 locate 步骤(之后 ``current_step`` 为空), 元素位置、
+        操作后截图与完成状态要记回动作步骤本身。在 ``reuse_screenshot()`` 块内调用:
+        走 AI 定位时复用定位用的第一帧, 不另外截图; 命中 XPath 缓存时定位没有截图,
+        这里在元素滚入视口之后才截, 与标注的坐标一致。
+        """
+        if step is None:
+            return
+        self.session_recorder.current_step = step
+        scope = self._current_reuse_scope()
+        screenshot_before = scope.action_frame if scope is not None else None
+        if screenshot_before is None:
+            screenshot_before = await self._capture_recording_screenshot()
+        self.session_recorder.record_screenshot_before(screenshot_before)
+
+    async def _record_screenshot_after(self) -> None:
+        """
+        为当前步骤记录"操作后"截图
+
+        ``pipeline_recording`` 时截图放到后台任务里执行并直接写回该步骤,
+        调用方不必等待; 截图在页面写锁内进行, 下一步的写操作会排在它之后。
+        """
+        step = self.session_recorder.current_step if self.session_recorder else None
+        if not self.pipeline_recording or step is None:
+            screenshot_after = await self._capture_recording_screenshot()
+            self.session_recorder.record_screenshot_after(screenshot_after)
+            return
+
+        async def _capture() -> None:
+            try:
+                async with self._get_dom_lock():
+                    step.screenshot_after = await self._capture_recording_screenshot()
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Background after-screenshot failed: {exc}")
+
+        if self._recording_tasks is None:
+            self._recording_tasks = set()
+        task = asyncio.create_task(_capture())
+        self._recording_tasks.add(task)
+        task.add_done_callback(self._recording_tasks.discard)
+
+    async def flush_recording(self) -> None:
+        """等待 ``pipeline_recording`` 启动的后台截图全部完成"""
+        if self._recording_tasks:
+            await asyncio.gather(*list(self._recording_tasks), return_exceptions=True)
+
     def _build_messages(
         self,
         system_prompt: str,
@@ -248,7 +724,22 @@ class Agent:
         (对齐 JS base-page.ts).如果未来有调用方塞 PNG 进来,OpenAI / 主流 VL
         API 对 MIME 不严格,JPEG 声明下传 PNG 数据通常也能解;严格场景可加
         sniff/switch.
+
+        同一帧截图(批量定位 / 重试 / deepThink)复用同一个 image_url 片段,
+        不再每次复制一份几 MB 的 data URL;消息只读, 下游处理会生成新字典。
         """
+        cached = self._image_part
+        if cached is not None and cached[0] is screenshot_b64:
+            image_part = cached[1]
+        else:
+            image_part = {
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{screenshot_b64}",
+                    "detail": "high",
+                }
+            }
+            self._image_part = (screenshot_b64, image_part)
         return [
             {
                 "role": "system",
@@ -257,13 +748,7 @@ class Agent:
             {
                 "role": "user",
                 "content": [
-                    {
-                        "type": "image_url",
-                        "image_url": {
-                            "url": f"data:image/jpeg;base64,{screenshot_b64}",
-                            "detail": "high",
-                        }
-                    },
+                    image_part,
                     {
                         "type": "text",
                         "text": user_prompt
@@ -287,6 +772,14 @@ class Agent:
         """
         config = self._get_model_config(intent)
 
+        # 截图缩放 + JPEG 重编码(在工作线程里做,不占事件循环);
+        # 与坐标解析用同一个解析后的 family: 未配置时按像素坐标的 qwen2.5-vl
+        # 处理, 不能缩放, 否则模型返回的是缩小图上的像素坐标
+        from ..image_utils import prepare_messages_for_llm
+        messages = prepare_messages_for_llm(
+            messages, self._resolve_model_family(config)
+        )
+
         if config.model_family == 'gemini':
             return self._call_with_gemini_sdk(config, messages)
         if config.model_family == 'claude':
@@ -303,10 +796,50 @@ class Agent:
 
         底层 SDK / httpx 客户端与重试 sleep 都是同步的, 直接在 async 方法里
         调用会把整个 loop 挂住数秒到数十秒(多 Agent / 嵌入 web 服务时致命).
+        配置了 ``max_concurrency`` 时在信号量内发起, 限制同时在途的请求数.
+
+        完全相同的请求(同 intent、同 messages)已在途时不再重复发送, 直接等待
+        那一次的结果(多个协程对同一帧问同一个问题时只花一次模型调用).
         """
-        return await asyncio.to_thread(
-            self._call_ai_with_config, messages, intent
+        response_format = _response_format.get()
+        message_key, images = _inflight_key(messages)
+        key = (
+            intent,
+            _response_stop_pattern.get(),
+            response_format["json_schema"]["name"] if response_format else None,
+            message_key,
         )
+        if self._inflight_calls is None:
+            self._inflight_calls = {}
+        entry = self._inflight_calls.get(key)
+        if entry is None:
+            pending = asyncio.ensure_future(self._dispatch_ai_call(messages, intent))
+            # 连同图片 URL 一起保存: 条目存在期间这些对象不会被回收, 键里的 id 不会指向别的截图
+            self._inflight_calls[key] = (pending, images)
+            pending.add_done_callback(
+                lambda _f: self._inflight_calls.pop(key, None)
+            )
+        else:
+            pending = entry[0]
+            logger.debug(f"Joining identical in-flight AI call (intent={intent})")
+        # shield: 单个调用方被取消不影响同一请求的其他等待者
+        result = await asyncio.shield(pending)
+        return dict(result)
+
+    async def _dispatch_ai_call(
+        self,
+        messages: list[dict[str, Any]],
+        intent: str,
+    ) -> dict[str, Any]:
+        semaphore = self._get_ai_semaphore()
+        if semaphore is None:
+            return await asyncio.to_thread(
+                self._call_ai_with_config, messages, intent
+            )
+        async with semaphore:
+            return await asyncio.to_thread(
+                self._call_ai_with_config, messages, intent
+            )
 
     def _native_retry(
         self,
@@ -347,7 +880,9 @@ class Agent:
         处理:
         - OpenAI 风格的 messages(含 image_url data-URL) → Anthropic content blocks
           ({"type":"image", "source":{"type":"base64","media_type":...,"data":...}})
-        - system role 不进入 messages,而是顶层 `system` 字段
+        - system role 不进入 messages,而是顶层 `system` 字段, 并标记
+          ``cache_control: ephemeral``: 系统 prompt 按 (家族, 语言) 固定, 同一会话
+          的后续请求命中 Anthropic prompt cache(不会自动缓存, 必须显式标记)
         - 返回 OpenAI 一致的 {content, usage, raw_response} 结构
 
         SDK 不在 pyproject 硬依赖;仅在 model_family=='claude' 时 lazy import,
@@ -366,9 +901,17 @@ class Agent:
         if base_url:
             client_kwargs["base_url"] = base_url
 
-        client = anthropic.Anthropic(**client_kwargs)
+        client = self._get_sdk_client(
+            "claude", config.openai_api_key, base_url,
+            lambda: anthropic.Anthropic(**client_kwargs),
+        )
 
         system_text, anthropic_messages = self._convert_messages_to_anthropic(messages)
+        system_blocks: Any = (
+            [{"type": "text", "text": system_text, "cache_control": {"type": "ephemeral"}}]
+            if system_text
+            else anthropic.NOT_GIVEN
+        )
 
         logger.info(
             f"Calling Anthropic API: model={config.model_name}, "
@@ -387,7 +930,7 @@ class Agent:
                 model=config.model_name,
                 max_tokens=_anthropic_max_tokens,
                 temperature=_temperature,
-                system=system_text if system_text else anthropic.NOT_GIVEN,
+                system=system_blocks,
                 messages=anthropic_messages,
             )
 
@@ -404,7 +947,13 @@ class Agent:
             usage_obj = getattr(response, "usage", None)
             usage: dict[str, Any] | None = None
             if usage_obj is not None:
+                # input_tokens 不含缓存读写的部分, 加回来才是完整的输入 token 数
                 prompt_tokens = getattr(usage_obj, "input_tokens", None)
+                cache_tokens = (getattr(usage_obj, "cache_read_input_tokens", None) or 0) + (
+                    getattr(usage_obj, "cache_creation_input_tokens", None) or 0
+                )
+                if prompt_tokens is not None and cache_tokens:
+                    prompt_tokens += cache_tokens
                 completion_tokens = getattr(usage_obj, "output_tokens", None)
                 total = (prompt_tokens or 0) + (completion_tokens or 0)
                 usage = {
@@ -505,9 +1054,12 @@ class Agent:
         if not base_url:
             raise ValueError("MIDSCENE_MODEL_BASE_URL is required")
 
-        client = genai.Client(
-            api_key=config.openai_api_key,
-            http_options=HttpOptions(base_url=base_url),
+        client = self._get_sdk_client(
+            "gemini", config.openai_api_key, base_url,
+            lambda: genai.Client(
+                api_key=config.openai_api_key,
+                http_options=HttpOptions(base_url=base_url),
+            ),
         )
 
         # 将 OpenAI 格式的 messages 转换为 Gemini (system_instruction, contents)
@@ -603,6 +1155,75 @@ class Agent:
         system_text = "\n\n".join(p for p in system_parts if p)
         return system_text, contents
 
+    def _get_http_client(self) -> "httpx.Client":
+        """
+        获取(懒加载)复用的 httpx 客户端
+
+        之前每次请求都新建 ``httpx.Client``, 每次 AI 调用都要重新做 TCP + TLS
+        握手。这里整个 Agent 共用一个客户端(连接池 + keep-alive, 装了 h2 时走
+        HTTP/2)。httpx.Client 线程安全, 可供 ``asyncio.to_thread`` 里的并发请求共用。
+        ``close()`` 之后再发请求会重新创建。
+        """
+        if self._http_client is not None:
+            return self._http_client
+        with self._http_client_lock:
+            self._closed = False
+            if self._http_client is None:
+                self._http_client = _new_http_client()
+            return self._http_client
+
+    def _get_open_http_client(self) -> "Optional[httpx.Client]":
+        """同 ``_get_http_client``, 但 Agent 已 ``close()`` 时返回 None 而不是重新创建"""
+        if self._http_client is not None:
+            return self._http_client
+        with self._http_client_lock:
+            if self._closed:
+                return None
+            if self._http_client is None:
+                self._http_client = _new_http_client()
+            return self._http_client
+
+    def _get_sdk_client(
+        self,
+        family: str,
+        api_key: Optional[str],
+        base_url: Optional[str],
+        factory: Callable[[], Any],
+    ) -> Any:
+        """
+        获取(懒加载)复用的原生 SDK 客户端
+
+        SDK 客户端内部各自持有 httpx 连接池, 每次调用新建等于每次重新握手;
+        同一 endpoint + 凭据的请求共用一个实例。
+        """
+        key = (family, api_key, base_url)
+        with self._http_client_lock:
+            if self._sdk_clients is None:
+                self._sdk_clients = {}
+            client = self._sdk_clients.get(key)
+            if client is None:
+                client = self._sdk_clients[key] = factory()
+        return client
+
+    def close(self) -> None:
+        """关闭复用的 HTTP / SDK 客户端(``async with`` 退出时自动调用)"""
+        prewarm, self._prewarm_task = self._prewarm_task, None
+        if prewarm is not None and not prewarm.done():
+            prewarm.cancel()
+        with self._http_client_lock:
+            self._closed = True
+            client, self._http_client = self._http_client, None
+        if client is not None:
+            client.close()
+        sdk_clients, self._sdk_clients = self._sdk_clients, None
+        for sdk_client in (sdk_clients or {}).values():
+            close = getattr(sdk_client, "close", None)
+            if callable(close):
+                try:
+                    close()
+                except Exception as exc:  # noqa: BLE001
+                    logger.debug(f"Closing SDK client failed: {exc}")
+
     def _call_with_httpx(
         self,
         config: ModelConfig,
@@ -615,15 +1236,10 @@ class Agent:
         """
         import httpx
 
-        base = (config.openai_base_url or "").rstrip("/")
-        if not base:
+        if not (config.openai_base_url or "").rstrip("/"):
             raise ValueError("MIDSCENE_MODEL_BASE_URL is required")
-        import re as _re
-        if _re.search(r'/v\d+[a-z]*$', base):
-            url = f"{base}/chat/completions"
-        else:
-            url = f"{base}/v1/chat/completions"
-        
+        url = _chat_completions_url(config.openai_base_url)
+
         logger.debug(f"Request URL: {url}")
 
         # 构造请求头
@@ -681,13 +1297,28 @@ class Agent:
         last_exc: Optional[Exception] = None
 
         import time as _time
+        # stream_locate 的定位请求: 流式读取, 内容匹配到完整 bbox 即断开
+        stop_pattern = _response_stop_pattern.get()
+        if stop_pattern is not None:
+            data["stream"] = True
+        response_format = _response_format.get()
+        if response_format is not None:
+            data["response_format"] = response_format
+
+        # 请求体只编码一次(重试复用); 装了 orjson 时直接产出 bytes
+        body = dumps_json_bytes(data)
+        client = self._get_http_client()
+        timeout = httpx.Timeout(config.timeout or 120, connect=CONNECT_TIMEOUT)
         for attempt in range(max_retries + 1):
             try:
-                with httpx.Client(
-                    trust_env=False,
-                    timeout=config.timeout or 120
-                ) as client:
-                    last_response = client.post(url, headers=headers, json=data)
+                if stop_pattern is None:
+                    last_response = client.post(
+                        url, headers=headers, content=body, timeout=timeout,
+                    )
+                else:
+                    last_response = self._post_streaming(
+                        client, url, headers, body, timeout, stop_pattern,
+                    )
                 last_exc = None
             except (
                 httpx.ConnectError,
@@ -698,10 +1329,10 @@ class Agent:
                 last_exc = exc
                 last_response = None
                 if attempt < max_retries:
-                    wait_time = 2 ** attempt
+                    wait_time = _retry_delay(attempt)
                     logger.warning(
                         f"Network error ({type(exc).__name__}: {exc}), "
-                        f"retrying in {wait_time}s "
+                        f"retrying in {wait_time:.1f}s "
                         f"(attempt {attempt + 1}/{max_retries})..."
                     )
                     _time.sleep(wait_time)
@@ -712,10 +1343,12 @@ class Agent:
                 break
 
             if last_response.status_code in retryable_status_codes and attempt < max_retries:
-                wait_time = 2 ** attempt
+                wait_time = _retry_delay(
+                    attempt, last_response.headers.get("retry-after")
+                )
                 logger.warning(
                     f"API request failed (status {last_response.status_code}), "
-                    f"retrying in {wait_time}s (attempt {attempt + 1}/{max_retries})... "
+                    f"retrying in {wait_time:.1f}s (attempt {attempt + 1}/{max_retries})... "
                     f"body={last_response.text[:200]}"
                 )
                 _time.sleep(wait_time)
@@ -736,7 +1369,7 @@ class Agent:
                 f"API request failed (status {response.status_code}): {response.text[:200]}"
             )
 
-        result = response.json()
+        result = loads_json(response.content)
 
         # 提取响应内容（OpenAI 格式）。部分 OpenAI 兼容端点在过滤/工具调用
         # 场景会返回 content==null —— 规整为 ""(与 Gemini/Anthropic 原生路径
@@ -763,6 +1396,68 @@ class Agent:
             "raw_response": result
         }
 
+    @staticmethod
+    def _post_streaming(
+        client: "httpx.Client",
+        url: str,
+        headers: Dict[str, str],
+        body: bytes,
+        timeout: "httpx.Timeout",
+        stop_pattern: "re.Pattern[str]",
+    ) -> "httpx.Response":
+        """
+        以 SSE 流式发送请求, 拼接 ``delta.content``, 匹配到 ``stop_pattern`` 即断开
+
+        返回与非流式接口同形状的响应(``choices[0].message.content``, 无 usage),
+        提前断开时内容只保留 ``{<匹配到的片段>}``。非 200 或 provider 忽略
+        ``stream`` 直接返回 JSON 时, 读完 body 原样返回。
+        """
+        import httpx
+
+        with client.stream(
+            "POST", url, headers=headers, content=body, timeout=timeout
+        ) as response:
+            content_type = response.headers.get("content-type", "")
+            if response.status_code != 200 or "event-stream" not in content_type:
+                response.read()
+                return response
+            content = ""
+            for line in response.iter_lines():
+                if not line.startswith("data:"):
+                    continue
+                payload = line[5:].strip()
+                if payload == "[DONE]":
+                    break
+                try:
+                    delta = loads_json(payload)["choices"][0].get("delta") or {}
+                except (ValueError, KeyError, IndexError, TypeError):
+                    continue
+                piece = delta.get("content")
+                if not piece:
+                    continue
+                content += piece
+                match = stop_pattern.search(content)
+                if match:
+                    logger.debug(
+                        f"Streaming response stopped early after {len(content)} chars"
+                    )
+                    content = "{" + match.group(0) + "}"
+                    break
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": content}}]}
+        )
+
+    @staticmethod
+    async def _parse_response(parse_fn, content: str) -> Any:
+        """
+        解析模型响应; 大响应(>= ``OFFLOAD_PARSE_MIN_CHARS``)在工作线程里解析
+
+        小响应直接在当前线程解析 —— 线程切换本身比解析几百字节的 JSON 更贵。
+        """
+        if len(content or "") < OFFLOAD_PARSE_MIN_CHARS:
+            return parse_fn(content)
+        return await asyncio.to_thread(parse_fn, content)
+
     def _should_deep_think(self, deep_think: bool) -> bool:
         """deep_think 显式开,或环境变量 MIDSCENE_FORCE_DEEP_THINK 开。"""
         if deep_think:
@@ -867,11 +1562,13 @@ class Agent:
         self, prompt: str, image_b64: str, coord_w: int, coord_h: int,
         offset_x: int, offset_y: int, cropped: bool,
         model_family: Optional[str], config: "ModelConfig",
+        record_failure: bool = True,
     ):
         """在给定图像(全图或 deepThink 裁剪图)上定位元素。
 
         坐标空间为 ``coord_w x coord_h``;若是裁剪图,用 ``offset_x/offset_y`` 把
-        结果映射回全图。返回 ``(rect, center)`` 或 ``None``(已记录失败)。
+        结果映射回全图。返回 ``(rect, center)`` 或 ``None``(``record_failure``
+        时已把当前步骤记为失败; 并发定位由调用方自行汇总结果)。
         auto-glm 走点坐标分支,其余走标准 bbox JSON 分支。
         """
         from ..ai_model.auto_glm import (
@@ -884,10 +1581,8 @@ class Agent:
             adapt_bbox,
             adapt_bbox_to_rect,
             calculate_center,
-            extract_json_from_code_block,
             format_bbox,
             js_round,
-            safe_parse_json,
         )
 
         use_auto_glm = is_auto_glm(model_family)
@@ -905,13 +1600,23 @@ class Agent:
             )
 
         start = time.time()
-        result = await self._call_ai_with_config_async(messages, INTENT_INSIGHT)
+        stop_token = (
+            _response_stop_pattern.set(_BBOX_COMPLETE_RE)
+            if self.stream_locate and not use_auto_glm else None
+        )
+        try:
+            result = await self._call_ai_with_config_async(messages, INTENT_INSIGHT)
+        finally:
+            if stop_token is not None:
+                _response_stop_pattern.reset(stop_token)
         elapsed_ms = (time.time() - start) * 1000
         self._record_locate_ai_call(result, config, elapsed_ms)
         logger.info(f"AI locate completed: {elapsed_ms:.0f}ms")
 
         def _fail(msg: str):
             logger.warning(f"AI locate failed: {msg}")
+            if not record_failure:
+                return None
             if self.recorder:
                 self.recorder.finish_task(status="failed", error=ValueError(msg))
             if self.session_recorder:
@@ -939,8 +1644,9 @@ class Agent:
             return rect, calculate_center(rect)
 
         # 标准 bbox JSON 分支
-        json_text = extract_json_from_code_block(result["content"])
-        response_data = safe_parse_json(json_text)
+        response_data = await self._parse_response(
+            _parse_json_content, result["content"]
+        )
         if not response_data or "bbox" not in response_data:
             # 模型按约定返回 {"bbox": [], "errors": [...]} 时带出"为什么没找到"
             errs = response_data.get("errors") if isinstance(response_data, dict) else None
@@ -969,6 +1675,80 @@ class Agent:
             return _fail(f"Failed to adapt bbox: {e}")
         return rect, calculate_center(rect)
 
+    async def _lookup_locate_memo(
+        self, prompt: str, screenshot_b64: str, deep_think: bool,
+    ) -> Tuple[Optional[Tuple[Dict[str, Any], Tuple[float, float]]], List[str]]:
+        """
+        查进程内定位 memo(精确指纹未命中时再查感知哈希层)
+
+        Returns:
+            ``(命中的 (rect, center) 或 None, 未命中时定位成功后要写回的键)``
+        """
+        memo_deep_think = self._should_deep_think(deep_think)
+        memo_key = LocateMemo.make_key(prompt, screenshot_b64, memo_deep_think)
+        keys = [memo_key]
+        memo_hit = self.locate_memo.get(
+            memo_key, count_miss=not self.locate_memo.perceptual
+        )
+        if memo_hit is None and self.locate_memo.perceptual:
+            # 精确指纹未命中: 按感知哈希再查一次
+            phash = await self._screenshot_phash(screenshot_b64)
+            if phash is not None:
+                perceptual_key = LocateMemo.make_perceptual_key(
+                    prompt, phash, memo_deep_think
+                )
+                keys.append(perceptual_key)
+                memo_hit = self.locate_memo.get(perceptual_key)
+        return memo_hit, keys
+
+    async def _locate_in_frame(
+        self,
+        prompt: str,
+        screenshot_b64: str,
+        size: Size,
+        deep_think: bool = False,
+        record_failure: bool = True,
+    ) -> Optional[Tuple[Dict[str, Any], Tuple[float, float]]]:
+        """
+        在一帧截图上调用 AI 定位(按需先走 deepThink section-zoom)
+
+        Returns:
+            ``(rect, center)`` 或 None
+        """
+        config = self._get_model_config(INTENT_INSIGHT)
+        model_family = self._resolve_model_family(config)
+        img_width = int(size.get('width', 1280))
+        img_height = int(size.get('height', 800))
+
+        # deepThink 两段式 section-zoom:对齐 JS service.locate 的两个 guard ——
+        # 模型家族为空(纯多模态)或 auto-glm 时禁用。先在全图上粗定位 section、
+        # 裁剪放大,第二段在裁剪图上精定位、坐标加偏移映射回全图。
+        from ..ai_model.auto_glm import is_auto_glm as _is_auto_glm
+        locate_image = screenshot_b64
+        coord_w, coord_h = img_width, img_height
+        offset_x, offset_y, cropped = 0, 0, False
+        if (
+            self._should_deep_think(deep_think)
+            and model_family
+            and not _is_auto_glm(model_family)
+        ):
+            section = await self._locate_section(
+                prompt, screenshot_b64, img_width, img_height, model_family, config
+            )
+            if section is not None:
+                locate_image, section_rect = section
+                coord_w = int(section_rect["width"])
+                coord_h = int(section_rect["height"])
+                offset_x = int(section_rect["left"])
+                offset_y = int(section_rect["top"])
+                cropped = True
+
+        return await self._locate_element_in_image(
+            prompt, locate_image, coord_w, coord_h,
+            offset_x, offset_y, cropped, model_family, config,
+            record_failure=record_failure,
+        )
+
     async def ai_locate(
         self,
         prompt: str,
@@ -1015,9 +1795,28 @@ class Agent:
                     xpaths = cache_data["xpaths"]
                     if xpaths and len(xpaths) > 0:
                         # M1: 多候选 fallback —— 遍历每条缓存的 XPath,首个解析到元素的就用
+                        # 对齐 JS locator.ts `getElementInfoByXpath`:
+                        # 元素可能在视口外 —— 先 scrollIntoView 再取
+                        # rect/center。web 的 bounding_box 是视口相对坐标,
+                        # 页面已滚动时直接使用会换算错位、点到错误元素。
+                        # 先滚动再取 rect(滚动对不存在的元素是空操作), 命中时
+                        # 只取一次 rect, 不必先取一遍、滚动后再取一遍。
+                        scroll_fn = getattr(
+                            self.interface,
+                            "scroll_element_by_xpath_into_view",
+                            None,
+                        )
                         element_info = None
                         xpath = None
                         for candidate in xpaths:
+                            if callable(scroll_fn):
+                                try:
+                                    await scroll_fn(candidate)
+                                except Exception as exc:
+                                    logger.debug(
+                                        f"Scroll-into-view for cached XPath "
+                                        f"failed: {exc}"
+                                    )
                             info = await self.interface.get_element_by_xpath(candidate)
                             if info:
                                 element_info = info
@@ -1025,30 +1824,6 @@ class Agent:
                                 break
                         if xpath:
                             logger.info(f"Using cached XPath: {xpath[:80]}...")
-                            # 对齐 JS locator.ts `getElementInfoByXpath`:
-                            # 元素可能在视口外 —— 先 scrollIntoView 再取
-                            # rect/center。web 的 bounding_box 是视口相对坐标,
-                            # 页面已滚动时直接使用会换算错位、点到错误元素。
-                            scroll_fn = getattr(
-                                self.interface,
-                                "scroll_element_by_xpath_into_view",
-                                None,
-                            )
-                            if callable(scroll_fn):
-                                try:
-                                    await scroll_fn(xpath)
-                                    refreshed = (
-                                        await self.interface.get_element_by_xpath(
-                                            xpath
-                                        )
-                                    )
-                                    if refreshed:
-                                        element_info = refreshed
-                                except Exception as exc:
-                                    logger.debug(
-                                        f"Scroll-into-view after cache hit "
-                                        f"failed: {exc}"
-                                    )
                         if element_info:
                             rect = element_info["rect"]
                             center = element_info["center"]
@@ -1072,18 +1847,7 @@ class Agent:
                                 )
                                 # 也把定位的 bbox/center 画到步骤截图上,方便回放
                                 try:
-                                    bbox_tuple: Tuple[int, int, int, int] = (
-                                        int(rect['left']),
-                                        int(rect['top']),
-                                        int(rect['left'] + rect['width']),
-                                        int(rect['top'] + rect['height']),
-                                    )
-                                    self.session_recorder.record_element_location(
-                                        bbox=bbox_tuple,
-                                        center=(int(center[0]), int(center[1])),
-                                        description=prompt,
-                                        draw_marker=True,
-                                    )
+                                    self._record_element_location(element)
                                 except Exception:
                                     pass
                                 self.session_recorder.complete_step("success (cached)")
@@ -1105,38 +1869,30 @@ class Agent:
             screenshot_item = ScreenshotItem(screenshot_b64)
             self.recorder.record_screenshot(screenshot_item, timing="before")
 
-        # 获取模型配置
-        config = self._get_model_config(INTENT_INSIGHT)
-        model_family = self._resolve_model_family(config)
-        img_width = int(size.get('width', 1280))
-        img_height = int(size.get('height', 800))
-
-        # deepThink 两段式 section-zoom:对齐 JS service.locate 的两个 guard ——
-        # 模型家族为空(纯多模态)或 auto-glm 时禁用。先在全图上粗定位 section、
-        # 裁剪放大,第二段在裁剪图上精定位、坐标加偏移映射回全图。
-        from ..ai_model.auto_glm import is_auto_glm as _is_auto_glm
-        locate_image = screenshot_b64
-        coord_w, coord_h = img_width, img_height
-        offset_x, offset_y, cropped = 0, 0, False
-        if (
-            self._should_deep_think(deep_think)
-            and model_family
-            and not _is_auto_glm(model_family)
-        ):
-            section = await self._locate_section(
-                prompt, screenshot_b64, img_width, img_height, model_family, config
+        # 同一帧截图 + 同一描述:直接复用上次定位结果,跳过 AI 调用
+        memo_keys: List[str] = []
+        if use_cache and self.locate_memo is not None:
+            memo_hit, memo_keys = await self._lookup_locate_memo(
+                prompt, screenshot_b64, deep_think
             )
-            if section is not None:
-                locate_image, section_rect = section
-                coord_w = int(section_rect["width"])
-                coord_h = int(section_rect["height"])
-                offset_x = int(section_rect["left"])
-                offset_y = int(section_rect["top"])
-                cropped = True
+            if memo_hit is not None:
+                rect, center = memo_hit
+                element = LocateResultElement(
+                    description=prompt, center=center, rect=rect
+                )
+                logger.info(f"Locate memo hit: '{prompt}' at {center}")
+                if self.recorder:
+                    self.recorder.finish_task(status="finished", output=element)
+                if self.session_recorder:
+                    self.session_recorder.record_cache_hit(
+                        cache_type="locate", prompt=prompt, extra={"memo": True}
+                    )
+                    self._record_element_location(element)
+                    self.session_recorder.complete_step("success (cached)")
+                return element
 
-        located = await self._locate_element_in_image(
-            prompt, locate_image, coord_w, coord_h,
-            offset_x, offset_y, cropped, model_family, config,
+        located = await self._locate_in_frame(
+            prompt, screenshot_b64, size, deep_think
         )
         if located is None:
             return None
@@ -1147,65 +1903,16 @@ class Agent:
             center=center,
             rect=rect
         )
+        for key in memo_keys:
+            self.locate_memo.put(key, rect, center)
 
         # 记录元素定位结果（SessionRecorder - 带可视化标记）
         if self.session_recorder:
-            bbox_tuple: Tuple[int, int, int, int] = (
-                int(rect['left']),
-                int(rect['top']),
-                int(rect['left'] + rect['width']),
-                int(rect['top'] + rect['height'])
-            )
-            center_tuple: Tuple[int, int] = (int(center[0]), int(center[1]))
-            self.session_recorder.record_element_location(
-                bbox=bbox_tuple,
-                center=center_tuple,
-                description=prompt,
-                draw_marker=True
-            )
+            self._record_element_location(element)
 
         # 保存到缓存(与 JS 版本对齐:存储 XPath 而不是坐标)
-        # 先跳过"第 3 行""最后一个"这类序数描述 —— 它们的 DOM 位置依赖当时的列表顺序,
-        # 缓存 XPath 会在 DOM 重排后错点(order-sensitive judge 的离线启发版)。
         if use_cache and self.task_cache:
-            from ..ai_model.prompts import heuristic_is_order_sensitive as _is_ord
-            if _is_ord(prompt):
-                logger.debug(
-                    f"Skipping locate cache for order-sensitive prompt: '{prompt}'"
-                )
-            else:
-                # M1: 生成多条 XPath 候选,提高 DOM 小改动时的 cache 命中率
-                xpaths: List[str] = []
-                if hasattr(self.interface, "get_element_xpaths"):
-                    try:
-                        xpaths = await self.interface.get_element_xpaths(
-                            center[0], center[1]
-                        ) or []
-                    except Exception as exc:
-                        logger.debug(f"get_element_xpaths failed: {exc}")
-                if not xpaths:
-                    single = await self.interface.get_element_xpath(center[0], center[1])
-                    if single:
-                        xpaths = [single]
-                if xpaths:
-                    new_record = LocateCache(
-                        type="locate",
-                        prompt=prompt,
-                        cache={"xpaths": xpaths},
-                    )
-                    if matched_locate_cache is not None:
-                        # 命中过但 XPath 失效 → 原地更新旧记录
-                        matched_locate_cache.update_fn(new_record)
-                    else:
-                        self.task_cache.append_cache(new_record)
-                    logger.debug(
-                        f"Cached {len(xpaths)} XPath(s) for '{prompt}': "
-                        f"{xpaths[0][:80]}..."
-                    )
-                else:
-                    logger.warning(
-                        f"Could not get XPath for element at {center}, cache not saved"
-                    )
+            await self._cache_locate_xpaths(prompt, center, matched_locate_cache)
 
         # 完成任务记录
         if self.recorder:
@@ -1224,6 +1931,7 @@ class Agent:
         max_scroll_attempts: int = 5,
         scroll_distance: int = 500,
         deep_think: bool = False,
+        max_parallel_attempts: Optional[int] = None,
     ) -> Optional[LocateResultElement]:
         """
         带滚动重试的智能元素定位（增强版，与 JS 版本对齐）
@@ -1243,14 +1951,43 @@ class Agent:
             use_cache: 是否使用缓存（第一次尝试时使用，重试时不使用）
             max_scroll_attempts: 最大滚动尝试次数（默认5次，覆盖 2500px）
             scroll_distance: 每次滚动距离（像素，默认500）
+            max_parallel_attempts: 大于 1 时阶段 1 改为投机执行 —— 先依次滚动
+                截下这么多屏, 每屏的 AI 定位并发进行, 取最靠前命中的一屏并滚回
+                该位置(多花几次 AI 调用, 换掉逐次串行等待的往返延迟);
+                默认取 ``Agent(max_parallel_scroll_attempts=...)``
         
         Returns:
             定位结果或 None
         """
         logger.info(f"AI Locate with scroll retry: '{prompt}' (max_attempts={max_scroll_attempts})")
+
+        if max_parallel_attempts is None:
+            max_parallel_attempts = self.max_parallel_scroll_attempts
+        start_attempt = 0
+        if max_parallel_attempts > 1 and max_scroll_attempts > 1:
+            # 当前位置先走一次常规定位(可命中 XPath 缓存 / memo)
+            element = await self.ai_locate(
+                prompt, use_cache=use_cache, deep_think=deep_think
+            )
+            if element:
+                await self._scroll_element_into_view_after_locate(element)
+                return element
+            speculated = min(max_parallel_attempts, max_scroll_attempts - 1)
+            element = await self._speculative_scroll_locate(
+                prompt, speculated, scroll_distance,
+                use_cache=use_cache, deep_think=deep_think,
+            )
+            if element:
+                await self._scroll_element_into_view_after_locate(element)
+                return element
+            # 已覆盖第 0..speculated 屏; 剩余位置继续串行搜索
+            start_attempt = speculated + 1
+            if start_attempt < max_scroll_attempts:
+                await self.interface.scroll('down', scroll_distance)
+                await asyncio.sleep(0.5)
         
         # 阶段 1: 当前位置 + 向下滚动搜索
-        for attempt in range(max_scroll_attempts):
+        for attempt in range(start_attempt, max_scroll_attempts):
             should_use_cache = use_cache and (attempt == 0)
             element = await self.ai_locate(
                 prompt, use_cache=should_use_cache, deep_think=deep_think
@@ -1300,6 +2037,107 @@ class Agent:
         )
         return None
 
+    async def _speculative_scroll_locate(
+        self,
+        prompt: str,
+        attempts: int,
+        scroll_distance: int,
+        use_cache: bool = True,
+        deep_think: bool = False,
+    ) -> Optional[LocateResultElement]:
+        """
+        投机式滚动定位: 依次向下滚动截 ``attempts`` 屏, 各屏的 AI 定位并发执行
+
+        按屏的先后顺序取第一个命中(与串行搜索结果一致), 取消其余仍在进行的
+        定位, 并把页面滚回命中的那一屏(元素坐标相对于该屏视口)。每屏的定位与
+        ``ai_locate`` 一致: 先查定位 memo, 按 ``deep_think`` 走 section-zoom;
+        命中后写回 memo, 并在滚回该屏后把元素 XPath 写入任务缓存。
+        """
+        if attempts < 1:
+            return None
+        memo = self.locate_memo if use_cache else None
+
+        async def _locate_frame(screenshot_b64: str, size: Size):
+            keys: List[str] = []
+            if memo is not None:
+                hit, keys = await self._lookup_locate_memo(
+                    prompt, screenshot_b64, deep_think
+                )
+                if hit is not None:
+                    return hit, []
+            located = await self._locate_in_frame(
+                prompt, screenshot_b64, size, deep_think, record_failure=False
+            )
+            return located, keys
+
+        async def _scroll_y() -> Optional[float]:
+            try:
+                value = await self.interface.evaluate_javascript("window.scrollY")
+            except Exception:  # noqa: BLE001
+                return None
+            return float(value) if isinstance(value, (int, float)) else None
+
+        frames: List[Tuple[str, Optional[float]]] = []
+        tasks: List["asyncio.Task"] = []
+        try:
+            for _ in range(attempts):
+                await self.interface.scroll('down', scroll_distance)
+                await asyncio.sleep(0.5)
+                screenshot_b64, size = await self._capture_ai_screenshot()
+                frames.append((screenshot_b64, await _scroll_y()))
+                tasks.append(asyncio.create_task(_locate_frame(screenshot_b64, size)))
+            logger.info(
+                f"Speculative scroll locate: {attempts} frame(s) in flight for '{prompt}'"
+            )
+
+            for index, task in enumerate(tasks):
+                try:
+                    located, memo_keys = await task
+                except Exception as exc:  # noqa: BLE001
+                    logger.debug(f"Speculative locate frame {index + 1} failed: {exc}")
+                    continue
+                if located is None:
+                    continue
+
+                # 滚回命中的那一屏: 有 scrollY 时精确还原, 否则按步数往回滚
+                hit_y = frames[index][1]
+                if hit_y is not None:
+                    await self.interface.evaluate_javascript(
+                        f"window.scrollTo(window.scrollX, {hit_y})"
+                    )
+                elif index < len(frames) - 1:
+                    await self.interface.scroll(
+                        'up', scroll_distance * (len(frames) - 1 - index)
+                    )
+                await asyncio.sleep(0.5)
+
+                rect, center = located
+                element = LocateResultElement(
+                    description=prompt, center=center, rect=rect
+                )
+                for key in memo_keys:
+                    memo.put(key, rect, center)
+                if use_cache and self.task_cache:
+                    # 坐标相对于命中那一屏的视口, 滚回之后才能按坐标取 XPath
+                    await self._cache_locate_xpaths(
+                        prompt, center, self.task_cache.match_locate_cache(prompt)
+                    )
+                if self.session_recorder:
+                    self.session_recorder.start_step("locate", prompt)
+                    self.session_recorder.record_screenshot_before(frames[index][0])
+                    self._record_element_location(element)
+                    self.session_recorder.complete_step("success")
+                logger.info(
+                    f"Element '{prompt}' found on speculative frame "
+                    f"{index + 1}/{attempts} at {center}"
+                )
+                return element
+            return None
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
     async def _scroll_element_into_view_after_locate(
         self,
         element: LocateResultElement
@@ -1348,24 +2186,25 @@ class Agent:
         if self.session_recorder:
             _click_group = self.session_recorder.start_group(f"ai_click: {prompt}")
 
-        # 开始记录步骤（SessionRecorder）
-        if self.session_recorder:
-            self.session_recorder.start_step("click", prompt)
-            # 获取操作前截图
-            screenshot_before = await self._capture_recording_screenshot()
-            self.session_recorder.record_screenshot_before(screenshot_before)
+        # 操作前截图与定位截图共用一帧, 定位结束后再记(命中 XPath 缓存时定位不截图)
+        async with self.reuse_screenshot():
+            # 开始记录步骤（SessionRecorder）
+            action_step = None
+            if self.session_recorder:
+                action_step = self.session_recorder.start_step("click", prompt)
 
-        # 开始记录任务（旧版兼容）
-        if self.recorder:
-            task = self.recorder.start_task("click", param=prompt)
+            # 开始记录任务（旧版兼容）
+            if self.recorder:
+                task = self.recorder.start_task("click", param=prompt)
 
-        # 🔑 使用滚动重试机制定位元素
-        if enable_scroll_retry:
-            element = await self.ai_locate_with_scroll_retry(
-                prompt, deep_think=deep_think
-            )
-        else:
-            element = await self.ai_locate(prompt, deep_think=deep_think)
+            # 🔑 使用滚动重试机制定位元素
+            if enable_scroll_retry:
+                element = await self.ai_locate_with_scroll_retry(
+                    prompt, deep_think=deep_think
+                )
+            else:
+                element = await self.ai_locate(prompt, deep_think=deep_think)
+            await self._resume_action_step(action_step)
 
         if not element:
             logger.error(f"Cannot locate element: {prompt}")
@@ -1379,29 +2218,16 @@ class Agent:
 
         # 记录元素位置
         if self.session_recorder:
-            rect = element.rect
-            bbox_tuple: Tuple[int, int, int, int] = (
-                int(rect['left']),
-                int(rect['top']),
-                int(rect['left'] + rect['width']),
-                int(rect['top'] + rect['height'])
-            )
-            center_tuple: Tuple[int, int] = (int(element.center[0]), int(element.center[1]))
-            self.session_recorder.record_element_location(
-                bbox=bbox_tuple,
-                center=center_tuple,
-                description=prompt,
-                draw_marker=True
-            )
+            self._record_element_location(element, prompt)
 
         # 点击中心点
         x, y = element.center
-        await self.interface.click(x, y)
+        async with self._get_dom_lock():
+            await self.interface.click(x, y)
 
         # 获取操作后截图
         if self.session_recorder:
-            screenshot_after = await self._capture_recording_screenshot()
-            self.session_recorder.record_screenshot_after(screenshot_after)
+            await self._record_screenshot_after()
             self.session_recorder.complete_step("success")
             # F4:收尾本次 click 分组
             if _click_group:
@@ -1443,23 +2269,25 @@ class Agent:
         if self.session_recorder:
             _input_group = self.session_recorder.start_group(f"ai_input: {prompt}")
 
-        # 开始记录步骤（SessionRecorder）
-        if self.session_recorder:
-            self.session_recorder.start_step("input", f"{prompt}: {text}")
-            screenshot_before = await self._capture_recording_screenshot()
-            self.session_recorder.record_screenshot_before(screenshot_before)
+        # 操作前截图与定位截图共用一帧, 定位结束后再记(命中 XPath 缓存时定位不截图)
+        async with self.reuse_screenshot():
+            # 开始记录步骤（SessionRecorder）
+            action_step = None
+            if self.session_recorder:
+                action_step = self.session_recorder.start_step("input", f"{prompt}: {text}")
 
-        # 开始记录任务（旧版兼容）
-        if self.recorder:
-            task = self.recorder.start_task("input", param={"prompt": prompt, "text": text})
+            # 开始记录任务（旧版兼容）
+            if self.recorder:
+                task = self.recorder.start_task("input", param={"prompt": prompt, "text": text})
 
-        # 🔑 使用滚动重试机制定位元素
-        if enable_scroll_retry:
-            element = await self.ai_locate_with_scroll_retry(
-                prompt, deep_think=deep_think
-            )
-        else:
-            element = await self.ai_locate(prompt, deep_think=deep_think)
+            # 🔑 使用滚动重试机制定位元素
+            if enable_scroll_retry:
+                element = await self.ai_locate_with_scroll_retry(
+                    prompt, deep_think=deep_think
+                )
+            else:
+                element = await self.ai_locate(prompt, deep_think=deep_think)
+            await self._resume_action_step(action_step)
 
         if not element:
             logger.error(f"Cannot locate element: {prompt}")
@@ -1474,20 +2302,20 @@ class Agent:
         # 点击并输入(M9: 支持 mode = replace / clear / append / typeOnly)
         x, y = element.center
         mode_normalised = (mode or "replace").strip().lower()
-        if mode_normalised == "clear":
-            # 只清空,不输入新内容
-            await self.interface.input_text("", x, y, clear_first=True)
-        elif mode_normalised in ("append", "typeonly"):
-            # 不清空,把 text 追加进去
-            await self.interface.input_text(text, x, y, clear_first=False)
-        else:
-            # replace (JS 默认)
-            await self.interface.input_text(text, x, y, clear_first=True)
+        async with self._get_dom_lock():
+            if mode_normalised == "clear":
+                # 只清空,不输入新内容
+                await self.interface.input_text("", x, y, clear_first=True)
+            elif mode_normalised in ("append", "typeonly"):
+                # 不清空,把 text 追加进去
+                await self.interface.input_text(text, x, y, clear_first=False)
+            else:
+                # replace (JS 默认)
+                await self.interface.input_text(text, x, y, clear_first=True)
 
         # 获取操作后截图
         if self.session_recorder:
-            screenshot_after = await self._capture_recording_screenshot()
-            self.session_recorder.record_screenshot_after(screenshot_after)
+            await self._record_screenshot_after()
             self.session_recorder.complete_step("success")
             if _input_group:
                 self.session_recorder.end_group(_input_group)
@@ -1500,6 +2328,273 @@ class Agent:
 
         return True
 
+    @staticmethod
+    async def _screenshot_phash(screenshot_b64: str) -> Optional[int]:
+        """在工作线程里计算截图的 dHash(解码 + 缩放不阻塞事件循环); 失败返回 None"""
+        from ..image_utils import dhash_b64
+        try:
+            return await asyncio.to_thread(dhash_b64, screenshot_b64)
+        except Exception as exc:  # noqa: BLE001
+            logger.debug(f"Screenshot dHash failed: {exc}")
+            return None
+
+    async def _locate_many(
+        self,
+        prompts: List[str],
+        screenshot_b64: str,
+        size: Size,
+        use_memo: bool = True,
+    ) -> List[Optional[Tuple[Dict[str, Any], Tuple[float, float]]]]:
+        """
+        在同一张截图上用 ``asyncio.gather`` 并发定位多个描述
+
+        整个并发阶段记为一个 locate 步骤(各次 AI 调用的 usage 都挂在它上面);
+        ``locate_memo`` 命中的描述不调 AI, 新结果写回 memo; 开启感知哈希层时
+        整批只算一次截图 dHash。单个描述失败时对应位置返回 None, 不影响其他描述。
+
+        Returns:
+            与 ``prompts`` 一一对应的 ``(rect, center)`` 或 None
+        """
+        config = self._get_model_config(INTENT_INSIGHT)
+        model_family = self._resolve_model_family(config)
+        img_width = int(size.get('width', 1280))
+        img_height = int(size.get('height', 800))
+        memo = self.locate_memo if use_memo else None
+        keys = [LocateMemo.make_key(prompt, screenshot_b64) for prompt in prompts]
+        hits: List[Optional[Tuple[Dict[str, Any], Tuple[float, float]]]] = [
+            memo.get(key, count_miss=not memo.perceptual) if memo is not None else None
+            for key in keys
+        ]
+
+        # 精确指纹有未命中时, 整批共用一次 dHash 查感知哈希层
+        perceptual_keys: List[Optional[str]] = [None] * len(prompts)
+        if memo is not None and memo.perceptual and None in hits:
+            phash = await self._screenshot_phash(screenshot_b64)
+            if phash is not None:
+                for index, prompt in enumerate(prompts):
+                    if hits[index] is None:
+                        perceptual_keys[index] = LocateMemo.make_perceptual_key(prompt, phash)
+                        hits[index] = memo.get(perceptual_keys[index])
+
+        async def _locate(index: int, prompt: str):
+            if hits[index] is not None:
+                return hits[index]
+            try:
+                located = await self._locate_element_in_image(
+                    prompt, screenshot_b64, img_width, img_height,
+                    0, 0, False, model_family, config, record_failure=False,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.warning(f"Concurrent locate failed for '{prompt}': {exc}")
+                return None
+            if located is not None and memo is not None:
+                memo.put(keys[index], *located)
+                if perceptual_keys[index] is not None:
+                    memo.put(perceptual_keys[index], *located)
+            return located
+
+        if self.session_recorder:
+            self.session_recorder.start_step("locate", " | ".join(prompts))
+            self.session_recorder.record_screenshot_before(screenshot_b64)
+
+        located = await asyncio.gather(
+            *(_locate(index, prompt) for index, prompt in enumerate(prompts))
+        )
+
+        if self.session_recorder:
+            self.session_recorder.complete_step("success")
+        return list(located)
+
+    async def _cache_locate_xpaths(
+        self,
+        prompt: str,
+        center: Tuple[float, float],
+        matched_locate_cache: Optional[MatchCacheResult] = None,
+    ) -> None:
+        """
+        把定位到的元素以 XPath 形式写入任务缓存(对齐 JS, 不存坐标)
+
+        跳过"第 3 行""最后一个"这类序数描述 —— 它们的 DOM 位置依赖当时的列表顺序,
+        缓存 XPath 会在 DOM 重排后错点(order-sensitive judge 的离线启发版)。
+        ``matched_locate_cache`` 为命中过但 XPath 失效的旧记录时原地更新它。
+        """
+        from ..ai_model.prompts import heuristic_is_order_sensitive as _is_ord
+        if _is_ord(prompt):
+            logger.debug(
+                f"Skipping locate cache for order-sensitive prompt: '{prompt}'"
+            )
+            return
+
+        # M1: 生成多条 XPath 候选,提高 DOM 小改动时的 cache 命中率
+        xpaths: List[str] = []
+        need_single = True
+        if hasattr(self.interface, "get_element_xpaths"):
+            try:
+                xpaths = await self.interface.get_element_xpaths(
+                    center[0], center[1]
+                ) or []
+                # 空列表说明该坐标处没有元素, 单条 XPath 也只会是 None,
+                # 不必再多一次页面往返
+                need_single = False
+            except Exception as exc:
+                logger.debug(f"get_element_xpaths failed: {exc}")
+        if need_single:
+            single = await self.interface.get_element_xpath(center[0], center[1])
+            if single:
+                xpaths = [single]
+        if not xpaths:
+            logger.warning(
+                f"Could not get XPath for element at {center}, cache not saved"
+            )
+            return
+
+        new_record = LocateCache(
+            type="locate",
+            prompt=prompt,
+            cache={"xpaths": xpaths},
+        )
+        if matched_locate_cache is not None:
+            # 命中过但 XPath 失效 → 原地更新旧记录
+            matched_locate_cache.update_fn(new_record)
+        else:
+            self.task_cache.append_cache(new_record)
+        logger.debug(
+            f"Cached {len(xpaths)} XPath(s) for '{prompt}': "
+            f"{xpaths[0][:80]}..."
+        )
+
+    async def ai_locate_batch(
+        self,
+        prompts: List[str],
+        use_cache: bool = True,
+    ) -> List[Optional[LocateResultElement]]:
+        """
+        基于同一张截图并发定位多个元素
+
+        N 次 AI 往返用 ``asyncio.gather`` 重叠执行(受 ``max_concurrency`` 限制),
+        墙钟时间接近单次定位。与逐个 ``ai_locate`` 不同, 这里不走 XPath 缓存和
+        deepThink, 适合同一屏上互不相关的多个元素。
+
+        Args:
+            prompts: 元素描述列表
+            use_cache: 是否使用进程内定位 memo
+
+        Returns:
+            与 ``prompts`` 一一对应的定位结果, 未找到的位置为 None
+        """
+        if not prompts:
+            return []
+        logger.info(f"AI Locate batch: {len(prompts)} prompt(s)")
+
+        screenshot_b64, size = await self._capture_ai_screenshot()
+        located = await self._locate_many(
+            list(prompts), screenshot_b64, size, use_memo=use_cache
+        )
+        return [
+            LocateResultElement(description=prompt, center=hit[1], rect=hit[0])
+            if hit is not None else None
+            for prompt, hit in zip(prompts, located)
+        ]
+
+    async def ai_locate_queued(self, prompt: str) -> Optional[LocateResultElement]:
+        """
+        提交一个定位请求, 与其他协程同时提交的请求合并执行
+
+        请求先进入微批队列, 攒满 8 条或 20ms 窗口到期后整批交给
+        ``ai_locate_batch``: 共用一次截图和一个报告步骤, AI 调用并发进行。
+        适合多个独立任务各自 ``await`` 定位、无法直接拼成一个列表的场景。
+
+        Args:
+            prompt: 元素描述
+
+        Returns:
+            定位结果或 None
+        """
+        if self._locate_batcher is None:
+            from .batcher import MicroBatcher
+            self._locate_batcher = MicroBatcher(
+                self.ai_locate_batch, max_batch=8, max_wait_ms=20
+            )
+        return await self._locate_batcher.submit(prompt)
+
+    async def ai_input_many(
+        self,
+        fields: Union[List[Tuple[str, str]], Dict[str, str]],
+        deep_think: bool = False,
+    ) -> bool:
+        """
+        并发定位多个互不相关的输入框,再依次输入
+
+        所有字段基于同一张截图用 ``asyncio.gather`` 并发调用 AI 定位(N 次往返
+        重叠为一次的墙钟时间),随后在页面写锁内按顺序输入,避免并发写 DOM。
+        某个字段并发定位失败时,回退到带滚动重试的 ``ai_input``。
+
+        每个字段的"操作前"截图是上一个字段的"操作后"截图(同一帧, 不额外截图);
+        并发定位到的元素照常把 XPath 写入任务缓存。并发定位阶段本身不读 XPath
+        缓存 —— 各字段都走 AI(或进程内定位 memo), 缓存只供之后的 ``ai_input`` /
+        ``ai_locate`` 命中。
+
+        Args:
+            fields: ``[(输入框描述, 文本), ...]`` 或 ``{输入框描述: 文本}``
+            deep_think: 传给回退路径的 ``ai_input``
+
+        Returns:
+            是否全部输入成功
+        """
+        items = list(fields.items()) if isinstance(fields, dict) else list(fields)
+        if not items:
+            return True
+
+        # 定位用的截图即第一个字段的"操作前"截图; 之后每次输入让它作废,
+        # 下一个字段复用上一个字段的"操作后"截图(或重新截一张)
+        async with self.reuse_screenshot():
+            screenshot_b64, size = await self._capture_ai_screenshot()
+            located = await self._locate_many(
+                [prompt for prompt, _ in items], screenshot_b64, size
+            )
+            logger.info(
+                f"AI input many: located {sum(1 for r in located if r)}/{len(items)} "
+                f"field(s) concurrently"
+            )
+
+            all_ok = True
+            for (prompt, text), hit in zip(items, located):
+                if hit is None:
+                    ok = await self.ai_input(prompt, text, deep_think=deep_think)
+                    all_ok = all_ok and bool(ok)
+                    continue
+
+                rect, center = hit
+                if self.task_cache:
+                    await self._cache_locate_xpaths(
+                        prompt, center, self.task_cache.match_locate_cache(prompt)
+                    )
+                if self.session_recorder:
+                    self.session_recorder.start_step("input", f"{prompt}: {text}")
+                    self.session_recorder.record_screenshot_before(
+                        await self._capture_recording_screenshot()
+                    )
+                    self._record_element_location(
+                        LocateResultElement(description=prompt, center=center, rect=rect)
+                    )
+
+                x, y = center
+                try:
+                    async with self._get_dom_lock():
+                        await self.interface.input_text(text, x, y, clear_first=True)
+                except Exception as exc:
+                    logger.error(f"Input to {prompt} failed: {exc}")
+                    if self.session_recorder:
+                        self.session_recorder.fail_step(str(exc))
+                    raise
+
+                if self.session_recorder:
+                    await self._record_screenshot_after()
+                    self.session_recorder.complete_step("success")
+                logger.info(f"Input to {prompt}: '{text}'")
+
+        return all_ok
+
     async def ai_query(
         self,
         data_demand: Union[Dict[str, str], str],
@@ -1562,7 +2657,9 @@ class Agent:
 
         # 解析 XML 响应
         try:
-            parsed = parse_xml_extraction_response(result["content"])
+            parsed = await self._parse_response(
+                parse_xml_extraction_response, result["content"]
+            )
             logger.info(f"Data extracted: {parsed['data']}")
 
             # M10: 成功时附加 after 截图 + 完成步骤
@@ -1662,7 +2759,15 @@ class Agent:
         # 调用 AI
         start_time = time.time()
         config = self._get_model_config(INTENT_INSIGHT)
-        result = await self._call_ai_with_config_async(messages, INTENT_INSIGHT)
+        format_token = (
+            _response_format.set(_ASSERT_RESPONSE_FORMAT)
+            if _structured_output_enabled() else None
+        )
+        try:
+            result = await self._call_ai_with_config_async(messages, INTENT_INSIGHT)
+        finally:
+            if format_token is not None:
+                _response_format.reset(format_token)
         elapsed_ms = (time.time() - start_time) * 1000
 
         # 记录 AI 使用信息
@@ -1673,10 +2778,8 @@ class Agent:
             self.recorder.record_ai_usage(usage_info)
 
         # 解析结果（先提取 JSON，处理模型返回 markdown 代码块的情况）
-        from ...shared.utils import safe_parse_json, extract_json_from_code_block
         raw_content = result["content"]
-        json_text = extract_json_from_code_block(raw_content)
-        response_data = safe_parse_json(json_text)
+        response_data = await self._parse_response(_parse_json_content, raw_content)
 
         # 必须是 dict —— 模型可能返回数组/标量(extract_json 现在能提取顶层
         # 数组), 直接 .get 会 AttributeError. 非 dict 一律按解析失败处理。
@@ -1711,6 +2814,111 @@ class Agent:
             return {"pass": False, "thought": thought, "message": error_msg}
         raise AssertionError(error_msg)
 
+    async def ai_query_assert(
+        self,
+        data_demand: Union[Dict[str, str], str],
+        assertion: str,
+        message: str = "",
+        keep_raw_response: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        提取数据并同时断言页面状态 —— 同一张截图、一次 AI 调用
+
+        等价于 ``ai_query(data_demand)`` 紧跟 ``ai_assert(assertion)``,但两者基于
+        同一帧截图合并为一个 prompt,模型只看一次图,省掉一次往返。
+
+        Args:
+            data_demand: 数据需求（字典或字符串）
+            assertion: 断言描述
+            message: 断言失败时的自定义错误消息
+            keep_raw_response: 与 ``ai_assert`` 一致,为 True 时断言失败不抛异常
+
+        Returns:
+            ``{"data": ..., "pass": bool, "thought": str, "message": str}``
+
+        Raises:
+            AssertionError: 仅在 keep_raw_response=False 且断言失败时
+        """
+        from ..ai_model.prompts import extract_and_assert_prompt
+
+        logger.info(f"AI Query+Assert: {data_demand} / '{assertion}'")
+
+        if self.session_recorder:
+            self.session_recorder.start_step(
+                "query", f"{str(data_demand)[:150]} | assert: {assertion[:50]}"
+            )
+        if self.recorder:
+            self.recorder.start_task(
+                "query", param={"dataDemand": data_demand, "assertion": assertion}
+            )
+
+        screenshot_b64, _ = await self._capture_ai_screenshot()
+        if self.session_recorder:
+            self.session_recorder.record_screenshot_before(screenshot_b64)
+        if self.recorder:
+            self.recorder.record_screenshot(ScreenshotItem(screenshot_b64), timing="before")
+
+        messages = self._build_messages(
+            system_prompt=system_prompt_to_extract(),
+            user_prompt=extract_and_assert_prompt(data_demand, assertion),
+            screenshot_b64=screenshot_b64
+        )
+
+        start_time = time.time()
+        config = self._get_model_config(INTENT_INSIGHT)
+        result = await self._call_ai_with_config_async(messages, INTENT_INSIGHT)
+        elapsed_ms = (time.time() - start_time) * 1000
+
+        if self.recorder and result.get('usage'):
+            usage_info = result['usage'].copy()
+            usage_info['time_cost'] = elapsed_ms / 1000
+            usage_info['model_name'] = config.model_name
+            self.recorder.record_ai_usage(usage_info)
+
+        try:
+            parsed = await self._parse_response(
+                parse_xml_extraction_response, result["content"]
+            )
+            unified = parsed.get("data")
+            if not isinstance(unified, dict) or "assertion_pass" not in unified:
+                raise ValueError("Missing assertion_pass in unified response")
+        except Exception as e:
+            logger.error(f"Failed to parse query+assert response: {e}")
+            if self.session_recorder:
+                self.session_recorder.fail_step(f"parse error: {e}")
+            if self.recorder:
+                self.recorder.finish_task(status="failed", error=e)
+            raise
+
+        passed = unified.get("assertion_pass") is True
+        thought = unified.get("reason") or parsed.get("thought", "")
+        error_msg = "" if passed else (
+            message or f"Assertion failed: {assertion}\nReason: {thought}"
+        )
+        output = {
+            "data": unified.get("data"),
+            "pass": passed,
+            "thought": thought,
+            "message": error_msg,
+        }
+
+        if passed:
+            logger.info(f"Data extracted: {output['data']}, assertion passed")
+            if self.session_recorder:
+                self.session_recorder.complete_step("success")
+            if self.recorder:
+                self.recorder.finish_task(status="finished", output=output)
+            return output
+
+        logger.error(error_msg)
+        if self.session_recorder:
+            self.session_recorder.fail_step(error_msg)
+        if self.recorder:
+            self.recorder.finish_task(status="failed", error=AssertionError(error_msg))
+        if keep_raw_response:
+            return output
+        raise AssertionError(error_msg)
+
     @staticmethod
     def _readable_time() -> str:
         """人类可读时间戳(对齐 JS getReadableTimeString,用于 replan 反馈消息)。"""
@@ -2245,8 +3453,7 @@ class Agent:
 
             # 记录完成
             if self.session_recorder:
-                screenshot_after = await self._capture_recording_screenshot()
-                self.session_recorder.record_screenshot_after(screenshot_after)
+                await self._record_screenshot_after()
                 self.session_recorder.complete_step("success")
 
             if self.recorder:
@@ -2269,6 +3476,49 @@ class Agent:
     # 别名，与 JS 版本的 aiAction 对齐
     ai_action = ai_act
 
+    async def ai_batch(
+        self,
+        steps: List[Dict[str, Any]],
+        use_cache: bool = True,
+        max_batch: int = 8,
+    ) -> bool:
+        """
+        批量执行多个自然语言动作 —— 合并为一次规划调用
+
+        ``steps`` 按顺序每 ``max_batch`` 条切成一批, 每批合并成一条按顺序执行的
+        ``ai_act`` 指令, N 个动作只需 ceil(N / max_batch) 次规划往返, 而不是 N 次
+        独立的定位调用。批次逐个执行, 某批失败即停止, 后续批次不再执行。
+
+        Args:
+            steps: 步骤列表, 每项是单键字典, 例如
+                ``{"click": "登录按钮"}`` / ``{"input": ("用户名输入框", "admin")}``
+                / ``{"hover": "菜单"}`` / ``{"act": "任意自然语言动作"}``
+            use_cache: 是否使用规划缓存
+            max_batch: 单次规划最多合并的步骤数
+
+        Returns:
+            所有批次是否都执行成功
+
+        Raises:
+            ValueError: 步骤格式不合法(在执行任何批次之前检查)
+        """
+        from .batcher import build_batch_prompt
+
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        # 先把所有批次的指令拼好: 格式错误在页面被改动之前就抛出
+        prompts = [
+            build_batch_prompt(steps[start:start + max_batch])
+            for start in range(0, len(steps), max_batch)
+        ]
+        for index, prompt in enumerate(prompts, 1):
+            if not await self.ai_act(prompt, use_cache=use_cache):
+                logger.error(
+                    f"AI batch stopped at batch {index}/{len(prompts)}"
+                )
+                return False
+        return True
+
     # ---------------------------------------------------------------
     # H9: JS agent 公开的附加动作 API —— Python 端补齐(别名 + 特化)
     # ---------------------------------------------------------------
@@ -2626,50 +3876,55 @@ class Agent:
             logger.info(f"Replaying cached plan: {len(actions)} actions")
 
             all_success = True
-            for i, action in enumerate(actions):
-                action_type = action.get("type", "")
-                param = action.get("param", {})
-                thought = action.get("thought", "")
-
-                step_label = (
-                    f"[cached {i + 1}/{len(actions)}] {action_type}"
-                    + (f" - {thought}" if thought else "")
-                )
-                logger.info(f"Replay action: {step_label}")
-
-                # 写入报告:per-action 步骤 + 前后截图
-                recorded = False
-                if self.session_recorder:
-                    try:
-                        self.session_recorder.start_step(
-                            action_type.lower() or "replay",
-                            step_label,
-                        )
-                        shot_before = await self._capture_recording_screenshot()
-                        self.session_recorder.record_screenshot_before(shot_before)
-                        recorded = True
-                    except Exception as exc:
-                        logger.debug(f"Session record start failed: {exc}")
-                        recorded = False
-
-                success = await self._execute_planned_action(action_type, param)
+            # 相邻动作之间页面没有被写过: 上一个动作的"操作后"截图与下一个动作的
+            # "操作前"截图是同一帧, 块内复用, 每个动作少截一次
+            async with self.reuse_screenshot():
+                for i, action in enumerate(actions):
+                    action_type = action.get("type", "")
+                    param = action.get("param", {})
+                    thought = action.get("thought", "")
+
+                    step_label = (
+                        f"[cached {i + 1}/{len(actions)}] {action_type}"
+                        + (f" - {thought}" if thought else "")
+                    )
+                    logger.info(f"Replay action: {step_label}")
 
-                if self.session_recorder and recorded:
-                    try:
-                        shot_after = await self._capture_recording_screenshot()
-                        self.session_recorder.record_screenshot_after(shot_after)
-                        if success:
-                            self.session_recorder.complete_step("success (cached)")
-                        else:
-                            self.session_recorder.fail_step(
-                                f"cached {action_type} failed"
+                    # 写入报告:per-action 步骤 + 前后截图
+                    recorded = False
+                    if self.session_recorder:
+                        try:
+                            self.session_recorder.start_step(
+                                action_type.lower() or "replay",
+                                step_label,
                             )
-                    except Exception as exc:
-                        logger.debug(f"Session record finish failed: {exc}")
+                            shot_before = await self._capture_recording_screenshot()
+                            self.session_recorder.record_screenshot_before(shot_before)
+                            recorded = True
+                        except Exception as exc:
+                            logger.debug(f"Session record start failed: {exc}")
+                            recorded = False
+
+                    success = await self._execute_planned_action(action_type, param)
+                    # Sleep / 页面自行跳转不经过 interface 写操作, 动作后一律重新截图
+                    self.invalidate_screenshot()
+
+                    if self.session_recorder and recorded:
+                        try:
+                            shot_after = await self._capture_recording_screenshot()
+                            self.session_recorder.record_screenshot_after(shot_after)
+                            if success:
+                                self.session_recorder.complete_step("success (cached)")
+                            else:
+                                self.session_recorder.fail_step(
+                                    f"cached {action_type} failed"
+                                )
+                        except Exception as exc:
+                            logger.debug(f"Session record finish failed: {exc}")
 
-                if not success:
-                    logger.warning(f"Replay action failed: {action_type}")
-                    all_success = False
+                    if not success:
+                        logger.warning(f"Replay action failed: {action_type}")
+                        all_success = False
 
             return all_success
 
@@ -3043,6 +4298,8 @@ class Agent:
                 break
 
             check_start = time.time()
+            # 轮询就是在等页面变化, 每轮都要新截图
+            self.invalidate_screenshot()
             try:
                 # keep_raw_response:断言失败不抛 —— 只有 AI 调用真正出错才抛
                 result = await self.ai_assert(assertion, keep_raw_response=True)
@@ -3128,8 +4385,7 @@ class Agent:
             )
 
             if self.session_recorder:
-                screenshot_after = await self._capture_recording_screenshot()
-                self.session_recorder.record_screenshot_after(screenshot_after)
+                await self._record_screenshot_after()
                 self.session_recorder.complete_step("success")
 
             return True
@@ -3242,7 +4498,10 @@ class Agent:
     def get_cache_stats(self) -> Optional[Dict[str, Any]]:
         """获取缓存统计信息"""
         if self.task_cache:
-            return self.task_cache.get_stats()
+            stats = self.task_cache.get_stats()
+            if self.locate_memo is not None:
+                stats["locate_memo"] = self.locate_memo.get_stats()
+            return stats
         return None
 
     def flush_cache(self, clean_unused: bool = False) -> None:
@@ -3253,20 +4512,71 @@ class Agent:
         """
         if self.task_cache:
             self.task_cache._flush_cache_to_file(clean_unused=clean_unused)
+        if self.locate_memo is not None:
+            self.locate_memo.save()
 
-    def finish(self) -> Optional[str]:
+    def finish(self, background: bool = False) -> Optional[str]:
         """
         结束会话并生成报告
 
+        Args:
+            background: 为 True 且在事件循环中调用时,报告改到线程池里渲染,
+                本方法立即返回 None;之后用 ``await agent.await_report()``
+                取报告路径(可先关浏览器,把序列化耗时藏在收尾阶段里)
+
         Returns:
             报告文件路径（如果启用了记录）
         """
+        if background:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is not None:
+                if self._report_future is None:
+                    self._report_future = loop.create_task(
+                        self._render_report_async()
+                    )
+                return None
+        if self._report_future is not None and self._report_future.done():
+            return self._report_future.result()
+        if self._recording_tasks:
+            logger.warning(
+                f"{len(self._recording_tasks)} background after-screenshot(s) "
+                f"still pending; await agent.flush_recording() before finish()"
+            )
+        return self._render_report()
+
+    def _render_report(self) -> Optional[str]:
+        """落盘定位缓存并生成报告(finish 的同步实现)"""
+        if self.task_cache:
+            self.task_cache.flush_pending()
+        if self.locate_memo is not None:
+            self.locate_memo.save()
         if self.session_recorder:
             report_path = self.session_recorder.finish()
             logger.info(f"Session finished, report saved to: {report_path}")
             return report_path
         return None
 
+    async def _render_report_async(self) -> Optional[str]:
+        """等后台截图完成后在线程池里渲染报告"""
+        await self.flush_recording()
+        return await asyncio.to_thread(self._render_report)
+
+    async def await_report(self) -> Optional[str]:
+        """
+        等待 ``finish(background=True)`` 启动的报告渲染完成
+
+        未在后台启动时直接在工作线程里执行 finish。
+
+        Returns:
+            报告文件路径（如果启用了记录）
+        """
+        if self._report_future is None:
+            return await self._render_report_async()
+        return await self._report_future
+
     def save_report(self) -> Optional[str]:
         """
         手动保存报告
@@ -3295,7 +4605,15 @@ class Agent:
             if self.session_recorder.current_step:
                 self.session_recorder.fail_step(str(exc_val))
 
-        self.finish()
+        try:
+            await self.flush_recording()
+            if self.task_cache:
+                await self.task_cache.flush()
+            # 报告组装(base64 截图 + 标记绘制 + JSON 序列化)放进工作线程,
+            # 不阻塞同一事件循环上其它 agent 的请求
+            await self.await_report()
+        finally:
+            self.close()
         return False
 
 
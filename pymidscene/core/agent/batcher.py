@@ -0,0 +1,162 @@
+"""
+动作批处理 (batching)
+
+把多条自然语言动作(click / input / hover ...)合并成一条规划指令, 只触发一次
+``ai_act`` 规划调用, 而不是每个动作各自一次 LLM 往返。
+
+典型用法见 ``Agent.ai_batch`` / ``PlaywrightAgent.ai_batch``:
+
+    await agent.ai_batch([
+        {"click": "搜索输入框"},
+        {"input": ("搜索框", "PyMidscene")},
+        {"click": "百度一下按钮"},
+    ])
+
+``MicroBatcher`` 是短时间窗口内的微批队列: 每个提交项拿到自己的结果。
+``Agent.ai_locate_queued`` 用它把多个协程各自发起的定位合并到同一张截图上并发执行。
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from ...shared.logger import logger
+
+
+# 单步动作 -> 自然语言模板; input 类动作的值是 (描述, 文本) 二元组
+_STEP_TEMPLATES: Dict[str, str] = {
+    "click": "点击「{0}」",
+    "tap": "点击「{0}」",
+    "hover": "鼠标悬停在「{0}」上",
+    "double_click": "双击「{0}」",
+    "right_click": "右键点击「{0}」",
+    "keyboard_press": "按下键盘按键「{0}」",
+    "input": "在「{0}」中输入「{1}」",
+}
+
+
+def describe_step(step: Dict[str, Any]) -> str:
+    """
+    把单个批处理步骤转换为一句自然语言指令
+
+    Args:
+        step: 形如 ``{"click": "登录按钮"}`` / ``{"input": ("用户名输入框", "admin")}``
+            / ``{"act": "任意自然语言动作"}`` 的单键字典
+
+    Returns:
+        自然语言描述
+
+    Raises:
+        ValueError: 步骤格式不合法或动作类型不支持
+    """
+    if not isinstance(step, dict) or len(step) != 1:
+        raise ValueError(f"Batch step must be a single-key dict, got: {step!r}")
+
+    kind, value = next(iter(step.items()))
+    if kind in ("act", "action"):
+        return str(value)
+
+    template = _STEP_TEMPLATES.get(kind)
+    if template is None:
+        raise ValueError(
+            f"Unsupported batch step type: {kind!r}. "
+            f"Supported: {', '.join(sorted(_STEP_TEMPLATES))}, act"
+        )
+
+    if kind == "input":
+        if not isinstance(value, (tuple, list)) or len(value) != 2:
+            raise ValueError(
+                f"'input' step expects (description, text), got: {value!r}"
+            )
+        return template.format(value[0], value[1])
+    return template.format(value)
+
+
+def build_batch_prompt(steps: List[Dict[str, Any]]) -> str:
+    """把多个步骤合并为一条按顺序执行的规划指令"""
+    lines = [f"{i}. {describe_step(step)}" for i, step in enumerate(steps, 1)]
+    if len(lines) == 1:
+        return lines[0][3:]
+    return "按顺序依次完成以下操作:\n" + "\n".join(lines)
+
+
+class MicroBatcher:
+    """
+    asyncio 微批处理器
+
+    ``submit()`` 提交的项先进入队列; 队列攒满 ``max_batch`` 条或距离第一条
+    入队超过 ``max_wait_ms`` 毫秒时, 整批交给 ``flush_fn`` 一次性执行。
+    ``flush_fn`` 返回与批次等长的列表, 第 i 个结果交给第 i 个调用方。
+    批次之间不排队, 只适合只读操作(定位); UI 动作的保序由调用方负责。
+    """
+
+    def __init__(
+        self,
+        flush_fn: Callable[[List[Any]], Awaitable[Any]],
+        max_batch: int = 8,
+        max_wait_ms: float = 10,
+    ):
+        if max_batch < 1:
+            raise ValueError("max_batch must be >= 1")
+        self._flush_fn = flush_fn
+        self.max_batch = max_batch
+        self.max_wait_ms = max_wait_ms
+        self._pending: List[Tuple[Any, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    def _resolve(self, batch: List[Tuple[Any, asyncio.Future]], result: Any) -> None:
+        """把批次结果分发给各调用方"""
+        if not isinstance(result, list) or len(result) != len(batch):
+            exc = ValueError(
+                f"flush_fn must return {len(batch)} result(s), got: {result!r}"
+            )
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), item_result in zip(batch, result):
+            if not future.done():
+                future.set_result(item_result)
+
+    async def submit(self, item: Any) -> Any:
+        """提交一项, 等待其所在批次执行完成并返回该项的结果"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+
+        if len(self._pending) >= self.max_batch:
+            self._schedule_flush(loop)
+        elif self._timer is None:
+            self._timer = loop.call_later(
+                self.max_wait_ms / 1000, self._schedule_flush, loop
+            )
+        return await future
+
+    def _schedule_flush(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        batch = self._pending[: self.max_batch]
+        self._pending = self._pending[self.max_batch:]
+        loop.create_task(self._run_batch(batch))
+        # 超出 max_batch 的剩余步骤立即进入下一批
+        if self._pending:
+            self._schedule_flush(loop)
+
+    async def _run_batch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        items = [item for item, _ in batch]
+        logger.debug(f"Flushing {type(self).__name__}: {len(items)} item(s)")
+        try:
+            result = await self._flush_fn(items)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._resolve(batch, result)
+
+
+__all__ = ["MicroBatcher", "build_batch_prompt", "describe_step"]
@@ -4,18 +4,44 @@
 提供基于 YAML 的缓存系统，用于缓存 AI 的规划和定位结果。
 """
 
-from typing import Optional, Dict, Any, List, Callable, Literal, Set
+from typing import Optional, Dict, Any, List, Callable, Literal, Set, Tuple, Deque
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
+import asyncio
 import hashlib
 import os
-import re as _re
+import threading
 import yaml
 import json
 
 from ...shared.logger import logger
 from ...shared.utils import calculate_hash
 
+try:  # PyYAML 带 libyaml 时用 C 实现的解析/输出(大缓存文件快数倍)
+    from yaml import CSafeDumper as _YamlDumper, CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper, SafeLoader as _YamlLoader
+
+try:  # 可选加速: 定位 memo 以 msgpack 落盘(`pip install "pymidscene[speedups]"`)
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+try:  # 可选加速: 结构化 prompt 的比较键用 orjson 序列化
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:  # 可选加速: 截图摘要用 xxh3(比 sha1 快一个数量级)
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
 
 # 与 JS task-cache.ts:49 对齐 —— JS 会拒绝低于此版本的缓存记录.
 # 写入时以此为下限,使 Python 产出的缓存可以被 JS 读取.
@@ -86,6 +112,43 @@ CacheType = Literal["plan", "locate"]
 CacheStrategy = Literal["read-only", "read-write", "write-only"]
 
 
+# 对齐 JS replaceIllegalPathCharsAndSpace 的 /[:*?"<>|# ]/g -> '-'; 单趟 translate
+_CACHE_ID_TRANS = str.maketrans(dict.fromkeys(':*?"<>|# ', "-"))
+
+
+def _write_file_atomic(path: Path, payload: bytes) -> None:
+    """
+    一次 write 写出整个文件, 再 ``os.replace`` 换上
+
+    先写同目录下的临时文件: 进程中途退出或后台线程写到一半时, 原文件保持完整,
+    读方(包括 JS 端)不会读到截断的缓存。临时文件名带 pid, 多进程互不干扰。
+    """
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _prompt_key(prompt: str | Dict[str, Any]) -> str:
+    """
+    prompt 的比较键: 字符串原样, 结构化 prompt 按键排序后序列化
+
+    键只在进程内比较、不落盘, 因此 orjson 与标准库两种输出格式不必一致。
+    """
+    if isinstance(prompt, str):
+        return prompt
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(prompt, option=orjson.OPT_SORT_KEYS).decode("utf-8")
+        except TypeError:  # 非字符串键等 orjson 不接受的结构
+            pass
+    return json.dumps(prompt, sort_keys=True)
+
+
 @dataclass
 class PlanningCache:
     """规划缓存"""
@@ -121,7 +184,11 @@ class TaskCache:
     """任务缓存管理器"""
 
     CACHE_FILE_EXT = ".cache.yaml"
+    # 定位 memo 是 Python 专有文件, 装了 msgpack 时用更紧凑的二进制格式
+    LOCATE_MEMO_FILE_EXT = ".locate-memo.mpk" if HAS_MSGPACK else ".locate-memo.json"
     DEFAULT_CACHE_MAX_FILENAME_LENGTH = 200
+    # 事件循环里的写入先合并这么久(秒)再在工作线程里落盘
+    DEFAULT_FLUSH_DELAY = 0.5
     # 写入时使用的 midsceneVersion,需保证 >= JS 最低支持版本 (0.16.10)
     MIDSCENE_VERSION = _resolve_midscene_version()
 
@@ -132,6 +199,7 @@ class TaskCache:
         cache_file_path: Optional[str] = None,
         strategy: CacheStrategy = "read-write",
         cache_dir: Optional[str] = None,
+        flush_delay: Optional[float] = DEFAULT_FLUSH_DELAY,
     ):
         """
         初始化任务缓存
@@ -142,6 +210,9 @@ class TaskCache:
             cache_file_path: 缓存文件路径（可选）
             strategy: 缓存策略（read-only, read-write, write-only）
             cache_dir: 缓存目录（可选）
+            flush_delay: 在事件循环中新增/更新记录时, 合并这段时间内的写入后
+                在工作线程里落盘, 不阻塞定位; None 表示每次都同步写。
+                没有运行中的事件循环时总是同步写
         """
         if not cache_id:
             raise ValueError("cache_id is required")
@@ -179,6 +250,11 @@ class TaskCache:
             cache_dir_path.mkdir(parents=True, exist_ok=True)
             self.cache_file_path = cache_dir_path / f"{self.cache_id}{self.CACHE_FILE_EXT}"
 
+        # 进程内定位 LRU 的落盘文件(与 .cache.yaml 同目录, Python 专有)
+        self.locate_memo_path = self.cache_file_path.with_name(
+            f"{self.cache_id}{self.LOCATE_MEMO_FILE_EXT}"
+        )
+
         # 加载或初始化缓存.
         # - read-only / read-write:载入已有文件,`match_cache` 能从中匹配
         # - write-only:不载入(匹配逻辑也不会拿到旧记录,`is_cache_result_used=False`),
@@ -198,8 +274,22 @@ class TaskCache:
         self.cache = cache_content
         self.cache_original_length = len(self.cache.caches) if self.is_cache_result_used else 0
 
-        # 跟踪已匹配的缓存记录
-        self.matched_cache_indices: Set[str] = set()
+        # 跟踪已匹配的缓存记录(原始记录的下标)
+        self.matched_cache_indices: Set[int] = set()
+        # (type, prompt) -> 尚未命中的原始记录下标(按文件顺序);
+        # 同一 prompt 的多条记录依次取用, 与线性扫描"第一个未使用"的语义一致
+        self._match_index: Dict[Tuple[str, str], Deque[int]] = {}
+        for i in range(self.cache_original_length):
+            item = self.cache.caches[i]
+            self._match_index.setdefault(
+                (item.type, _prompt_key(item.prompt)), deque()
+            ).append(i)
+
+        # 延迟落盘状态: _dirty 表示内存里有未写出的改动
+        self.flush_delay = flush_delay
+        self._dirty = False
+        self._flush_task: Optional[asyncio.Task] = None
+        self._write_lock = threading.Lock()
 
         logger.debug(
             f"TaskCache initialized: id={self.cache_id}, "
@@ -215,7 +305,7 @@ class TaskCache:
         字符集与替换符必须与 JS 完全一致, 否则同一 cache_id 在两种语言下
         生成不同文件名. (JS 有意保留路径分隔符, 这里照搬.)
         """
-        return _re.sub(r'[:*?"<>|# ]', "-", cache_id)
+        return cache_id.translate(_CACHE_ID_TRANS)
 
     def match_cache(
         self,
@@ -236,59 +326,44 @@ class TaskCache:
             return None
 
         # 将 prompt 转换为字符串用于比较
-        prompt_str = prompt if isinstance(prompt, str) else json.dumps(prompt, sort_keys=True)
-
-        # 查找第一个未使用的匹配缓存
-        for i in range(self.cache_original_length):
-            item = self.cache.caches[i]
-            key = f"{cache_type}:{prompt_str}:{i}"
+        prompt_str = _prompt_key(prompt)
 
-            # 检查类型和 prompt 是否匹配，且未被使用
-            item_prompt_str = (
-                item.prompt if isinstance(item.prompt, str)
-                else json.dumps(item.prompt, sort_keys=True)
+        # 取第一个未使用的匹配缓存
+        pending = self._match_index.get((cache_type, prompt_str))
+        if not pending:
+            logger.debug(
+                f"No cache found: type={cache_type}, prompt={prompt_str[:50]}..."
             )
+            return None
+        i = pending.popleft()
+        item = self.cache.caches[i]
+        # 标记为已使用
+        self.matched_cache_indices.add(i)
 
-            if (
-                item.type == cache_type
-                and item_prompt_str == prompt_str
-                and key not in self.matched_cache_indices
-            ):
-                # 标记为已使用
-                self.matched_cache_indices.add(key)
-
-                logger.debug(
-                    f"Cache found: type={cache_type}, "
-                    f"prompt={prompt_str[:50]}..., "
-                    f"index={i}"
-                )
-
-                # 创建更新函数
-                def update_fn(cache_item: PlanningCache | LocateCache) -> None:
-                    """更新缓存项"""
-                    logger.debug(
-                        f"Updating cache: type={cache_type}, "
-                        f"prompt={prompt_str[:50]}..., "
-                        f"index={i}"
-                    )
+        logger.debug(
+            f"Cache found: type={cache_type}, "
+            f"prompt={prompt_str[:50]}..., "
+            f"index={i}"
+        )
 
-                    # 更新缓存内容
-                    self.cache.caches[i] = cache_item
+        return MatchCacheResult(
+            cache_content=item,
+            update_fn=partial(self._update_cache_at, i),
+        )
 
-                    if self.read_only_mode:
-                        logger.debug("Read-only mode: cache updated in memory only")
-                        return
+    def _update_cache_at(self, index: int, cache_item: PlanningCache | LocateCache) -> None:
+        """原地替换第 ``index`` 条记录(``MatchCacheResult.update_fn`` 的实现)"""
+        logger.debug(f"Updating cache: type={cache_item.type}, index={index}")
 
-                    # 写入文件
-                    self._flush_cache_to_file()
+        # 更新缓存内容
+        self.cache.caches[index] = cache_item
 
-                return MatchCacheResult(
-                    cache_content=item,
-                    update_fn=update_fn
-                )
+        if self.read_only_mode:
+            logger.debug("Read-only mode: cache updated in memory only")
+            return
 
-        logger.debug(f"No cache found: type={cache_type}, prompt={prompt_str[:50]}...")
-        return None
+        # 写入文件
+        self._schedule_flush()
 
     def match_plan_cache(self, prompt: str) -> Optional[MatchCacheResult]:
         """匹配规划缓存"""
@@ -315,7 +390,40 @@ class TaskCache:
             logger.debug("Read-only mode: cache appended to memory only")
             return
 
-        self._flush_cache_to_file()
+        self._schedule_flush()
+
+    def _schedule_flush(self) -> None:
+        """落盘缓存; 事件循环里改为合并写入, 由后台任务在工作线程里完成"""
+        if self.flush_delay is None:
+            self._flush_cache_to_file()
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._flush_cache_to_file()
+            return
+        self._dirty = True
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = loop.create_task(self._flush_later())
+
+    async def _flush_later(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_delay or 0)
+        except asyncio.CancelledError:
+            # 事件循环收尾时被取消: 同步写完再退出, 不丢记录
+            self.flush_pending()
+            raise
+        await self.flush()
+
+    async def flush(self) -> None:
+        """在工作线程里写出尚未落盘的改动(``async with`` 退出时 Agent 自动调用)"""
+        while self._dirty:
+            await asyncio.to_thread(self._flush_cache_to_file)
+
+    def flush_pending(self) -> None:
+        """同步写出尚未落盘的改动"""
+        if self._dirty:
+            self._flush_cache_to_file()
 
     def _load_cache_from_file(self) -> Optional[CacheFileContent]:
         """从文件加载缓存"""
@@ -325,7 +433,7 @@ class TaskCache:
 
         try:
             with open(self.cache_file_path, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=_YamlLoader)
 
             if not data:
                 return None
@@ -394,27 +502,26 @@ class TaskCache:
         """
         将缓存写入文件
 
+        可能在工作线程里执行(见 ``flush_delay``), 写入过程持锁串行。
+
         Args:
             clean_unused: 是否清理未使用的缓存
         """
+        self._dirty = False
         if not self.cache_file_path:
             logger.debug("No cache file path, will not write cache")
             return
 
+        with self._write_lock:
+            self._write_cache_file(clean_unused)
+
+    def _write_cache_file(self, clean_unused: bool) -> None:
+        """``_flush_cache_to_file`` 的实现(调用方持有写锁)"""
         # 清理未使用的缓存
         if clean_unused and self.is_cache_result_used:
             original_length = len(self.cache.caches)
 
-            # 收集已使用的索引
-            used_indices = set()
-            for key in self.matched_cache_indices:
-                # key 格式: "type:prompt:index"
-                parts = key.split(":")
-                try:
-                    index = int(parts[-1])
-                    used_indices.add(index)
-                except (ValueError, IndexError):
-                    pass
+            used_indices = self.matched_cache_indices
 
             # 过滤：保留已使用的缓存和新添加的缓存
             self.cache.caches = [
@@ -432,12 +539,14 @@ class TaskCache:
         # write-only 模式:flush 前先从磁盘读回旧记录,和内存里新增的合并后再写.
         # 对齐 JS `updateOrAppendCacheRecord` —— 保证 write-only 不会把别的进程或
         # 上一轮写的旧记录覆盖丢失.
+        # 先取快照: 后台写入期间事件循环线程仍可能继续 append
+        records = list(self.cache.caches)
         merged_records: list[PlanningCache | LocateCache] = []
         if self.write_only_mode and self.cache_file_path.exists():
             existing = self._load_cache_from_file()
             if existing and existing.caches:
                 merged_records.extend(existing.caches)
-        merged_records.extend(self.cache.caches)
+        merged_records.extend(records)
 
         # 转换为可序列化的字典(与 JS 版本对齐:midsceneVersion)
         data = {
@@ -462,14 +571,14 @@ class TaskCache:
 
         # 写入 YAML 文件
         try:
-            with open(self.cache_file_path, 'w', encoding='utf-8') as f:
-                yaml.dump(
-                    data,
-                    f,
-                    default_flow_style=False,
-                    allow_unicode=True,
-                    sort_keys=False
-                )
+            payload = yaml.dump(
+                data,
+                Dumper=_YamlDumper,
+                default_flow_style=False,
+                allow_unicode=True,
+                sort_keys=False,
+            )
+            _write_file_atomic(self.cache_file_path, payload.encode("utf-8"))
 
             logger.debug(
                 f"Cache flushed to file: {self.cache_file_path}, "
@@ -480,7 +589,8 @@ class TaskCache:
                 # 已落盘的增量必须从内存清掉:write-only 每次 flush 都会从
                 # 磁盘读回旧记录再合并,内存里留着已写过的记录会让它们
                 # 在下一次 flush 时再次拼接 → 指数级重复.
-                self.cache.caches = []
+                # 只删快照里写过的部分, 写入期间新 append 的留给下一次.
+                del self.cache.caches[:len(records)]
 
         except Exception as e:
             logger.error(f"Failed to write cache file: {self.cache_file_path}, error: {e}")
@@ -510,8 +620,155 @@ class TaskCache:
         )
 
 
+# 最近一帧的 (截图 str 对象, 指纹)。同一帧常被多次取键(批量定位每个 prompt
+# 一次、感知层回填), 按对象身份命中, 不再扫描整张截图; 只引用这一帧
+_last_frame_digest: Optional[Tuple[str, str]] = None
+
+
+def _frame_digest(screenshot_b64: str) -> str:
+    global _last_frame_digest
+    cached = _last_frame_digest
+    if cached is not None and cached[0] is screenshot_b64:
+        return cached[1]
+    data = screenshot_b64.encode("ascii")
+    if HAS_XXHASH:
+        digest = "x" + xxhash.xxh3_128_hexdigest(data)
+    else:
+        digest = hashlib.sha1(data).hexdigest()
+    _last_frame_digest = (screenshot_b64, digest)
+    return digest
+
+
+class LocateMemo:
+    """
+    进程内定位结果 LRU 缓存: ``(截图指纹, prompt) -> (rect, center)``
+
+    与 ``TaskCache`` 的 XPath 缓存互补 —— XPath 缓存跨 DOM 变化复用, 这里则在
+    "同一帧画面、同一描述"的重复定位上直接返回上次结果, 完全跳过 AI 调用。
+    截图指纹覆盖了页面环境(URL/DOM/滚动位置的任何可见变化都会改变它)。
+
+    可选 ``persist_path``: 以 JSON 落盘, 跨运行复用(Python 专有, 不进 JS 的
+    ``.cache.yaml``)。
+
+    可选 ``perceptual``: 精确指纹未命中时再按 ``(dHash(截图), prompt)`` 查一次,
+    画面只有肉眼不可见的差异(光标闪烁 / 编码噪点 / 重新访问同一页面)时也能
+    复用结果。dHash 对细微文字变化不敏感, 可能复用到过期坐标, 因此默认关闭。
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        persist_path: Optional[Path] = None,
+        read_only: bool = False,
+        perceptual: bool = False,
+    ):
+        self.maxsize = maxsize
+        self.persist_path = Path(persist_path) if persist_path else None
+        self.read_only = read_only
+        self.perceptual = perceptual
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if self.persist_path:
+            self._load()
+
+    @staticmethod
+    def make_key(prompt: str, screenshot_b64: str, deep_think: bool = False) -> str:
+        """构造缓存键: 截图摘要 + prompt (+ deepThink 标记)"""
+        return f"{_frame_digest(screenshot_b64)}:{int(deep_think)}:{prompt}"
+
+    @staticmethod
+    def make_perceptual_key(
+        prompt: str, phash: int, deep_think: bool = False
+    ) -> str:
+        """构造感知哈希缓存键: dHash + prompt (+ deepThink 标记)"""
+        return f"p{phash:016x}:{int(deep_think)}:{prompt}"
+
+    def get(
+        self, key: str, count_miss: bool = True
+    ) -> Optional[Tuple[Dict[str, Any], Tuple[float, float]]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            if count_miss:
+                self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return dict(entry["rect"]), (entry["center"][0], entry["center"][1])
+
+    def put(
+        self, key: str, rect: Dict[str, Any], center: Tuple[float, float]
+    ) -> None:
+        self._entries[key] = {"rect": dict(rect), "center": [center[0], center[1]]}
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        self._dirty = True
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._dirty = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self) -> None:
+        path = self.persist_path
+        if not path.exists():
+            # 切换 msgpack / JSON 后第一次运行: 读另一种格式的旧文件
+            legacy = path.with_suffix(".json" if path.suffix == ".mpk" else ".mpk")
+            if not legacy.exists():
+                return
+            path = legacy
+        try:
+            raw = path.read_bytes()
+            # JSON 以 "{" 开头, msgpack 顶层 map 不会以 0x7b 开头
+            if raw[:1] != b"{" and HAS_MSGPACK:
+                data = msgpack.unpackb(raw, raw=False)
+            else:
+                data = json.loads(raw.decode("utf-8"))
+            for key, entry in (data.get("entries") or {}).items():
+                self._entries[key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            logger.debug(
+                f"Locate memo loaded: {self.persist_path}, entries={len(self._entries)}"
+            )
+        except Exception as e:
+            logger.warning(f"Failed to load locate memo: {path}, error: {e}")
+
+    def save(self) -> None:
+        """
+        有新增记录时落盘(未配置 persist_path 则忽略)
+
+        ``.mpk`` 路径且装了 msgpack 时写 msgpack, 否则写 JSON。
+        """
+        if not self.persist_path or not self._dirty or self.read_only:
+            return
+        try:
+            self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+            payload = {"entries": self._entries}
+            if HAS_MSGPACK and self.persist_path.suffix == ".mpk":
+                data = msgpack.packb(payload, use_bin_type=True)
+            else:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            _write_file_atomic(self.persist_path, data)
+            self._dirty = False
+        except Exception as e:
+            logger.error(f"Failed to write locate memo: {self.persist_path}, error: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
 __all__ = [
     "TaskCache",
+    "LocateMemo",
     "PlanningCache",
     "LocateCache",
     "MatchCacheResult",
@@ -4,7 +4,15 @@ AI 模型集成模块
 提供统一的 AI 模型调用接口和各种模型的适配器。
 """
 
-from .service_caller import call_ai, ModelConfig
+from .service_caller import (
+    call_ai,
+    call_ai_async,
+    call_ai_batch,
+    close_chat_clients,
+    fetch_batch,
+    submit_batch,
+    ModelConfig,
+)
 from .models.qwen import QwenVLModel
 from .models.doubao import DoubaoVisionModel
 from .models.base import BaseAIModel
@@ -19,6 +27,11 @@ from .prompts import (
 __all__ = [
     # Service caller
     "call_ai",
+    "call_ai_async",
+    "call_ai_batch",
+    "close_chat_clients",
+    "submit_batch",
+    "fetch_batch",
     "ModelConfig",
     # Models
     "QwenVLModel",
@@ -6,12 +6,12 @@
 """
 
 import os
-import re
 from typing import List, Dict, Any, Optional, Tuple
-from openai import OpenAI
 
 from .base import BaseAIModel
+from ..service_caller import ModelConfig, create_chat_client
 from ....shared.logger import logger
+from ....shared.utils import preprocess_doubao_bbox_json
 
 
 class DoubaoVisionModel(BaseAIModel):
@@ -31,11 +31,11 @@ class DoubaoVisionModel(BaseAIModel):
 
     DEFAULT_BASE_URL = "https://ark.cn-beijing.volces.com/api/v3"
 
-    SUPPORTED_MODELS = [
+    SUPPORTED_MODELS = frozenset({
         "doubao-vision",
         "vlm-ui-tars-doubao",
         "vlm-ui-tars-doubao-1.5",
-    ]
+    })
 
     # 豆包使用 0-1000 归一化坐标系统
     COORDINATE_SCALE = 1000
@@ -60,7 +60,7 @@ class DoubaoVisionModel(BaseAIModel):
         """
         if model_name not in self.SUPPORTED_MODELS:
             logger.warning(
-                f"Model {model_name} not in supported list: {self.SUPPORTED_MODELS}. "
+                f"Model {model_name} not in supported list: {sorted(self.SUPPORTED_MODELS)}. "
                 f"Will try to use it anyway."
             )
 
@@ -83,10 +83,13 @@ class DoubaoVisionModel(BaseAIModel):
                 "Doubao endpoint ID is required. Set MIDSCENE_DOUBAO_MODEL_NAME or pass endpoint_id."
             )
 
-        # 初始化 OpenAI 客户端（豆包兼容 OpenAI API）
-        self.client = OpenAI(
+        # 豆包兼容 OpenAI API; 相同 api_key/base_url 的实例共用同一个客户端(连接池),
+        # 不再每次实例化都重新握手 TLS。timeout 沿用 OpenAI SDK 默认的 600 秒
+        self._client_config = ModelConfig(
+            model_name=self.endpoint_id,
+            base_url=self.base_url,
             api_key=self.api_key,
-            base_url=self.base_url
+            timeout=600_000,
         )
 
         logger.info(
@@ -94,6 +97,11 @@ class DoubaoVisionModel(BaseAIModel):
             f"endpoint={self.endpoint_id}"
         )
 
+    @property
+    def client(self):
+        """共享的 OpenAI 客户端; 每次从缓存取, 缓存淘汰并关闭旧客户端后仍可用"""
+        return create_chat_client(self._client_config)
+
     @classmethod
     def from_env(
         cls,
@@ -207,15 +215,8 @@ class DoubaoVisionModel(BaseAIModel):
         Returns:
             处理后的 JSON 字符串
         """
-        if 'bbox' not in input_str:
-            return input_str
-
-        # 将 bbox 值中的空格替换为逗号
-        # 匹配模式：数字 + 空格 + 数字
-        while re.search(r'\d+\s+\d+', input_str):
-            input_str = re.sub(r'(\d+)\s+(\d+)', r'\1,\2', input_str)
-
-        return input_str
+        # 与 service_caller 共用单趟预编译正则的实现
+        return preprocess_doubao_bbox_json(input_str)
 
     @staticmethod
     def adapt_doubao_bbox(
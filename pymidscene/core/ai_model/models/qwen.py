@@ -46,14 +46,14 @@ class QwenVLModel(BaseAIModel):
 
     # 默认配置
     DEFAULT_BASE_URL = "https://dashscope.aliyuncs.com/compatible-mode/v1"
-    SUPPORTED_MODELS = [
+    SUPPORTED_MODELS = frozenset({
         "qwen-vl-max",
         "qwen-vl-plus",
         "qwen2-vl-7b-instruct",
         "qwen2-vl-72b-instruct",
         "qwen3-vl-plus",
         "qwen3-vl-max",
-    ]
+    })
 
     def __init__(
         self,
@@ -91,10 +91,8 @@ class QwenVLModel(BaseAIModel):
         self.max_tokens = max_tokens
         self.model_family = _resolve_qwen_model_family(model_name, model_family)
 
-        # 验证模型名称（仅白名单警告，不再硬失败以允许 qwen3-vl-* 新模型）
-        if model_name not in self.SUPPORTED_MODELS:
-            # 非致命：模型家族已通过名称/env 推断，允许通过
-            pass
+        # 不校验 SUPPORTED_MODELS 白名单: 允许 qwen3-vl-* 等新模型,
+        # 模型家族已通过名称/env 推断
 
     def validate_config(self) -> bool:
         """验证配置是否有效"""
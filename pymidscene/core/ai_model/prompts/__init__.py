@@ -5,7 +5,12 @@ Prompt 模板模块
 """
 
 from .locator import system_prompt_to_locate_element, find_element_prompt
-from .extractor import system_prompt_to_extract, extract_data_prompt, parse_xml_extraction_response
+from .extractor import (
+    system_prompt_to_extract,
+    extract_data_prompt,
+    extract_and_assert_prompt,
+    parse_xml_extraction_response,
+)
 from .planner import system_prompt_to_plan, plan_task_prompt, parse_planning_response
 from .describe import element_describer_instruction, parse_describer_response
 from .section_locator import (
@@ -27,6 +32,7 @@ __all__ = [
     # Extractor prompts
     "system_prompt_to_extract",
     "extract_data_prompt",
+    "extract_and_assert_prompt",
     "parse_xml_extraction_response",
     # Planner prompts
     "system_prompt_to_plan",
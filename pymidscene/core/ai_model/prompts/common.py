@@ -8,6 +8,7 @@ from __future__ import annotations
 
 import os
 from datetime import datetime
+from functools import lru_cache
 from typing import Literal
 
 ModelFamily = Literal[
@@ -47,8 +48,9 @@ def bbox_description(model_family: ModelFamily = None) -> str:
     return "2d bounding box as [xmin, ymin, xmax, ymax]"
 
 
+@lru_cache(maxsize=1)
 def _local_timezone_name() -> str | None:
-    """Return the best available local timezone identifier."""
+    """Return the best available local timezone identifier (resolved once per process)."""
     tzinfo = datetime.now().astimezone().tzinfo
     if tzinfo is None:
         return None
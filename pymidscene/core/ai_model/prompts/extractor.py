@@ -7,9 +7,11 @@
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from typing import Any
 
 from .common import get_preferred_language
+from .planner import extract_xml_tag
 
 
 def system_prompt_to_extract() -> str:
@@ -19,8 +21,11 @@ def system_prompt_to_extract() -> str:
     Returns:
         系统 Prompt 字符串
     """
-    preferred_language = get_preferred_language()
+    return _render_extract_system_prompt(get_preferred_language())
 
+
+@lru_cache(maxsize=8)
+def _render_extract_system_prompt(preferred_language: str) -> str:
     return f"""
 You are a versatile professional in software UI design and testing. Your outstanding contributions will impact the user experience of billions of users.
 
@@ -131,6 +136,35 @@ def extract_data_prompt(
     return "\n\n".join(prompt_parts)
 
 
+def extract_and_assert_prompt(
+    data_demand: dict[str, str] | str,
+    assertion: str,
+    page_description: str | None = None,
+) -> str:
+    """
+    生成"提取 + 断言"合并的用户 Prompt
+
+    把原数据需求挂在 ``data`` 键下, 再追加 ``assertion_pass`` / ``reason`` 两个键,
+    复用 extraction 的 XML 输出格式, 一次调用同时拿到数据和断言结论。
+
+    Args:
+        data_demand: 数据需求（字典或字符串）
+        assertion: 断言描述
+        page_description: 可选的页面内容描述
+
+    Returns:
+        用户 Prompt 字符串
+    """
+    unified_demand = {
+        "data": data_demand,
+        "assertion_pass": (
+            f"Boolean, whether the following statement is true: {assertion}"
+        ),
+        "reason": "String, the reasoning for assertion_pass",
+    }
+    return extract_data_prompt(unified_demand, page_description)
+
+
 def parse_xml_extraction_response(xml_string: str) -> dict[str, Any]:
     """
     解析 XML 格式的提取响应
@@ -141,14 +175,6 @@ def parse_xml_extraction_response(xml_string: str) -> dict[str, Any]:
     Returns:
         包含 thought, data, errors 的字典
     """
-    import re
-
-    def extract_xml_tag(xml: str, tag: str) -> str | None:
-        """提取 XML 标签内容"""
-        pattern = f"<{tag}>(.*?)</{tag}>"
-        match = re.search(pattern, xml, re.DOTALL | re.IGNORECASE)
-        return match.group(1).strip() if match else None
-
     # 复用 JS safeParseJson 的忠实移植(去 ```json 围栏 + json_repair 回退 +
     # 递归 trim),而不是裸 json.loads —— 模型常把 JSON 包在代码块里/带尾逗号,
     # 裸解析会直接报错而 JS 能恢复。
@@ -189,5 +215,6 @@ def parse_xml_extraction_response(xml_string: str) -> dict[str, Any]:
 __all__ = [
     "system_prompt_to_extract",
     "extract_data_prompt",
+    "extract_and_assert_prompt",
     "parse_xml_extraction_response",
 ]
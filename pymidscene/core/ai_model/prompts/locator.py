@@ -4,6 +4,8 @@
 提供用于 AI 元素定位的 Prompt 模板。
 """
 
+from functools import lru_cache
+
 from .common import bbox_description, get_preferred_language, ModelFamily
 
 
@@ -17,7 +19,12 @@ def system_prompt_to_locate_element(model_family: ModelFamily = None) -> str:
     Returns:
         系统 Prompt 字符串
     """
-    preferred_language = get_preferred_language()
+    # 语言每次现读(环境变量可在运行中修改), 渲染结果按 (家族, 语言) 缓存
+    return _render_locate_system_prompt(model_family, get_preferred_language())
+
+
+@lru_cache(maxsize=16)
+def _render_locate_system_prompt(model_family: ModelFamily, preferred_language: str) -> str:
     bbox_comment = bbox_description(model_family)
 
     return f"""
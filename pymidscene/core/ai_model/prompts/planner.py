@@ -13,6 +13,7 @@ XML 标签返回 ``<thought>/<note>/<log>/<error>/<action-type>/<action-param-js
 from __future__ import annotations
 
 import re
+from functools import lru_cache
 from typing import Any
 
 from ....shared.logger import logger
@@ -24,12 +25,22 @@ def extract_xml_tag(xml_string: str, tag_name: str) -> str | None:
 
     对齐 JS ``extractXMLTag``:首个匹配优先,无匹配返回 None。
     """
-    match = re.search(
-        rf"<{tag_name}>([\s\S]*?)</{tag_name}>", xml_string, re.IGNORECASE
-    )
+    match = _xml_tag_re(tag_name).search(xml_string)
     return match.group(1).strip() if match else None
 
 
+@lru_cache(maxsize=32)
+def _xml_tag_re(tag_name: str) -> re.Pattern[str]:
+    # 标签名是固定的少数几个, 编译一次后复用
+    return re.compile(rf"<{tag_name}>([\s\S]*?)</{tag_name}>", re.IGNORECASE)
+
+
+_COMPLETE_TASK_RE = re.compile(
+    r'<complete-task\s+success="(true|false)">([\s\S]*?)</complete-task>',
+    re.IGNORECASE,
+)
+
+
 # 默认规划器用基于自然语言 prompt 的 locate(由执行器内部 ai_locate 解析坐标),
 # 不在规划响应里要求 bbox —— 保持现有 ai_locate 解析路径不变。
 _ACTION_LIST = """\
@@ -68,8 +79,12 @@ _ACTION_LIST = """\
 
 def system_prompt_to_plan() -> str:
     """生成默认规划器的 XML 单动作系统 Prompt(对齐 JS systemPromptToTaskPlanning)。"""
-    preferred_language = get_preferred_language()
+    # 语言每次现读, 渲染结果按语言缓存: 每轮规划拿到同一个字符串
+    return _render_plan_system_prompt(get_preferred_language())
+
 
+@lru_cache(maxsize=8)
+def _render_plan_system_prompt(preferred_language: str) -> str:
     log_field_instruction = f"""\
 ## About the `log` field (preamble message)
 
@@ -191,11 +206,7 @@ def parse_planning_response(
     # complete-task 用自己的正则(要捕获 success 属性)。
     finalize_success: bool | None = None
     finalize_message: str | None = None
-    complete_match = re.search(
-        r'<complete-task\s+success="(true|false)">([\s\S]*?)</complete-task>',
-        response_text,
-        re.IGNORECASE,
-    )
+    complete_match = _COMPLETE_TASK_RE.search(response_text)
     if complete_match:
         # 精确比较(对齐 JS `=== 'true'`):正则用 IGNORECASE 匹配,但 success
         # 必须字面是小写 true 才算成功,其它(含 TRUE)视为失败。
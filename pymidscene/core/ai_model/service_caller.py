@@ -6,22 +6,27 @@ AI 模型服务调用器 - 对应 packages/core/src/ai-model/service-caller/inde
 
 from __future__ import annotations
 
+import asyncio
 import importlib
 import json
 import os
 import re
+import threading
 import time
+from collections import OrderedDict
 from collections.abc import Callable
 from typing import Any, cast
 
-from openai import OpenAI
+from openai import APIStatusError, OpenAI
 from openai.types.chat import ChatCompletion, ChatCompletionMessageParam
 
 from ...shared.env import get_configured_max_tokens
 from ...shared.logger import logger
 from ...shared.utils import (
+    dumps_json,
     extract_json_from_code_block,
     is_ui_tars,
+    loads_json,
     normalize_json_object,
     preprocess_doubao_bbox_json,
 )
@@ -135,6 +140,10 @@ def repair_json(json_str: str) -> str:
         return json_str
 
 
+# 点坐标格式 (x,y)
+_POINT_RE = re.compile(r"\((\d+),(\d+)\)")
+
+
 def safe_parse_json_with_repair(
     text: str,
     model_family: str | None = None,
@@ -154,6 +163,17 @@ def safe_parse_json_with_repair(
     Raises:
         ValueError: 当 JSON 解析失败时
     """
+    # 快速路径: 模型多数时候直接返回合法的 JSON 对象/数组, 这时
+    # extract_json_from_code_block 原样返回(去首尾空白), 跳过它的正则。
+    # (x,y) 点坐标检查仍先于 JSON 结果生效, 与下面的完整路径一致
+    try:
+        parsed = loads_json(text)
+    except ValueError:
+        pass
+    else:
+        if isinstance(parsed, dict | list) and not _POINT_RE.search(text):
+            return normalize_json_object(parsed)
+
     clean_json_string = extract_json_from_code_block(text)
     last_error: Exception | None = None
 
@@ -163,13 +183,13 @@ def safe_parse_json_with_repair(
         last_error = ValueError("empty content")
     else:
         # 匹配点坐标格式 (x,y)
-        point_match = re.search(r'\((\d+),(\d+)\)', clean_json_string)
+        point_match = _POINT_RE.search(clean_json_string)
         if point_match:
             return [int(point_match.group(1)), int(point_match.group(2))]
 
         # 首先尝试直接解析(任意合法 JSON 都接受)
         try:
-            parsed = json.loads(clean_json_string)
+            parsed = loads_json(clean_json_string)
             return normalize_json_object(parsed)
         except (json.JSONDecodeError, ValueError) as exc:
             last_error = exc
@@ -179,7 +199,7 @@ def safe_parse_json_with_repair(
         # 这种情况视为失败继续兜底而不是返回标量。
         try:
             repaired = repair_json(clean_json_string)
-            parsed = json.loads(repaired)
+            parsed = loads_json(repaired)
             if isinstance(parsed, dict | list):
                 return normalize_json_object(parsed)
             last_error = ValueError(
@@ -193,7 +213,7 @@ def safe_parse_json_with_repair(
             json_string = preprocess_doubao_bbox_json(clean_json_string)
             try:
                 repaired = repair_json(json_string)
-                parsed = json.loads(repaired)
+                parsed = loads_json(repaired)
                 if isinstance(parsed, dict | list):
                     return normalize_json_object(parsed)
                 last_error = ValueError(
@@ -286,11 +306,74 @@ def _build_proxied_httpx_client(
     return httpx.Client(timeout=timeout_sec)
 
 
+# (api_key, base_url, timeout, 代理, extra_config) -> OpenAI 客户端
+# 每次 call_ai 都新建客户端会丢掉连接池, 每个请求重新握手 TLS。
+# 按 LRU 最多保留 CHAT_CLIENT_CACHE_SIZE 个, 淘汰的客户端随即关闭(释放连接池);
+# 调用方只在单次请求内持有客户端, 不要长期保存 create_chat_client 的返回值
+CHAT_CLIENT_CACHE_SIZE = 8
+_chat_clients: "OrderedDict[tuple[Any, ...], OpenAI]" = OrderedDict()
+_chat_clients_lock = threading.Lock()
+
+
 def create_chat_client(model_config: ModelConfig) -> OpenAI:
     """
     Create an OpenAI-compat SDK client respecting HTTP / SOCKS proxy config
     on ``model_config``.
+
+    相同连接参数复用同一个客户端(OpenAI 客户端线程安全), 最多缓存
+    ``CHAT_CLIENT_CACHE_SIZE`` 组连接参数, 最久未用的被淘汰并关闭;
+    ``extra_config`` 含不可哈希的值时不缓存。
+    """
+    try:
+        key: tuple[Any, ...] | None = (
+            model_config.api_key,
+            model_config.base_url,
+            model_config.timeout,
+            getattr(model_config, "http_proxy", None),
+            getattr(model_config, "socks_proxy", None),
+            tuple(sorted(model_config.extra_config.items())),
+        )
+        hash(key)
+    except TypeError:
+        key = None
+    if key is None:
+        return _new_chat_client(model_config)
+    evicted: list[OpenAI] = []
+    with _chat_clients_lock:
+        client = _chat_clients.get(key)
+        if client is None:
+            client = _chat_clients[key] = _new_chat_client(model_config)
+            while len(_chat_clients) > CHAT_CLIENT_CACHE_SIZE:
+                evicted.append(_chat_clients.popitem(last=False)[1])
+        else:
+            _chat_clients.move_to_end(key)
+    for stale in evicted:
+        _close_chat_client(stale)
+    return client
+
+
+def close_chat_clients() -> None:
     """
+    关闭并清空 ``create_chat_client`` 缓存的全部客户端
+
+    长期运行的宿主进程(web 服务等)在切换配置或退出时调用, 测试里用来隔离用例;
+    之后的调用按需重新创建客户端。
+    """
+    with _chat_clients_lock:
+        clients = list(_chat_clients.values())
+        _chat_clients.clear()
+    for client in clients:
+        _close_chat_client(client)
+
+
+def _close_chat_client(client: OpenAI) -> None:
+    try:
+        client.close()
+    except Exception as exc:  # noqa: BLE001
+        logger.debug(f"Closing chat client failed: {exc}")
+
+
+def _new_chat_client(model_config: ModelConfig) -> OpenAI:
     client_kwargs: dict[str, Any] = {
         "api_key": model_config.api_key,
         "timeout": model_config.timeout / 1000,  # ms → sec
@@ -346,31 +429,23 @@ def build_usage_info(
     )
 
 
-def call_ai(
-    messages: list[ChatCompletionMessageParam],
-    model_config: ModelConfig,
-    stream: bool = False,
-    on_chunk: Callable[[str], None] | None = None,
-) -> dict[str, Any]:
+def _is_retryable(exc: Exception) -> bool:
     """
-    调用 AI 模型
-
-    Args:
-        messages: 消息列表
-        model_config: 模型配置
-        stream: 是否使用流式输出
-        on_chunk: 流式输出回调函数
+    失败是否值得重试
 
-    Returns:
-        包含 content, usage, isStreamed 的字典
+    4xx(408 / 409 / 429 除外)是请求本身的问题 —— 鉴权、参数、模型不存在,
+    重试只会在 sleep 之后得到同样的错误; 其余(5xx、网络、超时、空响应)照常重试。
     """
-    client = create_chat_client(model_config)
-    create_completion = cast(Callable[..., Any], client.chat.completions.create)
+    if isinstance(exc, APIStatusError):
+        return exc.status_code >= 500 or exc.status_code in (408, 409, 429)
+    return True
 
-    start_time = time.time()
-    max_attempts = model_config.retry_count + 1
 
-    # 准备请求参数
+def _build_request_params(
+    messages: list[ChatCompletionMessageParam],
+    model_config: ModelConfig,
+) -> dict[str, Any]:
+    """构造 chat completions 请求参数(``call_ai`` 与 ``submit_batch`` 共用)"""
     request_params: dict[str, Any] = {
         "model": model_config.model_name,
         "messages": messages,
@@ -405,6 +480,35 @@ def call_ai(
     # auto-glm 专用:top_p=0.85, frequency_penalty=0.2
     _apply_family_specific_params(request_params, model_config.model_family)
 
+    return request_params
+
+
+def call_ai(
+    messages: list[ChatCompletionMessageParam],
+    model_config: ModelConfig,
+    stream: bool = False,
+    on_chunk: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """
+    调用 AI 模型
+
+    Args:
+        messages: 消息列表
+        model_config: 模型配置
+        stream: 是否使用流式输出
+        on_chunk: 流式输出回调函数
+
+    Returns:
+        包含 content, usage, isStreamed 的字典
+    """
+    client = create_chat_client(model_config)
+    create_completion = cast(Callable[..., Any], client.chat.completions.create)
+
+    start_time = time.time()
+    max_attempts = model_config.retry_count + 1
+
+    request_params = _build_request_params(messages, model_config)
+
     logger.info(f"Sending request to {model_config.model_name}")
 
     def _wrap_error(orig: Exception, streaming: bool) -> Exception:
@@ -542,18 +646,165 @@ def call_ai(
                 f"Attempt {attempt}/{max_attempts} failed: {str(e)}"
             )
 
-            if attempt < max_attempts:
+            if attempt < max_attempts and _is_retryable(e):
                 retry_delay = model_config.retry_interval / 1000
                 logger.info(f"Retrying in {retry_delay} seconds...")
                 time.sleep(retry_delay)
             else:
-                logger.error(f"All {max_attempts} attempts failed")
+                if attempt < max_attempts:
+                    logger.error("Non-retryable error, giving up")
+                else:
+                    logger.error(f"All {max_attempts} attempts failed")
                 raise _wrap_error(e, streaming=False) from e
 
     # 不应该到达这里，但为了类型检查
     raise RuntimeError("Unexpected error in call_ai")
 
 
+async def call_ai_async(
+    messages: list[ChatCompletionMessageParam],
+    model_config: ModelConfig,
+    stream: bool = False,
+    on_chunk: Callable[[str], None] | None = None,
+) -> dict[str, Any]:
+    """
+    ``call_ai`` 的异步版本: 在工作线程里执行, 不阻塞事件循环
+
+    并发调用耗时约为最慢的一次而不是累加。流式时 ``on_chunk`` 在工作线程中回调。
+    """
+    return await asyncio.to_thread(call_ai, messages, model_config, stream, on_chunk)
+
+
+async def call_ai_batch(
+    batch: list[list[ChatCompletionMessageParam]],
+    model_config: ModelConfig,
+    concurrency: int = 8,
+) -> list[dict[str, Any]]:
+    """
+    并发执行多组 ``call_ai``, 结果按 ``batch`` 顺序返回
+
+    最多 ``concurrency`` 个请求同时在途(provider 有速率限制); 任一请求最终失败
+    时抛出它的异常。
+
+    Args:
+        batch: 每个元素是一次调用的消息列表
+        model_config: 模型配置(所有调用共用, 连接池也共用)
+        concurrency: 最大并发数
+    """
+    sem = asyncio.Semaphore(max(1, concurrency))
+
+    async def _one(messages: list[ChatCompletionMessageParam]) -> dict[str, Any]:
+        async with sem:
+            return await call_ai_async(messages, model_config)
+
+    return list(await asyncio.gather(*(_one(messages) for messages in batch)))
+
+
+# OpenAI Batch API: 离线任务(回归跑批、数据标注)按半价计费, 结果在
+# completion_window 内异步产出, 不适合交互式的 agent 循环
+_BATCH_ENDPOINT = "/v1/chat/completions"
+_BATCH_FAILED_STATUSES = ("failed", "expired", "cancelled")
+
+
+def submit_batch(
+    batch: list[list[ChatCompletionMessageParam]],
+    model_config: ModelConfig,
+    completion_window: str = "24h",
+) -> str:
+    """
+    把多组消息提交为一个 OpenAI Batch 任务
+
+    请求体与 ``call_ai`` 相同(max_tokens / deepThink / 家族参数), 第 i 组的
+    ``custom_id`` 为 ``request-{i}``。
+
+    Returns:
+        batch id, 交给 ``fetch_batch`` 取结果
+    """
+    client = create_chat_client(model_config)
+    lines: list[str] = []
+    for index, messages in enumerate(batch):
+        params = _build_request_params(messages, model_config)
+        # SDK 的 extra_body 会合并进请求体顶层; JSONL 里直接展开
+        body = {key: value for key, value in params.items() if key != "extra_body"}
+        body.update(params.get("extra_body") or {})
+        lines.append(
+            dumps_json(
+                {
+                    "custom_id": f"request-{index}",
+                    "method": "POST",
+                    "url": _BATCH_ENDPOINT,
+                    "body": body,
+                }
+            )
+        )
+
+    input_file = client.files.create(
+        file=("batch.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch",
+    )
+    created = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint=_BATCH_ENDPOINT,
+        completion_window=completion_window,
+    )
+    logger.info(f"Submitted batch {created.id} with {len(lines)} requests")
+    return created.id
+
+
+def fetch_batch(
+    batch_id: str,
+    model_config: ModelConfig,
+    poll_interval: float = 30.0,
+    timeout: float | None = None,
+) -> list[dict[str, Any]]:
+    """
+    轮询 ``submit_batch`` 提交的任务直到完成, 按提交顺序返回结果
+
+    每项为 ``{"content", "usage", "error"}``; 单个请求失败时 ``content`` 为
+    None、``error`` 为 provider 返回的错误。内容按需再交给
+    ``safe_parse_json_with_repair`` / 各 prompt 的解析函数。
+
+    Raises:
+        RuntimeError: 任务整体失败 / 过期 / 被取消
+        TimeoutError: 超过 ``timeout`` 秒仍未完成
+    """
+    client = create_chat_client(model_config)
+    deadline = None if timeout is None else time.time() + timeout
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status == "completed":
+            break
+        if batch.status in _BATCH_FAILED_STATUSES:
+            raise RuntimeError(f"Batch {batch_id} {batch.status}: {batch.errors}")
+        if deadline is not None and time.time() >= deadline:
+            raise TimeoutError(f"Batch {batch_id} still {batch.status} after {timeout}s")
+        time.sleep(poll_interval)
+
+    results: dict[int, dict[str, Any]] = {}
+    for file_id in (batch.output_file_id, batch.error_file_id):
+        if not file_id:
+            continue
+        for line in client.files.content(file_id).text.splitlines():
+            if not line.strip():
+                continue
+            record = loads_json(line)
+            response = record.get("response") or {}
+            body = response.get("body") or {}
+            choices = body.get("choices") or []
+            error = record.get("error")
+            if error is None and response.get("status_code", 200) != 200:
+                error = body.get("error") or body
+            results[int(record["custom_id"].rsplit("-", 1)[1])] = {
+                "content": choices[0]["message"].get("content") if choices else None,
+                "usage": body.get("usage"),
+                "error": error,
+            }
+
+    total = batch.request_counts.total if batch.request_counts else len(results)
+    missing = {"content": None, "usage": None, "error": "missing from batch output"}
+    return [results.get(index) or dict(missing) for index in range(total)]
+
+
 def extract_json_from_response(content: str) -> Any:
     """
     从 AI 响应中提取 JSON
@@ -570,7 +821,12 @@ def extract_json_from_response(content: str) -> Any:
 __all__ = [
     "ModelConfig",
     "create_chat_client",
+    "close_chat_clients",
     "call_ai",
+    "call_ai_async",
+    "call_ai_batch",
+    "submit_batch",
+    "fetch_batch",
     "extract_json_from_response",
     "safe_parse_json_with_repair",
 ]
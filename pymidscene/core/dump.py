@@ -12,7 +12,7 @@ import json
 import time
 import uuid
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Tuple
+from typing import Dict, Any, List, Optional, Tuple, cast
 from dataclasses import asdict
 
 from .types import (
@@ -34,7 +34,8 @@ from .report_generator import (
 )
 from .js_react_report_generator import JSReactReportGenerator
 from ..shared.logger import logger
-from ..shared.types import LocateResultElement
+from ..shared.types import ExecutionTaskType, LocateResultElement, TaskStatus
+from ..shared.utils import dumps_json, write_json_file
 
 
 # step.action_type(小写、去下划线) → JS 报告的 (type, subType).
@@ -100,10 +101,6 @@ class ExecutionRecorder:
         Returns:
             创建的任务对象
         """
-        from .types import UIContext
-        from typing import cast
-        from ..shared.types import ExecutionTaskType, TaskStatus
-
         task = ExecutionTask(
             type=cast(ExecutionTaskType, task_type),
             param=param,
@@ -115,7 +112,7 @@ class ExecutionRecorder:
         self.tasks.append(task)
         self.current_task = task
 
-        logger.debug(f"开始记录任务: {task_type}, 参数: {param}")
+        logger.debug("开始记录任务: %s, 参数: %s", task_type, param)
         return task
 
     def record_screenshot(self, screenshot: ScreenshotItem, timing: str = "before"):
@@ -177,8 +174,6 @@ class ExecutionRecorder:
             logger.warning("没有当前任务，无法完成")
             return
 
-        from typing import cast
-        from ..shared.types import TaskStatus
         self.current_task.status = cast(TaskStatus, status)
         self.current_task.output = output
 
@@ -211,7 +206,7 @@ class ExecutionRecorder:
             JSON 字符串
         """
         dump = self.to_dump()
-        return json.dumps(dump.to_dict(), indent=2, ensure_ascii=False)
+        return dumps_json(dump.to_dict(), indent=True)
 
 
 class SessionRecorder:
@@ -220,6 +215,10 @@ class SessionRecorder:
 
     集成了目录管理、元素标记、HTML报告生成等功能。
     与 JS 版本 Midscene 的日志系统对齐。
+
+    截图以 base64 保存在内存中的步骤里, 执行过程中不逐步落盘;
+    一次会话只产出一个自包含的 HTML 报告(截图内嵌为 data URI),
+    以及按需调用 ``save_dump()`` 时的一个 JSON 文件。
     """
 
     def __init__(
@@ -265,6 +264,9 @@ class SessionRecorder:
         self.current_step: Optional[ReportStep] = None
         self._step_index = 0
         self._step_start_time: float = 0.0
+        # 等待绘制标记的步骤: 标记图只有 Python 原生报告 / dump 用得到,
+        # 推迟到构建报告会话时再画, 不在每次定位时阻塞事件循环做 PNG 编解码
+        self._pending_markers: List[ReportStep] = []
 
         # 元数据
         self.page_url: Optional[str] = None
@@ -364,15 +366,27 @@ class SessionRecorder:
         self.current_step.element_center = list(center)
         self.current_step.element_description = description
 
-        # 在截图上绘制标记
+        # 在截图上绘制标记(延迟到 _build_report_session 时批量绘制)
         if draw_marker and self.current_step.screenshot_before:
-            marked = self.element_marker.draw_element_with_click(
-                self.current_step.screenshot_before,
-                bbox,
-                center,
-                label=description
+            if not self._pending_markers or self._pending_markers[-1] is not self.current_step:
+                self._pending_markers.append(self.current_step)
+
+    def _render_pending_markers(self) -> None:
+        """为登记过的步骤绘制带标记的截图(元素边框 + 点击位置)"""
+        pending, self._pending_markers = self._pending_markers, []
+        for step in pending:
+            if not (step.screenshot_before and step.element_bbox and step.element_center):
+                continue
+            bbox = step.element_bbox
+            center = step.element_center
+            step.screenshot_marked = self.element_marker.draw_element_with_click(
+                step.screenshot_before,
+                (bbox[0], bbox[1], bbox[2], bbox[3]),
+                (center[0], center[1]),
+                label=step.element_description,
+                # 截图本身就是 JPEG; 整屏 PNG 编码要慢一个数量级, 报告体积也大数倍
+                format="JPEG",
             )
-            self.current_step.screenshot_marked = marked
 
     def record_ai_info(
         self,
@@ -501,6 +515,8 @@ class SessionRecorder:
 
     def _build_report_session(self) -> ReportSession:
         """构建报告会话对象"""
+        self._render_pending_markers()
+
         # "success (cached)" 等带注记的成功状态也要计入成功
         success_count = sum(
             1
@@ -700,8 +716,7 @@ class SessionRecorder:
         session = self._build_report_session()
         dump_path = self.run_manager.get_dump_file_path(self.session_id)
 
-        with open(dump_path, 'w', encoding='utf-8') as f:
-            json.dump(session.to_dict(), f, indent=2, ensure_ascii=False)
+        write_json_file(dump_path, session.to_dict(), indent=True)
 
         logger.info(f"Dump saved to: {dump_path}")
         return str(dump_path)
@@ -812,7 +827,7 @@ class GroupedExecutionRecorder:
             JSON 字符串
         """
         dump = self.to_dump()
-        return json.dumps(dump.to_dict(), indent=2, ensure_ascii=False)
+        return dumps_json(dump.to_dict(), indent=True)
 
     def save_to_file(self, file_path: str):
         """
@@ -821,8 +836,7 @@ class GroupedExecutionRecorder:
         Args:
             file_path: 文件路径
         """
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(self.to_json())
+        write_json_file(file_path, self.to_dump().to_dict(), indent=True)
 
         logger.info(f"执行记录已保存到: {file_path}")
 
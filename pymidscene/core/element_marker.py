@@ -6,6 +6,7 @@
 
 import base64
 import io
+from functools import lru_cache
 from typing import Tuple, List, Optional, Union
 from dataclasses import dataclass
 
@@ -18,6 +19,47 @@ except ImportError:
 from ..shared.logger import logger
 
 
+@lru_cache(maxsize=16)
+def _load_font(size: int):
+    """按字号加载并缓存字体 —— truetype 查找失败要走文件系统 + 异常,每次标注都重试很慢"""
+    for font_name in (
+        "arial.ttf",
+        "msyh.ttc",  # Windows 中文字体
+        "/System/Library/Fonts/PingFang.ttc",  # macOS
+    ):
+        try:
+            return ImageFont.truetype(font_name, size)
+        except Exception:
+            continue
+    # 使用默认字体
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=64)
+def _parse_color_cached(color: str) -> Tuple[int, int, int, int]:
+    color = color.lstrip('#')
+
+    if len(color) == 3:
+        r, g, b = [int(c * 2, 16) for c in color]
+        return (r, g, b, 255)
+    elif len(color) == 4:
+        r, g, b, a = [int(c * 2, 16) for c in color]
+        return (r, g, b, a)
+    elif len(color) == 6:
+        r = int(color[0:2], 16)
+        g = int(color[2:4], 16)
+        b = int(color[4:6], 16)
+        return (r, g, b, 255)
+    elif len(color) == 8:
+        r = int(color[0:2], 16)
+        g = int(color[2:4], 16)
+        b = int(color[4:6], 16)
+        a = int(color[6:8], 16)
+        return (r, g, b, a)
+    else:
+        return (255, 0, 0, 255)  # 默认红色
+
+
 @dataclass
 class MarkerStyle:
     """标记样式配置"""
@@ -83,21 +125,7 @@ class ElementMarker:
         """获取字体"""
         if not HAS_PIL:
             return None
-
-        try:
-            # 尝试加载系统字体
-            return ImageFont.truetype("arial.ttf", size)
-        except:
-            try:
-                # Windows 中文字体
-                return ImageFont.truetype("msyh.ttc", size)
-            except:
-                try:
-                    # macOS
-                    return ImageFont.truetype("/System/Library/Fonts/PingFang.ttc", size)
-                except:
-                    # 使用默认字体
-                    return ImageFont.load_default()
+        return _load_font(size)
 
     def _parse_color(self, color: str) -> Tuple[int, int, int, int]:
         """
@@ -109,27 +137,7 @@ class ElementMarker:
         Returns:
             RGBA 元组
         """
-        color = color.lstrip('#')
-
-        if len(color) == 3:
-            r, g, b = [int(c * 2, 16) for c in color]
-            return (r, g, b, 255)
-        elif len(color) == 4:
-            r, g, b, a = [int(c * 2, 16) for c in color]
-            return (r, g, b, a)
-        elif len(color) == 6:
-            r = int(color[0:2], 16)
-            g = int(color[2:4], 16)
-            b = int(color[4:6], 16)
-            return (r, g, b, 255)
-        elif len(color) == 8:
-            r = int(color[0:2], 16)
-            g = int(color[2:4], 16)
-            b = int(color[4:6], 16)
-            a = int(color[6:8], 16)
-            return (r, g, b, a)
-        else:
-            return (255, 0, 0, 255)  # 默认红色
+        return _parse_color_cached(color)
 
     def _base64_to_image(self, image_base64: str) -> Optional['Image.Image']:
         """将 base64 字符串转换为 PIL Image"""
@@ -153,10 +161,13 @@ class ElementMarker:
             return ""
 
         buffer = io.BytesIO()
-        # 转换为 RGB 模式以支持 JPEG
-        if format.upper() == 'JPEG' and image.mode == 'RGBA':
-            image = image.convert('RGB')
-        image.save(buffer, format=format)
+        if format.upper() == 'JPEG':
+            # 转换为 RGB 模式以支持 JPEG; 质量与 Playwright 截图(q=90)一致
+            if image.mode == 'RGBA':
+                image = image.convert('RGB')
+            image.save(buffer, format=format, quality=90)
+        else:
+            image.save(buffer, format=format)
         return base64.b64encode(buffer.getvalue()).decode('utf-8')
 
     def draw_bbox(
@@ -187,6 +198,18 @@ class ElementMarker:
         if image is None:
             return image_base64
 
+        image = self._draw_bbox_on(image, bbox, color=color, label=label, width=width)
+        return self._image_to_base64(image)
+
+    def _draw_bbox_on(
+        self,
+        image: 'Image.Image',
+        bbox: Tuple[int, int, int, int],
+        color: Optional[str] = None,
+        label: Optional[str] = None,
+        width: Optional[int] = None
+    ) -> 'Image.Image':
+        """在已解码的图像上绘制边界框(不做 base64 编解码)"""
         draw = ImageDraw.Draw(image, 'RGBA')
 
         # 解析坐标
@@ -211,16 +234,17 @@ class ElementMarker:
             width=line_width
         )
 
-        # 如果有填充色，添加半透明填充
+        # 如果有填充色，添加半透明填充(只合成框内区域,不分配整图大小的 overlay)
         if self.style.bbox_fill:
             fill_color = self._parse_color(self.style.bbox_fill)
-            overlay = Image.new('RGBA', image.size, (0, 0, 0, 0))
-            overlay_draw = ImageDraw.Draw(overlay)
-            overlay_draw.rectangle(
-                [(x1, y1), (x2, y2)],
-                fill=fill_color
-            )
-            image = Image.alpha_composite(image, overlay)
+            left, top = max(int(x1), 0), max(int(y1), 0)
+            right = min(int(x2) + 1, image.width)
+            bottom = min(int(y2) + 1, image.height)
+            if right > left and bottom > top:
+                region = image.crop((left, top, right, bottom))
+                overlay = Image.new('RGBA', region.size, fill_color)
+                image.paste(Image.alpha_composite(region, overlay), (left, top))
+            draw = ImageDraw.Draw(image, 'RGBA')
 
         # 绘制标签
         if label:
@@ -256,7 +280,7 @@ class ElementMarker:
                 font=font
             )
 
-        return self._image_to_base64(image)
+        return image
 
     def draw_click_point(
         self,
@@ -284,6 +308,17 @@ class ElementMarker:
         if image is None:
             return image_base64
 
+        self._draw_click_on(image, point, color=color, radius=radius)
+        return self._image_to_base64(image)
+
+    def _draw_click_on(
+        self,
+        image: 'Image.Image',
+        point: Tuple[int, int],
+        color: Optional[str] = None,
+        radius: Optional[int] = None
+    ) -> 'Image.Image':
+        """在已解码的图像上绘制点击标记(不做 base64 编解码)"""
         draw = ImageDraw.Draw(image, 'RGBA')
 
         x, y = point
@@ -308,7 +343,7 @@ class ElementMarker:
             fill=click_color[:3]
         )
 
-        return self._image_to_base64(image)
+        return image
 
     def draw_action_sequence(
         self,
@@ -405,7 +440,8 @@ class ElementMarker:
         image_base64: str,
         bbox: Tuple[int, int, int, int],
         click_point: Tuple[int, int],
-        label: Optional[str] = None
+        label: Optional[str] = None,
+        format: str = 'PNG',
     ) -> str:
         """
         同时绘制元素边界框和点击位置
@@ -415,15 +451,22 @@ class ElementMarker:
             bbox: 边界框坐标
             click_point: 点击位置坐标
             label: 标签文字
+            format: 输出编码(``PNG`` / ``JPEG``)
 
         Returns:
             带标记的截图 base64 字符串
         """
-        # 先绘制边界框
-        result = self.draw_bbox(image_base64, bbox, label=label)
-        # 再绘制点击位置
-        result = self.draw_click_point(result, click_point)
-        return result
+        if not HAS_PIL:
+            return image_base64
+
+        # 只解码/编码一次:边界框和点击位置画在同一张图上
+        image = self._base64_to_image(image_base64)
+        if image is None:
+            return image_base64
+
+        image = self._draw_bbox_on(image, bbox, label=label)
+        image = self._draw_click_on(image, click_point)
+        return self._image_to_base64(image, format=format)
 
     def draw_multiple_elements(
         self,
@@ -0,0 +1,252 @@
+"""
+发送给多模态模型前的截图预处理
+
+上传字节数直接决定 AI 请求的网络耗时(以及部分 provider 的 image token 数)。
+这里在调用模型前把截图缩到 ``max_side`` 以内并以 JPEG 重新编码
+(``MIDSCENE_SCREENSHOT_FORMAT=webp`` 改用 WebP, ``original`` 原样发送)。
+
+坐标安全性:
+- 归一化坐标家族(doubao / gemini / qwen3-vl / glm-v / UI-TARS / auto-glm,
+  0-1000)按 CSS 尺寸换算, 与发送的图片分辨率无关, 可以放心缩放;
+- 绝对像素坐标家族(qwen2.5-vl)返回的是"它看到的图"上的像素, 缩放会让坐标
+  系统性偏移, 因此只重新编码、不缩放。
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+from io import BytesIO
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from ..shared.env.constants import (
+    MIDSCENE_SCREENSHOT_FORMAT,
+    MIDSCENE_SCREENSHOT_JPEG_QUALITY,
+    MIDSCENE_SCREENSHOT_MAX_SIDE,
+)
+from ..shared.logger import logger
+
+
+DEFAULT_LLM_IMAGE_MAX_SIDE = 1280
+DEFAULT_LLM_JPEG_QUALITY = 80
+
+# 模型返回绝对像素坐标的家族 —— 不能缩放发送的图片
+PIXEL_SPACE_FAMILIES = ("qwen2.5-vl",)
+
+# 按家族的默认最长边: 模型服务端本来就会把图缩到这个量级, 多传的像素只是白占带宽
+# (仅限归一化坐标家族; MIDSCENE_SCREENSHOT_MAX_SIDE 显式配置时以它为准)
+FAMILY_LLM_IMAGE_MAX_SIDE = {
+    "doubao-vision": 1024,
+}
+
+# MIDSCENE_SCREENSHOT_FORMAT -> (PIL 编码格式, MIME); original 表示不做预处理
+LLM_IMAGE_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+DEFAULT_LLM_IMAGE_FORMAT = "jpeg"
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.environ.get(name)
+    if raw is None or not raw.strip():
+        return default
+    try:
+        return int(raw.strip())
+    except ValueError:
+        logger.warning(f"Invalid {name}={raw!r}, using default {default}")
+        return default
+
+
+def get_llm_image_options(model_family: Optional[str]) -> tuple[Optional[int], int]:
+    """
+    返回 ``(max_side, jpeg_quality)``
+
+    ``max_side`` 为 None 表示不缩放(像素坐标家族, 或
+    ``MIDSCENE_SCREENSHOT_MAX_SIDE=0`` 显式关闭)。未配置时按
+    ``FAMILY_LLM_IMAGE_MAX_SIDE`` 取家族默认值, 其余家族用 1280。
+    """
+    quality = _env_int(MIDSCENE_SCREENSHOT_JPEG_QUALITY, DEFAULT_LLM_JPEG_QUALITY)
+    quality = min(max(quality, 1), 95)
+    if model_family in PIXEL_SPACE_FAMILIES:
+        return None, quality
+    max_side = _env_int(
+        MIDSCENE_SCREENSHOT_MAX_SIDE,
+        FAMILY_LLM_IMAGE_MAX_SIDE.get(model_family or "", DEFAULT_LLM_IMAGE_MAX_SIDE),
+    )
+    return (max_side if max_side > 0 else None), quality
+
+
+def get_llm_image_format() -> Optional[str]:
+    """
+    返回发送给模型的截图编码格式(``jpeg`` / ``webp``)
+
+    ``MIDSCENE_SCREENSHOT_FORMAT=original`` 时返回 None, 表示原样发送
+    (换格式后 provider 的 image token 计数可能变化, 需要时可关掉对比)。
+    """
+    raw = (os.environ.get(MIDSCENE_SCREENSHOT_FORMAT) or "").strip().lower()
+    if not raw:
+        return DEFAULT_LLM_IMAGE_FORMAT
+    if raw in ("original", "none", "off"):
+        return None
+    if raw == "jpg":
+        raw = "jpeg"
+    if raw not in LLM_IMAGE_FORMATS:
+        logger.warning(
+            f"Invalid {MIDSCENE_SCREENSHOT_FORMAT}={raw!r}, "
+            f"using default {DEFAULT_LLM_IMAGE_FORMAT}"
+        )
+        return DEFAULT_LLM_IMAGE_FORMAT
+    return raw
+
+
+def prepare_for_llm(
+    image_b64: str,
+    max_side: Optional[int] = DEFAULT_LLM_IMAGE_MAX_SIDE,
+    quality: int = DEFAULT_LLM_JPEG_QUALITY,
+    image_format: str = DEFAULT_LLM_IMAGE_FORMAT,
+) -> str:
+    """
+    缩放 + 有损重新编码一张 base64 截图
+
+    Args:
+        image_b64: 原始截图(纯 base64, 无 data: 前缀)
+        max_side: 最长边上限; None 表示不缩放
+        quality: 编码质量
+        image_format: ``LLM_IMAGE_FORMATS`` 中的格式名
+
+    Returns:
+        处理后的 base64; 若没有变小则原样返回
+    """
+    image = Image.open(BytesIO(base64.b64decode(image_b64)))
+    resized = False
+    if max_side and max(image.size) > max_side:
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+        resized = True
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    pil_format = LLM_IMAGE_FORMATS[image_format][0]
+    buffer = BytesIO()
+    if pil_format == "JPEG":
+        # 不开 optimize: 额外一遍 Huffman 表优化让编码耗时约 3 倍, 体积只小 3% 左右
+        image.save(buffer, format="JPEG", quality=quality)
+    else:
+        image.save(buffer, format=pil_format, quality=quality, method=4)
+    encoded = base64.b64encode(buffer.getvalue()).decode("utf-8")
+    if not resized and len(encoded) >= len(image_b64):
+        return image_b64
+    return encoded
+
+
+# 最近一张截图的处理结果: (原 data URL 对象, 处理选项, 处理后的 data URL)。
+# 同一帧常被多次发送(批量定位、重试、deepThink、同帧 query/assert), 这些消息里
+# 的 URL 是同一个 str 对象, 按对象身份命中; 只持有一帧, 不让多张截图常驻内存
+_last_prepared: Optional[Tuple[str, Tuple[Any, ...], str]] = None
+
+
+def _prepare_data_url(
+    url: str, max_side: Optional[int], quality: int, image_format: str
+) -> str:
+    global _last_prepared
+    options = (max_side, quality, image_format)
+    cached = _last_prepared
+    if cached is not None and cached[0] is url and cached[1] == options:
+        return cached[2]
+
+    prepared_url = url
+    header, _, data = url.partition(",")
+    try:
+        prepared_data = prepare_for_llm(
+            data, max_side=max_side, quality=quality, image_format=image_format
+        )
+        if prepared_data != data:  # 没变小时原样返回, MIME 保持不变
+            mime = LLM_IMAGE_FORMATS[image_format][1]
+            prepared_url = f"data:{mime};base64,{prepared_data}"
+    except Exception as exc:  # noqa: BLE001
+        logger.debug(f"Screenshot pre-processing skipped: {exc}")
+    _last_prepared = (url, options, prepared_url)
+    return prepared_url
+
+
+def dhash_b64(image_b64: str, hash_size: int = 8) -> int:
+    """
+    计算 base64 截图的差值感知哈希(dHash)
+
+    缩成 ``(hash_size + 1) x hash_size`` 灰度图, 每行相邻像素比较亮度得到
+    ``hash_size * hash_size`` 位(默认 64 位)。光标闪烁、JPEG 噪点这类肉眼不可见
+    的差异不影响结果, 布局变化会改变它。
+
+    Returns:
+        哈希值(非负整数)
+    """
+    image = Image.open(BytesIO(base64.b64decode(image_b64)))
+    # JPEG(Playwright 截图格式)在解码阶段直接按 1/2~1/8 缩小并只解亮度通道,
+    # 哈希耗时主要在解码而不是比较; PNG 等格式下 draft 不生效
+    image.draft("L", ((hash_size + 1) * 8, hash_size * 8))
+    image = image.convert("L").resize(
+        (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+    )
+    pixels = image.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | int(pixels[offset + col + 1] > pixels[offset + col])
+    return value
+
+
+def prepare_messages_for_llm(
+    messages: List[Dict[str, Any]],
+    model_family: Optional[str],
+) -> List[Dict[str, Any]]:
+    """
+    对消息里的 ``image_url`` 截图做 ``prepare_for_llm``, 返回新的消息列表
+
+    原消息不修改(报告记录仍用原图)。处理失败时原样发送。
+    """
+    image_format = get_llm_image_format()
+    if image_format is None:
+        return messages
+    max_side, quality = get_llm_image_options(model_family)
+    prepared: List[Dict[str, Any]] = []
+    for message in messages:
+        content = message.get("content")
+        if not isinstance(content, list):
+            prepared.append(message)
+            continue
+        new_content = []
+        for part in content:
+            url = (
+                part.get("image_url", {}).get("url", "")
+                if isinstance(part, dict) and part.get("type") == "image_url"
+                else ""
+            )
+            if not url.startswith("data:image/"):
+                new_content.append(part)
+                continue
+            new_part = dict(part)
+            new_part["image_url"] = {
+                **part["image_url"],
+                "url": _prepare_data_url(url, max_side, quality, image_format),
+            }
+            new_content.append(new_part)
+        prepared.append({**message, "content": new_content})
+    return prepared
+
+
+__all__ = [
+    "DEFAULT_LLM_IMAGE_FORMAT",
+    "DEFAULT_LLM_IMAGE_MAX_SIDE",
+    "DEFAULT_LLM_JPEG_QUALITY",
+    "FAMILY_LLM_IMAGE_MAX_SIDE",
+    "LLM_IMAGE_FORMATS",
+    "PIXEL_SPACE_FAMILIES",
+    "dhash_b64",
+    "get_llm_image_format",
+    "get_llm_image_options",
+    "prepare_for_llm",
+    "prepare_messages_for_llm",
+]
@@ -19,7 +19,7 @@ import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional, cast
+from typing import Any, Dict, Iterator, List, Optional, cast
 
 from ..shared.logger import logger
 from .report_template_resources import (
@@ -547,23 +547,9 @@ class JSReactReportGenerator:
             # 尝试从 base64 截图中获取尺寸
             if screenshot_data:
                 try:
-                    import base64
-                    from io import BytesIO
-                    # 移除 data:image 前缀
-                    raw_data = screenshot_data
-                    if raw_data.startswith('data:image'):
-                        raw_data = raw_data.split(',', 1)[1]
-                    img_data = base64.b64decode(raw_data)
-                    # 尝试用 PIL 获取尺寸
-                    try:
-                        from PIL import Image
-                        img = Image.open(BytesIO(img_data))
-                        width, height = img.size
-                    except ImportError:
-                        # 如果没有 PIL，尝试从 PNG 头部解析
-                        if img_data[:8] == b'\x89PNG\r\n\x1a\n':
-                            width = int.from_bytes(img_data[16:20], 'big')
-                            height = int.from_bytes(img_data[20:24], 'big')
+                    # 只解码文件头读尺寸, 每个步骤不再完整解码一遍截图
+                    from ..shared.utils import get_image_size_base64
+                    width, height = get_image_size_base64(screenshot_data)
                 except Exception:
                     pass
         
@@ -693,22 +679,26 @@ class JSReactReportGenerator:
         正则硬要求(report.ts);缺它则 Python 报告无法被官方工具合并。浏览器对
         重复属性取第一个,所以单独查看显示不受影响。
         """
+        return "".join(self._iter_data_script())
+
+    def _iter_data_script(self) -> Iterator[str]:
+        """
+        逐段生成数据 script 标签
+
+        JSON 用 ``iterencode`` 分块编码; ``_escape_script_tag`` 是逐字符替换,
+        对每块单独转义与整体转义结果一致, 因此不需要先拼出整份 JSON 再复制
+        两次做替换(大会话里截图 base64 占了几十 MB)。
+        """
         if not self._current_dump:
             self.start_session()
-        
+
         assert self._current_dump is not None
-        data_json = json.dumps(
-            self._current_dump.to_dict(),
-            ensure_ascii=False,
-            separators=(',', ':')
-        )
-        
-        escaped_json = _escape_script_tag(data_json)
-        
-        return (
-            f'<script type="midscene_web_dump" type="application/json">\n'
-            f'{escaped_json}\n</script>'
-        )
+        encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'))
+
+        yield '<script type="midscene_web_dump" type="application/json">\n'
+        for chunk in encoder.iterencode(self._current_dump.to_dict()):
+            yield _escape_script_tag(chunk)
+        yield '\n</script>'
     
     def generate_html(self) -> str:
         """
@@ -769,14 +759,17 @@ class JSReactReportGenerator:
         report_path = Path(report_dir)
         report_path.mkdir(parents=True, exist_ok=True)
         
-        # 生成并保存 HTML
-        html_content = self.generate_html()
+        # 逐段写入 HTML: 模板 + 数据脚本直接流式写文件, 不拼接成一个大字符串
+        template = self._load_js_template() or self._get_fallback_template()
         file_path = report_path / filename
         
         with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            f.write(template)
+            f.write("\n")
+            for chunk in self._iter_data_script():
+                f.write(chunk)
 
-        if "static/" in html_content:
+        if "static/" in template:
             materialize_report_template_static_assets(report_path)
         
         logger.info(f"Report saved to: {file_path}")
@@ -19,6 +19,7 @@ from dataclasses import dataclass, field, asdict
 from pathlib import Path
 
 from ..shared.logger import logger
+from ..shared.utils import dumps_json
 
 
 @dataclass
@@ -756,11 +757,7 @@ class JSCompatibleReportGenerator:
         
         # 类型断言：此时 _current_dump 一定不为 None
         assert self._current_dump is not None
-        report_data = json.dumps(
-            self._current_dump.to_dict(),
-            ensure_ascii=False,
-            separators=(',', ':')
-        )
+        report_data = dumps_json(self._current_dump.to_dict())
 
         html = self.HTML_TEMPLATE_HEAD
         html += self.VISUALIZER_TEMPLATE.format(
@@ -123,6 +123,11 @@ class MidsceneLogManager:
             **kwargs: 额外数据（将被格式化为 JSON）
         """
         logger = self.get_logger(component)
+        log_func = getattr(logger, level, logger.info)
+        levelno = logging.getLevelName(level.upper())
+        if isinstance(levelno, int) and not logger.isEnabledFor(levelno):
+            # 级别被过滤时不做 JSON 序列化(kwargs 里可能有大块数据)
+            return
 
         # 如果有额外数据，附加到消息
         if kwargs:
@@ -132,7 +137,6 @@ class MidsceneLogManager:
             except:
                 pass
 
-        log_func = getattr(logger, level, logger.info)
         log_func(message)
 
     def agent(self, message: str, **kwargs):
@@ -171,9 +175,10 @@ class MidsceneFormatter(logging.Formatter):
     def format(self, record: logging.LogRecord) -> str:
         # 生成 ISO 格式的带时区时间戳, 从单个 aware 时刻派生(对齐 JS, 避免
         # 此前 datetime.now() 取样三次 + 死代码 `or "+00:00"`)。
+        # 用日志记录产生的时刻(record.created), 而不是格式化时刻。
         # 形如: 2025-12-11T16:58:34.413+08:00
-        now = datetime.now().astimezone()
-        return f"[{now.isoformat(timespec='milliseconds')}] {record.getMessage()}"
+        created = datetime.fromtimestamp(record.created).astimezone()
+        return f"[{created.isoformat(timespec='milliseconds')}] {record.getMessage()}"
 
 
 # 全局日志管理器实例
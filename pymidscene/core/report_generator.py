@@ -15,14 +15,19 @@ import json
 import uuid
 import base64
 from datetime import datetime
-from typing import List, Optional, Dict, Any, Tuple
+from typing import Iterator, List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass, field, asdict
 from pathlib import Path
 
 from ..shared.logger import logger
 
 
-@dataclass
+# 模板中步骤列表的占位符: 模板在此处切成头/尾两段, 步骤 HTML 逐条写入,
+# 不再拼出整段 steps_html(大会话下字符串反复拼接是 O(N²) 拷贝)
+_STEPS_PLACEHOLDER = "\x00__pymidscene_steps__\x00"
+
+
+@dataclass(slots=True)
 class ReportStep:
     """
     报告中的单个步骤 - 与 JS 版本 ExecutionTask 对齐
@@ -1596,6 +1601,21 @@ class HTMLReportGenerator:
         Returns:
             HTML 字符串
         """
+        return "".join(self.iter_html(session))
+
+    def iter_html(self, session: ReportSession) -> Iterator[str]:
+        """
+        逐段生成 HTML 报告(模板头 → 每个步骤 → 模板尾)
+
+        ``save()`` 直接把这些片段写入文件, 内存占用只与单个步骤相关,
+        不随会话长度增长。
+
+        Args:
+            session: 报告会话数据
+
+        Yields:
+            HTML 片段
+        """
         # 计算持续时间
         duration = "N/A"
         if session.start_time and session.end_time:
@@ -1613,15 +1633,7 @@ class HTMLReportGenerator:
             except:
                 pass
 
-        # 生成步骤 HTML
-        steps_html = ""
-        for step in session.steps:
-            steps_html += self._generate_step_html(step)
-
-        if not steps_html:
-            steps_html = '<div style="padding: 40px; text-align: center; color: #999;">No steps recorded</div>'
-
-        # 填充模板
+        # 填充模板(步骤位置先放占位符, 再切成头/尾)
         html = self._get_html_template().format(
             session_id=session.session_id,
             driver_type=session.driver_type,
@@ -1631,13 +1643,20 @@ class HTMLReportGenerator:
             total_steps=session.total_steps,
             success_steps=session.success_steps,
             failed_steps=session.failed_steps,
-            steps_html=steps_html,
+            steps_html=_STEPS_PLACEHOLDER,
             version=self.VERSION,
             generation_time=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             session_json=json.dumps(session.to_dict(), ensure_ascii=False)
         )
+        head, _, tail = html.partition(_STEPS_PLACEHOLDER)
 
-        return html
+        yield head
+        # 生成步骤 HTML
+        for step in session.steps:
+            yield self._generate_step_html(step)
+        if not session.steps:
+            yield '<div style="padding: 40px; text-align: center; color: #999;">No steps recorded</div>'
+        yield tail
 
     def save(
         self,
@@ -1666,12 +1685,12 @@ class HTMLReportGenerator:
         report_path = Path(report_dir)
         report_path.mkdir(parents=True, exist_ok=True)
 
-        # 生成并保存 HTML
-        html_content = self.generate(session)
+        # 逐段写入 HTML(不在内存里拼出整份报告)
         file_path = report_path / filename
 
         with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+            for chunk in self.iter_html(session):
+                f.write(chunk)
 
         logger.info(f"Report saved to: {file_path}")
         return str(file_path)
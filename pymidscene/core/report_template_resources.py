@@ -12,6 +12,9 @@ REPORT_TEMPLATE_PACKAGE = "pymidscene.resources.report_template"
 REPORT_TEMPLATE_METADATA = "metadata.json"
 REPORT_TEMPLATE_DEFAULT_ENTRYPOINT = "report.html"
 
+# 本进程内已物化过 static 资源的输出目录: 同一目录反复 save() 不再遍历/读取资源
+_materialized_dirs: set[Path] = set()
+
 
 @dataclass(frozen=True)
 class ReportTemplateResources:
@@ -59,6 +62,14 @@ def _materialize_traversable_tree(source: Any, destination: Path) -> None:
     # 多个 Agent 并发 save() 会同时物化同一批 static 资源; Windows 上并发
     # 写同名文件会 PermissionError. 内容来自同一打包资源, 已存在且大小一致
     # 即可跳过, 写失败时若文件已存在也视为成功(别的写入者赢了).
+    # 普通文件系统资源先比 stat 大小, 已存在时不必读出整个文件(wasm 较大).
+    stat = getattr(source, "stat", None)
+    if callable(stat) and destination.exists():
+        try:
+            if destination.stat().st_size == stat().st_size:
+                return
+        except OSError:
+            pass
     data = source.read_bytes()
     try:
         if destination.exists() and destination.stat().st_size == len(data):
@@ -75,4 +86,9 @@ def materialize_report_template_static_assets(output_dir: str | Path) -> None:
     if not static_root.is_dir():
         return
 
-    _materialize_traversable_tree(static_root, Path(output_dir) / "static")
+    destination = Path(output_dir) / "static"
+    key = destination.resolve()
+    if key in _materialized_dirs and destination.is_dir():
+        return
+    _materialize_traversable_tree(static_root, destination)
+    _materialized_dirs.add(key)
@@ -13,6 +13,7 @@ midscene_run/
 import os
 import uuid
 from datetime import datetime
+from functools import cached_property
 from pathlib import Path
 from typing import Optional
 
@@ -87,27 +88,29 @@ class MidsceneRunManager:
             except OSError:
                 pass
 
-    @property
+    # 子目录路径在 __init__ 确定 run_dir(含只读回落)后不再变化, 首次访问后缓存
+
+    @cached_property
     def cache_dir(self) -> Path:
         """缓存目录路径"""
         return self.run_dir / self.CACHE_DIR
 
-    @property
+    @cached_property
     def dump_dir(self) -> Path:
         """JSON转储目录路径"""
         return self.run_dir / self.DUMP_DIR
 
-    @property
+    @cached_property
     def log_dir(self) -> Path:
         """日志目录路径"""
         return self.run_dir / self.LOG_DIR
 
-    @property
+    @cached_property
     def output_dir(self) -> Path:
         """输出目录路径"""
         return self.run_dir / self.OUTPUT_DIR
 
-    @property
+    @cached_property
     def report_dir(self) -> Path:
         """HTML报告目录路径"""
         return self.run_dir / self.REPORT_DIR
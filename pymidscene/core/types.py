@@ -25,6 +25,8 @@ from ..shared.types import (
 
 class ScreenshotItem:
     """截图项（简化版，完整实现在 screenshot.py）"""
+    __slots__ = ("data",)
+
     def __init__(self, data: str):
         self.data = data  # Base64 编码的图像数据
 
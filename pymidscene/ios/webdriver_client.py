@@ -16,8 +16,6 @@ WDA 不同版本端点略有差异, 客户端内部有新旧端点 fallback.
 from __future__ import annotations
 
 import asyncio
-import base64
-import io
 from typing import Any, Optional
 
 from ..shared.logger import logger
@@ -380,16 +378,12 @@ class IOSWebDriverClient(WebDriverClient):
                 self.take_screenshot(),
                 self.get_window_size(),
             )
-            try:
-                from PIL import Image
-            except ImportError:
-                return None
-            img = Image.open(io.BytesIO(base64.b64decode(b64)))
-            screenshot_max = max(img.size)
+            # js_round: 半数向上,对齐 JS Math.round; 尺寸只解码截图文件头读取
+            from ..shared.utils import get_image_size_base64, js_round
+            screenshot_max = max(get_image_size_base64(b64))
             window_max = max(size["width"], size["height"])
             if window_max <= 0:
                 return None
-            from ..shared.utils import js_round  # 半数向上,对齐 JS Math.round
             return js_round(screenshot_max / window_max)
         except Exception as exc:
             logger.debug(f"fallback screen scale calc failed: {exc}")
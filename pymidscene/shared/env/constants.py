@@ -98,6 +98,16 @@ MIDSCENE_LANGFUSE_DEBUG = "MIDSCENE_LANGFUSE_DEBUG"
 MIDSCENE_PREFERRED_LANGUAGE = "MIDSCENE_PREFERRED_LANGUAGE"
 MIDSCENE_DEBUG_MODE = "MIDSCENE_DEBUG_MODE"
 
+# 发送给模型前的截图预处理(Python 扩展):最长边上限(0 关闭缩放)、JPEG 质量、
+# 编码格式(jpeg 默认 / webp / original 原样发送)
+MIDSCENE_SCREENSHOT_MAX_SIDE = "MIDSCENE_SCREENSHOT_MAX_SIDE"
+MIDSCENE_SCREENSHOT_JPEG_QUALITY = "MIDSCENE_SCREENSHOT_JPEG_QUALITY"
+MIDSCENE_SCREENSHOT_FORMAT = "MIDSCENE_SCREENSHOT_FORMAT"
+
+# OpenAI 兼容端点的结构化输出(Python 扩展): 开启后 aiAssert 请求带
+# response_format=json_schema, 端点保证返回可直接解析的 JSON
+MIDSCENE_STRUCTURED_OUTPUT = "MIDSCENE_STRUCTURED_OUTPUT"
+
 # Android ADB 环境变量 - 对齐 JS packages/shared/src/env/types.ts
 MIDSCENE_ADB_PATH = "MIDSCENE_ADB_PATH"
 MIDSCENE_ADB_REMOTE_HOST = "MIDSCENE_ADB_REMOTE_HOST"
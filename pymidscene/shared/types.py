@@ -14,6 +14,10 @@ from enum import Enum
 # 基础几何类型
 # ============================================================================
 
+# Point / Size / Rect 保持 TypedDict: 运行时就是普通 dict, 与 JS 对象及
+# 缓存 / 报告里的 JSON 结构一一对应, 全仓库按 ``rect['left']`` 下标访问。
+# 高频创建的结果类(LocateResultElement 等)用 ``slots=True`` 去掉 __dict__。
+
 class Point(TypedDict):
     """点坐标"""
     left: float
@@ -61,19 +65,36 @@ class ElementTreeNode:
     children: List['ElementTreeNode'] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class LocateResultElement:
     """元素定位结果"""
     description: str  # 元素描述
     center: Tuple[float, float]  # 中心点坐标 [x, y]
     rect: Rect  # 矩形区域
 
+    @property
+    def bbox_int(self) -> Tuple[int, int, int, int]:
+        """整数边界框 (x1, y1, x2, y2), 报告标注用"""
+        rect = self.rect
+        left, top = rect["left"], rect["top"]
+        return (
+            int(left),
+            int(top),
+            int(left + rect["width"]),
+            int(top + rect["height"]),
+        )
+
+    @property
+    def center_int(self) -> Tuple[int, int]:
+        """整数中心点 (x, y), 报告标注用"""
+        return (int(self.center[0]), int(self.center[1]))
+
 
 # ============================================================================
 # AI 响应类型
 # ============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class AIUsageInfo:
     """AI 使用信息（Token 统计）"""
     prompt_tokens: Optional[int] = None
@@ -87,14 +108,14 @@ class AIUsageInfo:
     extra: Dict[str, Any] = field(default_factory=dict)
 
 
-@dataclass
+@dataclass(slots=True)
 class AIElementCoordinatesResponse:
     """AI 元素坐标响应"""
     bbox: Tuple[float, float, float, float]  # [x, y, width, height]
     errors: Optional[List[str]] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AIDataExtractionResponse:
     """AI 数据提取响应"""
     data: Any
@@ -102,7 +123,7 @@ class AIDataExtractionResponse:
     thought: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class AIAssertionResponse:
     """AI 断言响应"""
     pass_: bool  # 使用 pass_ 避免与 Python 关键字冲突
@@ -118,7 +139,7 @@ ExecutionTaskType = Literal["Planning", "Insight", "Action Space", "Log"]
 ServiceAction = Literal["locate", "extract", "assert", "describe"]
 
 
-@dataclass
+@dataclass(slots=True)
 class ExecutionTaskTiming:
     """任务执行时间统计"""
     start: float  # 时间戳（毫秒）
@@ -126,7 +147,7 @@ class ExecutionTaskTiming:
     cost: Optional[float] = None  # 耗时（毫秒）
 
 
-@dataclass
+@dataclass(slots=True)
 class LocateResult:
     """定位结果"""
     element: Optional[LocateResultElement]
@@ -11,8 +11,15 @@ import re
 import base64
 from typing import Any, Optional, Dict, List, Union, Tuple
 from io import BytesIO
+from pathlib import Path
 from PIL import Image
 
+try:
+    import orjson  # 可选加速: pip install "pymidscene[speedups]"
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 
 # 默认 bbox 尺寸（用于点坐标转 bbox）- 对应 JS 的 defaultBboxSize
 DEFAULT_BBOX_SIZE = 20
@@ -42,13 +49,70 @@ def calculate_hash(text: str) -> str:
 
 
 def safe_parse_json(text: str) -> Optional[Dict[str, Any]]:
-    """安全解析 JSON，失败返回 None"""
+    """安全解析 JSON，失败返回 None(装了 orjson 时用 orjson)"""
     try:
-        return json.loads(text)
+        return loads_json(text)
     except (json.JSONDecodeError, ValueError):
         return None
 
 
+def _json_default(obj: Any) -> Any:
+    """orjson / json 都不认识的类型: Path 转字符串, numpy 数组等转 list"""
+    if isinstance(obj, Path):
+        return str(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(obj: Any, indent: bool = False) -> str:
+    """
+    序列化为 JSON 字符串(非 ASCII 原样输出)
+
+    装了 orjson 时用 orjson(C 实现, 大 dump 快数倍), 否则回落到标准库;
+    两者输出一致: ``indent=False`` 为紧凑格式, ``indent=True`` 为 2 空格缩进。
+    """
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_json_default, option=option).decode("utf-8")
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=_json_default)
+    return json.dumps(
+        obj, ensure_ascii=False, separators=(",", ":"), default=_json_default
+    )
+
+
+def dumps_json_bytes(obj: Any) -> bytes:
+    """
+    序列化为紧凑 JSON 的 UTF-8 字节(用作 HTTP 请求体)
+
+    orjson 直接产出 bytes, 省掉几 MB 截图 payload 的一次 str → bytes 复制。
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, default=_json_default, option=orjson.OPT_NON_STR_KEYS)
+    return dumps_json(obj).encode("utf-8")
+
+
+def loads_json(data: Union[str, bytes]) -> Any:
+    """解析 JSON 文本 / 字节; 装了 orjson 时用 orjson"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_json_file(path: Union[str, Path], obj: Any, indent: bool = True) -> None:
+    """把 ``obj`` 以 UTF-8 JSON 写入 ``path``(见 ``dumps_json``)"""
+    if HAS_ORJSON:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        Path(path).write_bytes(orjson.dumps(obj, default=_json_default, option=option))
+        return
+    Path(path).write_text(dumps_json(obj, indent=indent), encoding="utf-8")
+
+
 def extract_json_from_code_block(text: str) -> str:
     """
     从 Markdown 代码块中提取 JSON
@@ -82,6 +146,42 @@ def extract_json_from_code_block(text: str) -> str:
     return text
 
 
+_JSON_DECODER = json.JSONDecoder()
+
+
+def fast_extract_json(text: str) -> Any:
+    """
+    提取并解析模型回复里的 JSON, 结果与 ``extract_json_from_code_block`` +
+    ``safe_parse_json`` 一致
+
+    快速路径:
+    - 整段回复就是一个 JSON 值(JSON mode / 流式截断后的 bbox)时直接解析;
+    - 没有 markdown 代码块时从第一个 ``{`` / ``[`` 起用 ``JSONDecoder.raw_decode``
+      (C 实现的扫描器)解析一个值, 忽略后面的说明文字。只接受对象, 或一直解析到
+      文本末尾的数组 —— 前文里的 ``[3]`` 之类括号不能抢在真正的 JSON 前面。
+    有代码块或快速路径不适用时走原来的提取 + 解析(代码块优先)。
+
+    Returns:
+        解析结果; 无法解析时返回 None
+    """
+    if text.lstrip()[:1] in ("{", "["):
+        try:
+            return loads_json(text)
+        except ValueError:
+            pass
+    if "```" not in text:
+        starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+        if starts:
+            try:
+                value, end = _JSON_DECODER.raw_decode(text, min(starts))
+            except ValueError:
+                pass
+            else:
+                if isinstance(value, dict) or not text[end:].strip():
+                    return value
+    return safe_parse_json(extract_json_from_code_block(text))
+
+
 def normalize_json_object(obj: Any) -> Any:
     """
     规范化 JSON 对象，去除 key 和 value 的前后空格
@@ -111,6 +211,9 @@ def normalize_json_object(obj: Any) -> Any:
 
 
 _DOUBAO_BBOX_NUM_PAIR_RE = re.compile(r"(?<=\d)\s+(?=\d)")
+_DOUBAO_BBOX_STR_RE = re.compile(r"^(\d+)\s(\d+)\s(\d+)\s(\d+)$")
+# 字符串 bbox 的分隔符(逗号 / 空白), adapt_bbox 每次定位都会走到
+_BBOX_SPLIT_RE = re.compile(r"[,\s]+")
 
 
 def preprocess_doubao_bbox_json(input_str: str) -> str:
@@ -142,6 +245,29 @@ def is_ui_tars(model_family: Optional[str]) -> bool:
     )
 
 
+# 读图片尺寸时只解码开头这一段 base64(4 的倍数): PNG 的 IHDR、JPEG 的 SOF
+# 都在文件头部, 不必为一个尺寸把整张截图(几百 KB ~ 数 MB)解码出来
+_IMAGE_HEADER_B64_CHARS = 64 * 1024
+
+
+def get_image_size_base64(base64_str: str) -> Tuple[int, int]:
+    """
+    读取 Base64 图像的 ``(宽, 高)``, 不解码整张图
+
+    只把开头一小段交给 Pillow 解析文件头; 头部超出这一段(如 JPEG 带很大的
+    EXIF / ICC 块)时退回完整解码。支持 ``data:`` URL。
+    """
+    if base64_str.startswith("data:"):
+        base64_str = base64_str.split(",", 1)[1]
+    if len(base64_str) > _IMAGE_HEADER_B64_CHARS:
+        try:
+            head = base64.b64decode(base64_str[:_IMAGE_HEADER_B64_CHARS])
+            return Image.open(BytesIO(head)).size
+        except Exception:  # noqa: BLE001 - 头部不完整, 走完整解码
+            pass
+    return Image.open(BytesIO(base64.b64decode(base64_str))).size
+
+
 def resize_image_base64(
     base64_str: str,
     max_width: int = 1280,
@@ -191,15 +317,15 @@ def resize_image_base64_to_size(
     的原始截图 (viewport × dpr 像素) 压回到 CSS 尺寸后再发给 AI,使 AI 返回
     的坐标与 Playwright 点击坐标系 (CSS 像素) 对齐.
     """
-    image_data = base64.b64decode(base64_str)
-    image = Image.open(BytesIO(image_data))
-
-    original_format = image.format or 'PNG'
     target_width = int(target_width)
     target_height = int(target_height)
-    if image.size == (target_width, target_height):
+    # 常见情况(DPR=1 或截图已按 CSS 尺寸截取)尺寸已经一致, 只读文件头判断
+    if get_image_size_base64(base64_str) == (target_width, target_height):
         return base64_str
 
+    image = Image.open(BytesIO(base64.b64decode(base64_str)))
+    original_format = image.format or 'PNG'
+
     resized = image.resize(
         (target_width, target_height),
         Image.Resampling.LANCZOS
@@ -298,7 +424,7 @@ def adapt_doubao_bbox(
     # 处理字符串格式："x1 y1 x2 y2"
     if isinstance(bbox, str):
         # 验证格式
-        if not re.match(r'^(\d+)\s(\d+)\s(\d+)\s(\d+)$', bbox.strip()):
+        if not _DOUBAO_BBOX_STR_RE.match(bbox.strip()):
             raise ValueError(
                 f"invalid bbox data string for doubao-vision mode: {bbox}"
             )
@@ -503,7 +629,7 @@ def adapt_bbox(
     elif model_family == 'gemini':
         bbox_list: List[float]
         if isinstance(normalized_bbox, str):
-            parts = re.split(r'[,\s]+', normalized_bbox.strip())
+            parts = _BBOX_SPLIT_RE.split(normalized_bbox.strip())
             bbox_list = [float(p) for p in parts]
         else:
             bbox_list = [float(x) for x in normalized_bbox]
@@ -513,7 +639,7 @@ def adapt_bbox(
     elif model_family == 'qwen2.5-vl':
         bbox_list_qwen: List[float]
         if isinstance(normalized_bbox, str):
-            parts = re.split(r'[,\s]+', normalized_bbox.strip())
+            parts = _BBOX_SPLIT_RE.split(normalized_bbox.strip())
             bbox_list_qwen = [float(p) for p in parts]
         else:
             bbox_list_qwen = [float(x) for x in normalized_bbox]
@@ -524,7 +650,7 @@ def adapt_bbox(
     else:
         if isinstance(normalized_bbox, str):
             # 尝试解析字符串格式
-            parts = re.split(r'[,\s]+', normalized_bbox.strip())
+            parts = _BBOX_SPLIT_RE.split(normalized_bbox.strip())
             if len(parts) == 4:
                 normalized_bbox = [float(p) for p in parts]
         
@@ -803,8 +929,14 @@ def crop_image_base64(
 __all__ = [
     "js_round",
     "calculate_hash",
+    "get_image_size_base64",
     "safe_parse_json",
+    "dumps_json",
+    "dumps_json_bytes",
+    "loads_json",
+    "write_json_file",
     "extract_json_from_code_block",
+    "fast_extract_json",
     "normalize_json_object",
     "preprocess_doubao_bbox_json",
     "is_ui_tars",
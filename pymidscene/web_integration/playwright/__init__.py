@@ -6,8 +6,10 @@ Playwright 集成模块
 
 from .page import WebPage
 from .agent import PlaywrightAgent
+from .browser import get_persistent_page
 
 __all__ = [
     "WebPage",
     "PlaywrightAgent",
+    "get_persistent_page",
 ]
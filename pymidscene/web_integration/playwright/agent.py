@@ -26,7 +26,8 @@ PlaywrightAgent - 对应 JS 版本的 PlaywrightAgent
     # 退出时自动调用 finish()
 """
 
-from typing import Optional, Dict, Any
+import contextlib
+from typing import Optional, Dict, Any, List, Tuple
 from playwright.async_api import Page as AsyncPlaywrightPage
 from ...shared.types import LocateResultElement
 
@@ -66,6 +67,18 @@ class PlaywrightAgent:
             - "write-only": 只写缓存
         enable_recording: 是否启用执行记录（默认启用）
         report_dir: 报告保存目录（默认为当前目录）
+        reuse_unchanged_screenshot: 页面状态指纹(DOM 哈希 + 表单值 + 滚动位置)
+            未变化时复用上一张截图, 省掉截图编码与传输(默认关闭)
+        max_concurrency: 同时在途的 AI 请求上限(默认不限制)
+        perceptual_locate_memo: 定位 memo 按截图感知哈希(dHash)复用结果,
+            画面无肉眼可见变化时跳过 AI 调用(默认关闭)
+        pipeline_recording: "操作后"报告截图在后台截取, 与下一步重叠执行
+            (默认关闭; 手动 ``finish()`` 前需 ``await agent.flush_recording()``)
+        max_parallel_scroll_attempts: 滚动重试定位时投机截取、并发定位的屏数
+            (默认 1, 逐屏串行)
+        prewarm_connection: 构造时后台预热模型 endpoint 的连接, 第一次 AI 调用
+            不再付 DNS + TLS 握手延迟(默认关闭)
+        stream_locate: 元素定位请求改为流式, 读到完整 bbox 即断开(默认关闭)
 
     示例:
         # 基础用法
@@ -89,6 +102,13 @@ class PlaywrightAgent:
         report_dir: Optional[str] = None,
         wait_for_navigation_timeout: Optional[int] = None,
         wait_for_network_idle_timeout: Optional[int] = None,
+        reuse_unchanged_screenshot: bool = False,
+        max_concurrency: Optional[int] = None,
+        perceptual_locate_memo: bool = False,
+        pipeline_recording: bool = False,
+        max_parallel_scroll_attempts: int = 1,
+        prewarm_connection: bool = False,
+        stream_locate: bool = False,
     ):
         """初始化 PlaywrightAgent"""
         # 创建 WebPage 适配器
@@ -96,6 +116,7 @@ class PlaywrightAgent:
             page,
             wait_for_navigation_timeout=wait_for_navigation_timeout,
             wait_for_network_idle_timeout=wait_for_network_idle_timeout,
+            reuse_unchanged_screenshot=reuse_unchanged_screenshot,
         )
 
         # 创建内部 Agent
@@ -107,6 +128,12 @@ class PlaywrightAgent:
             enable_recording=enable_recording,
             driver_type="playwright",
             report_dir=report_dir,
+            max_concurrency=max_concurrency,
+            perceptual_locate_memo=perceptual_locate_memo,
+            pipeline_recording=pipeline_recording,
+            max_parallel_scroll_attempts=max_parallel_scroll_attempts,
+            prewarm_connection=prewarm_connection,
+            stream_locate=stream_locate,
         )
 
         # 保存原始 page 引用
@@ -131,6 +158,34 @@ class PlaywrightAgent:
         """
         return await self._agent.ai_locate(description)
 
+    async def ai_locate_batch(
+        self, descriptions: List[str]
+    ) -> List[Optional[LocateResultElement]]:
+        """
+        基于同一张截图并发定位多个元素
+
+        Args:
+            descriptions: 元素的自然语言描述列表
+
+        Returns:
+            与描述一一对应的定位结果, 未找到的位置为 None
+        """
+        return await self._agent.ai_locate_batch(descriptions)
+
+    async def ai_locate_queued(
+        self, description: str
+    ) -> Optional[LocateResultElement]:
+        """
+        提交一个定位请求, 与其他协程同时提交的请求合并为一次批量定位
+
+        Args:
+            description: 元素的自然语言描述
+
+        Returns:
+            定位结果，包含 center、rect 等信息
+        """
+        return await self._agent.ai_locate_queued(description)
+
     async def ai_click(self, description: str) -> bool:
         """
         AI 点击操作
@@ -156,6 +211,21 @@ class PlaywrightAgent:
         """
         return await self._agent.ai_input(description, text)
 
+    async def ai_input_many(
+        self,
+        fields: List[Tuple[str, str]] | Dict[str, str],
+    ) -> bool:
+        """
+        并发定位多个输入框后依次输入（AI 调用并发，页面写操作串行）
+
+        Args:
+            fields: ``[(输入框描述, 文本), ...]`` 或 ``{输入框描述: 文本}``
+
+        Returns:
+            是否全部输入成功
+        """
+        return await self._agent.ai_input_many(fields)
+
     async def ai_query(
         self,
         data_schema: str | Dict[str, str],
@@ -186,6 +256,30 @@ class PlaywrightAgent:
         """
         return await self._agent.ai_assert(assertion, error_message or "")
 
+    async def ai_query_assert(
+        self,
+        data_schema: str | Dict[str, str],
+        assertion: str,
+        error_message: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        数据提取 + 断言合并为一次 AI 调用（同一张截图）
+
+        Args:
+            data_schema: 数据结构定义
+            assertion: 断言条件描述
+            error_message: 断言失败时的错误消息
+
+        Returns:
+            ``{"data": ..., "pass": bool, "thought": str, "message": str}``
+
+        Raises:
+            AssertionError: 断言失败时抛出
+        """
+        return await self._agent.ai_query_assert(
+            data_schema, assertion, error_message or ""
+        )
+
     async def ai_action(self, action: str) -> bool:
         """
         执行 AI 动作（完整的 plan-execute-replan 循环）
@@ -215,6 +309,19 @@ class PlaywrightAgent:
         """
         return await self._agent.ai_act(action)
 
+    async def ai_batch(self, steps: List[Dict[str, Any]]) -> bool:
+        """
+        批量执行多个动作,合并为一次 AI 规划调用
+
+        Args:
+            steps: 步骤列表,如
+                ``[{"click": "搜索输入框"}, {"input": ("搜索框", "关键词")}]``
+
+        Returns:
+            是否全部执行成功
+        """
+        return await self._agent.ai_batch(steps)
+
     async def ai_wait_for(
         self,
         assertion: str,
@@ -264,6 +371,29 @@ class PlaywrightAgent:
             direction, distance, scroll_type, locate_prompt
         )
 
+    @contextlib.asynccontextmanager
+    async def reuse_screenshot(self):
+        """
+        在一段连续的 AI 调用之间复用同一张截图
+
+        页面写操作或主 frame 导航(``framenavigated``)时自动作废, 下一次调用重新截图。
+
+        示例:
+            async with agent.reuse_screenshot():
+                data = await agent.ai_query({"title": "页面标题"})
+                await agent.ai_assert("显示了搜索结果")
+        """
+        def _on_navigated(frame) -> None:
+            if frame == self.page.main_frame:
+                self._agent.invalidate_screenshot()
+
+        self.page.on("framenavigated", _on_navigated)
+        try:
+            async with self._agent.reuse_screenshot():
+                yield self
+        finally:
+            self.page.remove_listener("framenavigated", _on_navigated)
+
     async def wait_for_network_idle(self, timeout: int = 1000) -> None:
         """
         等待网络空闲（与 JS 版本 PlaywrightAgent.waitForNetworkIdle 对齐）
@@ -275,17 +405,34 @@ class PlaywrightAgent:
 
     # ==================== 日志/报告方法 ====================
 
-    def finish(self) -> Optional[str]:
+    def finish(self, background: bool = False) -> Optional[str]:
         """
         结束会话并生成 HTML 报告
 
         与 JS 版本对齐，在任务完成后调用此方法生成可视化报告。
         报告将保存到 midscene_run/report/ 目录。
 
+        Args:
+            background: 在线程池里渲染报告并立即返回 None,
+                之后用 ``await agent.await_report()`` 取路径
+
+        Returns:
+            报告文件路径（如果启用了记录）
+        """
+        return self._agent.finish(background=background)
+
+    async def flush_recording(self) -> None:
+        """等待后台"操作后"截图全部完成(配合 ``pipeline_recording=True``)"""
+        await self._agent.flush_recording()
+
+    async def await_report(self) -> Optional[str]:
+        """
+        等待后台报告渲染完成（配合 ``finish(background=True)``）
+
         Returns:
             报告文件路径（如果启用了记录）
         """
-        return self._agent.finish()
+        return await self._agent.await_report()
 
     def save_report(self) -> Optional[str]:
         """
@@ -344,7 +491,10 @@ class PlaywrightAgent:
             if self._agent.session_recorder.current_step:
                 self._agent.session_recorder.fail_step(str(exc_val))
 
-        self.finish()
+        try:
+            await self._agent.await_report()
+        finally:
+            self._agent.close()
         return False
 
 
@@ -0,0 +1,82 @@
+"""
+浏览器启动辅助 - 持久化上下文复用
+
+``get_persistent_page`` 默认用 ``launch_persistent_context`` 复用同一个用户数据
+目录: cookie / 缓存 / 登录态跨运行保留, 省掉重新登录和冷缓存的页面加载。它每次
+仍会启动一个 Chromium 进程, 启动开销不变; 要完全跳过启动, 先手动启动一次浏览器
+(如 ``chrome --remote-debugging-port=9222``), 再通过 ``cdp_url`` 连上去。
+
+Chromium 会锁住用户数据目录, 同一目录同一时刻只能被一个浏览器进程使用 ——
+同时运行的脚本需要各自的 ``user_data_dir``。
+
+连接已运行的浏览器时, 上下文属于用户: 返回值的第二项告诉调用方是否拥有该上下文,
+只有拥有时才应该关闭它, 否则 ``page.context.close()`` 会关掉用户的浏览器窗口。
+
+示例:
+    from playwright.async_api import async_playwright
+    from pymidscene.web_integration.playwright import get_persistent_page
+
+    async with async_playwright() as p:
+        page, owns_context = await get_persistent_page(p)
+        ...
+        if owns_context:
+            await page.context.close()
+"""
+
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+from playwright.async_api import Page as AsyncPlaywrightPage, Playwright
+
+from ...shared.logger import logger
+
+
+DEFAULT_USER_DATA_DIR = "~/.pymidscene/profile"
+
+
+async def get_persistent_page(
+    playwright: Playwright,
+    user_data_dir: str = DEFAULT_USER_DATA_DIR,
+    headless: bool = False,
+    cdp_url: Optional[str] = None,
+    **launch_kwargs: Any,
+) -> Tuple[AsyncPlaywrightPage, bool]:
+    """
+    获取一个复用浏览器上下文的页面
+
+    Args:
+        playwright: ``async_playwright()`` 得到的 Playwright 实例
+        user_data_dir: 持久化用户数据目录(默认 ``~/.pymidscene/profile``);
+            Chromium 独占该目录, 同时运行的脚本要用不同的目录
+        headless: 是否无头模式
+        cdp_url: 已运行浏览器的 CDP 地址(如 ``http://localhost:9222``);
+            提供时通过 ``connect_over_cdp`` 连接, 不启动新浏览器, 忽略 ``user_data_dir``
+        **launch_kwargs: 透传给 ``launch_persistent_context`` 的参数(如 ``channel``)
+
+    Returns:
+        ``(page, owns_context)``: 上下文中的第一个页面(没有则新建), 以及调用方
+        是否拥有该上下文(为 True 时由调用方负责 ``page.context.close()``;
+        通过 CDP 复用用户已有的上下文时为 False, 不要关闭)
+    """
+    if cdp_url:
+        browser = await playwright.chromium.connect_over_cdp(cdp_url)
+        owns_context = not browser.contexts
+        context = (
+            await browser.new_context() if owns_context else browser.contexts[0]
+        )
+        logger.info(f"Connected to running browser over CDP: {cdp_url}")
+    else:
+        profile_dir = Path(user_data_dir).expanduser()
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        context = await playwright.chromium.launch_persistent_context(
+            str(profile_dir), headless=headless, **launch_kwargs
+        )
+        owns_context = True
+        logger.info(f"Persistent browser context launched: {profile_dir}")
+
+    if context.pages:
+        return context.pages[0], owns_context
+    return await context.new_page(), owns_context
+
+
+__all__ = ["get_persistent_page", "DEFAULT_USER_DATA_DIR"]
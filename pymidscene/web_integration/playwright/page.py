@@ -4,7 +4,7 @@ Playwright 页面适配器 - 对应 packages/web-integration/src/playwright/page
 将 Playwright Page 适配为 PyMidscene 的统一接口。
 """
 
-from typing import Optional, Any, List
+from typing import Optional, Any, List, Tuple
 import base64
 import asyncio
 import re
@@ -18,6 +18,34 @@ from ...shared.types import Size
 from ...shared.logger import logger
 
 
+# 页面状态指纹: 在页面内对 outerHTML 做 FNV-1a 32 位哈希(只回传一个短字符串,
+# 不把整个 DOM 经 IPC 传回 Python), 再拼上表单控件的 value/checked(它们不在
+# outerHTML 里)、滚动位置、视口和焦点元素。
+_PAGE_FINGERPRINT_SCRIPT = """
+() => {
+    const fnv = (h, str) => {
+        for (let i = 0; i < str.length; i++) {
+            h ^= str.charCodeAt(i);
+            h = Math.imul(h, 0x01000193);
+        }
+        return h;
+    };
+    const root = document.documentElement;
+    const html = root ? root.outerHTML : '';
+    let h = fnv(0x811c9dc5, html);
+    for (const el of document.querySelectorAll('input, textarea, select')) {
+        h = fnv(h, String(el.value) + (el.checked ? '1' : '0'));
+    }
+    const active = document.activeElement;
+    return [
+        location.href, html.length, h >>> 0,
+        window.scrollX, window.scrollY, window.innerWidth, window.innerHeight,
+        active ? active.tagName : '',
+    ].join('|');
+}
+"""
+
+
 class WebPage(AbstractInterface):
     """Playwright 页面适配器"""
 
@@ -31,6 +59,7 @@ class WebPage(AbstractInterface):
         wait_for_navigation_timeout: Optional[int] = None,
         wait_for_network_idle_timeout: Optional[int] = None,
         force_same_tab_navigation: bool = True,
+        reuse_unchanged_screenshot: bool = False,
     ):
         """
         初始化 Playwright 页面适配器
@@ -39,8 +68,14 @@ class WebPage(AbstractInterface):
             page: Playwright Page 实例
             wait_for_navigation_timeout: 导航超时时间（毫秒）
             wait_for_network_idle_timeout: 网络空闲超时时间（毫秒）
+            reuse_unchanged_screenshot: 截图前先取页面状态指纹(DOM 哈希 +
+                表单值 + 滚动位置), 与上次一致时直接复用上一张截图。
+                canvas / 视频 / CSS 动画等不反映在 DOM 上的变化检测不到, 默认关闭
         """
         self.page = page
+        self.reuse_unchanged_screenshot = reuse_unchanged_screenshot
+        # (页面指纹, full_page, 截图 base64)
+        self._last_screenshot: Optional[Tuple[str, bool, str]] = None
         self.wait_for_navigation_timeout = (
             wait_for_navigation_timeout
             if wait_for_navigation_timeout is not None
@@ -177,13 +212,30 @@ class WebPage(AbstractInterface):
         # 立刻截图可能拍到旧/空白文档。timeout=10s 也对齐 JS(base-page.ts:348),
         # 避免卡页面继承 Playwright 30s 默认而阻塞 3 倍时间。
         await self.wait_for_navigation()
+
+        fingerprint = None
+        if self.reuse_unchanged_screenshot:
+            try:
+                fingerprint = await self.page.evaluate(_PAGE_FINGERPRINT_SCRIPT)
+            except Exception as exc:
+                logger.debug(f"Page fingerprint failed, capturing: {exc}")
+            last = self._last_screenshot
+            if fingerprint is not None and last and last[:2] == (fingerprint, full_page):
+                logger.debug("Page unchanged since last screenshot, reusing it")
+                return last[2]
+
+        # scale="css": HiDPI 下由浏览器直接按 CSS 尺寸出图, Agent 端的 dpr
+        # 归一化看到尺寸已一致就原样返回, 省掉一次 base64 解码 + 缩放 + 重新编码
         screenshot_bytes = await self.page.screenshot(
             type="jpeg",
             quality=90,
             full_page=full_page,
             timeout=10000,
+            scale="css",
         )
         screenshot_base64 = base64.b64encode(screenshot_bytes).decode('utf-8')
+        if fingerprint is not None:
+            self._last_screenshot = (fingerprint, full_page, screenshot_base64)
 
         logger.debug(f"Screenshot taken: size={len(screenshot_base64)} chars (jpeg)")
         return screenshot_base64
@@ -591,11 +643,12 @@ class WebPage(AbstractInterface):
         Returns:
             执行结果
         """
-        logger.debug(f"Evaluating JavaScript: {script[:100]}...")
+        logger.debug("Evaluating JavaScript: %.100s...", script)
 
         result = await self.page.evaluate(script)
 
-        logger.debug(f"JavaScript evaluation result: {str(result)[:100]}...")
+        # %-style: 只有开启 DEBUG 时才对(可能很大的)结果做 str()
+        logger.debug("JavaScript evaluation result: %.100s...", result)
 
         return result
 
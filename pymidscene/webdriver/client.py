@@ -91,7 +91,7 @@ class WebDriverClient:
         """
         client = await self._get_client()
         path = endpoint if endpoint.startswith("/") else f"/{endpoint}"
-        logger.debug(f"WDA {method} {path} {data}")
+        logger.debug("WDA %s %s %s", method, path, data)
         if data is None:
             response = await client.request(method, path)
         else:
@@ -54,9 +54,16 @@ class _StubInnerAgent:
         self._record("ai_scroll", direction, distance, scroll_type, locate_prompt)
         return True
 
-    def finish(self):
-        self._record("finish")
-        return "/tmp/report.html"
+    def finish(self, background=False):
+        self._record("finish", background)
+        return None if background else "/tmp/report.html"
+
+    async def await_report(self):
+        # 与 core Agent 一致: 没有后台渲染时直接 finish
+        return self.finish()
+
+    def close(self):
+        self._record("close")
 
     def save_report(self):
         return "/tmp/report.html"
@@ -151,9 +158,25 @@ class TestContextManager:
     async def test_finish_called_on_exit(self, android_agent):
         async with android_agent as a:
             assert a is android_agent
-        # __aexit__ 调了 finish
+        # __aexit__ 调了 finish, 并关闭底层 Agent 的客户端
         names = [c[0] for c in android_agent._stub.calls]
         assert "finish" in names
+        assert names[-1] == "close"
+
+    async def test_inner_agent_closed_when_report_fails(self, android_agent):
+        async def _boom():
+            raise RuntimeError("render failed")
+
+        android_agent._stub.await_report = _boom
+        with pytest.raises(RuntimeError):
+            async with android_agent:
+                pass
+        assert android_agent._stub.calls[-1][0] == "close"
+
+    async def test_background_finish_forwards(self, android_agent):
+        assert android_agent.finish(background=True) is None
+        assert android_agent._stub.calls[-1] == ("finish", (True,), {})
+        assert await android_agent.await_report() == "/tmp/report.html"
 
     async def test_app_name_mapping_merged_through_agent(
         self, android_device
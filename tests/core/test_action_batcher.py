@@ -0,0 +1,112 @@
+"""
+Agent.ai_batch / MicroBatcher 批处理测试.
+
+多个相邻动作应合并为一次 ai_act 规划调用, 超过 max_batch 时拆成多批.
+"""
+
+from __future__ import annotations
+
+import asyncio
+
+import pytest
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.core.agent.batcher import (
+    MicroBatcher,
+    build_batch_prompt,
+    describe_step,
+)
+
+
+def make_agent(calls: list, fail_on: int = -1) -> Agent:
+    agent = object.__new__(Agent)
+
+    async def _act(prompt: str, use_cache: bool = True) -> bool:
+        calls.append(prompt)
+        return len(calls) - 1 != fail_on
+
+    agent.ai_act = _act  # type: ignore[method-assign]
+    return agent
+
+
+class TestDescribeStep:
+    def test_click_and_input(self):
+        assert describe_step({"click": "登录按钮"}) == "点击「登录按钮」"
+        assert describe_step({"input": ("用户名", "admin")}) == "在「用户名」中输入「admin」"
+
+    def test_rejects_unknown_type(self):
+        with pytest.raises(ValueError):
+            describe_step({"drag": "x"})
+
+    def test_rejects_bad_input_value(self):
+        with pytest.raises(ValueError):
+            describe_step({"input": "only-description"})
+
+    def test_single_step_prompt_has_no_numbering(self):
+        assert build_batch_prompt([{"click": "按钮"}]) == "点击「按钮」"
+
+
+@pytest.mark.asyncio
+class TestAiBatch:
+    async def test_adjacent_steps_coalesce_into_one_plan(self):
+        calls: list = []
+        agent = make_agent(calls)
+        ok = await agent.ai_batch([
+            {"click": "搜索输入框"},
+            {"input": ("搜索框", "PyMidscene")},
+            {"click": "百度一下按钮"},
+        ])
+        assert ok is True
+        assert len(calls) == 1
+        assert "1. 点击「搜索输入框」" in calls[0]
+        assert "3. 点击「百度一下按钮」" in calls[0]
+
+    async def test_splits_when_exceeding_max_batch(self):
+        calls: list = []
+        agent = make_agent(calls)
+        steps = [{"click": f"按钮{i}"} for i in range(5)]
+        await agent.ai_batch(steps, max_batch=2)
+        assert len(calls) == 3
+        # 批次按提交顺序执行
+        assert "按钮0" in calls[0] and "按钮4" in calls[2]
+
+    async def test_empty_batch_is_noop(self):
+        calls: list = []
+        agent = make_agent(calls)
+        assert await agent.ai_batch([]) is True
+        assert calls == []
+
+    async def test_stops_at_first_failed_batch(self):
+        calls: list = []
+        agent = make_agent(calls, fail_on=1)
+        steps = [{"click": f"按钮{i}"} for i in range(6)]
+        assert await agent.ai_batch(steps, max_batch=2) is False
+        # 第 2 批失败, 第 3 批不再执行
+        assert len(calls) == 2
+
+    async def test_invalid_step_raises_before_any_batch_runs(self):
+        calls: list = []
+        agent = make_agent(calls)
+        with pytest.raises(ValueError):
+            await agent.ai_batch([{"click": "a"}, {"click": "b"}, {"drag": "c"}], max_batch=2)
+        assert calls == []
+
+    async def test_micro_batcher_scatters_results_per_item(self):
+        flushed: list = []
+
+        async def _flush(batch):
+            flushed.append(list(batch))
+            return [item.upper() for item in batch]
+
+        batcher = MicroBatcher(_flush, max_batch=8, max_wait_ms=10)
+        results = await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
+        assert results == ["A", "B"]
+        assert flushed == [["a", "b"]]
+
+    async def test_micro_batcher_rejects_mismatched_result_length(self):
+        async def _flush(batch):
+            return ["only-one"]
+
+        batcher = MicroBatcher(_flush)
+        with pytest.raises(ValueError):
+            await asyncio.gather(batcher.submit("a"), batcher.submit("b"))
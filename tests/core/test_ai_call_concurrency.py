@@ -0,0 +1,103 @@
+"""
+Agent AI 调用并发测试: max_concurrency 限流与相同在途请求合并(single-flight).
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from pymidscene.core.agent.agent import Agent
+
+
+@pytest.mark.asyncio
+async def test_max_concurrency_limits_inflight_ai_calls():
+    import asyncio as _asyncio
+    import threading
+    import time as _time
+
+    agent = object.__new__(Agent)
+    agent.max_concurrency = 2
+    lock = threading.Lock()
+    in_flight = {"now": 0, "max": 0}
+
+    def _call(messages, intent):
+        with lock:
+            in_flight["now"] += 1
+            in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        _time.sleep(0.02)
+        with lock:
+            in_flight["now"] -= 1
+        return {"content": "", "usage": None}
+
+    agent._call_ai_with_config = _call
+    await _asyncio.gather(
+        *(
+            agent._call_ai_with_config_async([{"role": "user", "content": str(i)}], "insight")
+            for i in range(5)
+        )
+    )
+    assert in_flight["max"] == 2
+
+
+@pytest.mark.asyncio
+async def test_identical_inflight_ai_calls_share_one_request():
+    import asyncio as _asyncio
+    import time as _time
+
+    agent = object.__new__(Agent)
+    calls = []
+
+    def _call(messages, intent):
+        calls.append(intent)
+        _time.sleep(0.02)
+        return {"content": "ok", "usage": None}
+
+    agent._call_ai_with_config = _call
+    messages = [{"role": "user", "content": "same question"}]
+    results = await _asyncio.gather(
+        *(agent._call_ai_with_config_async(messages, "insight") for _ in range(3)),
+        agent._call_ai_with_config_async(messages, "planning"),
+    )
+    assert [r["content"] for r in results] == ["ok"] * 4
+    assert sorted(calls) == ["insight", "planning"]
+    assert results[0] is not results[1]
+    assert agent._inflight_calls == {}
+
+    # 已完成的请求不缓存, 之后再问会重新调用
+    await agent._call_ai_with_config_async(messages, "insight")
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_inflight_key_uses_frame_identity_not_payload(monkeypatch):
+    import asyncio as _asyncio
+    import time as _time
+
+    from pymidscene.core.agent import agent as agent_module
+
+    agent = object.__new__(Agent)
+    calls = []
+
+    def _call(messages, intent):
+        calls.append(messages)
+        _time.sleep(0.02)
+        return {"content": "ok", "usage": None}
+
+    def _no_full_dump(_obj):
+        raise AssertionError("messages must not be serialized to build the key")
+
+    monkeypatch.setattr(agent_module, "dumps_json_bytes", _no_full_dump)
+    agent._call_ai_with_config = _call
+    frame = "A" * 1000
+    same = agent._build_messages("sys", "find the button", frame)
+    again = agent._build_messages("sys", "find the button", frame)
+    other = agent._build_messages("sys", "find the button", "".join(["A"] * 1000))
+
+    await _asyncio.gather(
+        agent._call_ai_with_config_async(same, "grounding"),
+        agent._call_ai_with_config_async(again, "grounding"),
+        agent._call_ai_with_config_async(other, "grounding"),
+    )
+    # 同一帧的消息合并; 另一次截图(即使内容相同)单独请求
+    assert len(calls) == 2
+    assert agent._inflight_calls == {}
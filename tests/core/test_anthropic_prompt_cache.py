@@ -0,0 +1,66 @@
+"""
+Anthropic 原生协议: system prompt 标记为可缓存, usage 计入缓存读取的 token.
+"""
+
+from __future__ import annotations
+
+import threading
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.shared.env import ModelConfig
+
+
+def _bare_agent() -> Agent:
+    agent = object.__new__(Agent)
+    agent._http_client_lock = threading.Lock()  # __init__ 里按实例创建
+    return agent
+
+
+def test_anthropic_system_prompt_is_marked_cacheable(monkeypatch):
+    import sys
+    import types
+
+    calls: list = []
+
+    class _Messages:
+        def create(self, **kwargs):
+            calls.append(kwargs)
+            return types.SimpleNamespace(
+                content=[types.SimpleNamespace(text="ok")],
+                usage=types.SimpleNamespace(
+                    input_tokens=20,
+                    output_tokens=5,
+                    cache_read_input_tokens=1000,
+                    cache_creation_input_tokens=None,
+                ),
+            )
+
+    class _Anthropic:
+        def __init__(self, **kwargs):
+            self.messages = _Messages()
+
+        def close(self):
+            pass
+
+    fake = types.ModuleType("anthropic")
+    fake.Anthropic = _Anthropic
+    fake.NOT_GIVEN = object()
+    monkeypatch.setitem(sys.modules, "anthropic", fake)
+
+    agent = _bare_agent()
+    config = ModelConfig(
+        model_name="claude-x",
+        openai_base_url="",
+        openai_api_key="k",
+        model_family="claude",
+    )
+    result = agent._call_with_anthropic_sdk(
+        config,
+        [{"role": "system", "content": "SYS"}, {"role": "user", "content": "hi"}],
+    )
+
+    assert calls[0]["system"] == [
+        {"type": "text", "text": "SYS", "cache_control": {"type": "ephemeral"}}
+    ]
+    assert result["usage"]["prompt_tokens"] == 1020
+    assert result["usage"]["total_tokens"] == 1025
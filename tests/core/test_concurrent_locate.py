@@ -0,0 +1,154 @@
+"""
+同一张截图上并发定位测试: ai_locate_batch / ai_locate_queued / ai_input_many.
+"""
+
+from __future__ import annotations
+
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from pymidscene.core.agent.agent import Agent
+
+
+def _white_png_b64(width: int, height: int) -> str:
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _boxed_screenshot_b64(fmt: str) -> str:
+    # 同一画面按不同格式编码: 字节不同, 感知哈希相同
+    img = Image.new("RGB", (400, 300), (255, 255, 255))
+    img.paste((0, 0, 0), (100, 100, 200, 150))
+    buf = BytesIO()
+    img.save(buf, format=fmt)
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _make_locate_agent(model_family: str, responses: list):
+    agent = object.__new__(Agent)
+    agent.session_recorder = None
+    agent.recorder = None
+    agent.task_cache = None
+    agent.interface = SimpleNamespace()
+    state = {"i": 0, "calls": []}
+    img_b64 = _white_png_b64(2000, 2000)
+
+    async def _shot():
+        return img_b64, {"width": 2000, "height": 2000, "dpr": 1}
+
+    async def _call(messages, intent):
+        state["calls"].append(messages)
+        i = state["i"]
+        state["i"] += 1
+        return {"content": responses[i], "usage": None}
+
+    agent._capture_ai_screenshot = _shot
+    agent._call_ai_with_config_async = _call
+    agent._get_model_config = lambda intent: SimpleNamespace(
+        model_name="m", model_family=model_family
+    )
+    agent._resolve_model_family = lambda config: model_family
+    return agent, state
+
+
+@pytest.mark.asyncio
+async def test_ai_locate_batch_returns_results_in_prompt_order():
+    resp_a = '{"bbox": [100, 100, 200, 200]}'
+    resp_b = '{"bbox": [300, 300, 400, 400]}'
+    agent, state = _make_locate_agent("glm-4v", [resp_a, resp_b])
+
+    first, second = await agent.ai_locate_batch(["用户名", "密码"])
+    assert state["i"] == 2
+    assert first.description == "用户名" and second.description == "密码"
+    assert first.center[0] < second.center[0]
+    assert await agent.ai_locate_batch([]) == []
+
+
+@pytest.mark.asyncio
+async def test_ai_locate_batch_uses_perceptual_memo_with_one_dhash(monkeypatch):
+    from pymidscene.core import image_utils
+    from pymidscene.core.agent.task_cache import LocateMemo
+
+    shots = iter([_boxed_screenshot_b64("PNG"), _boxed_screenshot_b64("JPEG")])
+    agent, state = _make_locate_agent(
+        "glm-4v", ['{"bbox": [100, 100, 200, 200]}', '{"bbox": [300, 300, 400, 400]}']
+    )
+
+    async def _shot():
+        return next(shots), {"width": 400, "height": 300, "dpr": 1}
+
+    hashed = []
+    real_dhash = image_utils.dhash_b64
+    monkeypatch.setattr(
+        image_utils, "dhash_b64", lambda b64: hashed.append(b64) or real_dhash(b64)
+    )
+    agent._capture_ai_screenshot = _shot
+    agent.locate_memo = LocateMemo(maxsize=8, perceptual=True)
+
+    first = await agent.ai_locate_batch(["用户名", "密码"])
+    second = await agent.ai_locate_batch(["用户名", "密码"])
+    assert state["i"] == 2
+    assert len(hashed) == 2  # 每批一次, 不是每个描述一次
+    assert [e.center for e in second] == [e.center for e in first]
+
+
+@pytest.mark.asyncio
+async def test_ai_locate_queued_coalesces_concurrent_prompts():
+    import asyncio as _asyncio
+
+    resp_a = '{"bbox": [100, 100, 200, 200]}'
+    resp_b = '{"bbox": [300, 300, 400, 400]}'
+    agent, state = _make_locate_agent("glm-4v", [resp_a, resp_b])
+    shots = {"n": 0}
+    orig_shot = agent._capture_ai_screenshot
+
+    async def _counting_shot():
+        shots["n"] += 1
+        return await orig_shot()
+
+    agent._capture_ai_screenshot = _counting_shot
+
+    first, second = await _asyncio.gather(
+        agent.ai_locate_queued("用户名"), agent.ai_locate_queued("密码")
+    )
+    assert shots["n"] == 1  # 两个请求合并为一批,共用一次截图
+    assert state["i"] == 2
+    assert first.description == "用户名" and second.description == "密码"
+
+
+@pytest.mark.asyncio
+async def test_ai_input_many_locates_concurrently_then_inputs_in_order():
+    import asyncio as _asyncio
+
+    resp_a = '{"bbox": [100, 100, 200, 200]}'
+    resp_b = '{"bbox": [300, 300, 400, 400]}'
+    agent, state = _make_locate_agent("glm-4v", [resp_a, resp_b])
+    in_flight = {"now": 0, "max": 0}
+    orig_call = agent._call_ai_with_config_async
+
+    async def _slow_call(messages, intent):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        await _asyncio.sleep(0.01)
+        in_flight["now"] -= 1
+        return await orig_call(messages, intent)
+
+    agent._call_ai_with_config_async = _slow_call
+    inputs = []
+
+    async def _input_text(text, x, y, clear_first=True):
+        inputs.append((text, round(x), round(y)))
+
+    agent.interface = SimpleNamespace(input_text=_input_text)
+
+    ok = await agent.ai_input_many([("用户名", "admin"), ("密码", "123456")])
+    assert ok is True
+    assert state["i"] == 2
+    assert in_flight["max"] == 2  # 两次定位调用并发进行
+    assert [t for t, _, _ in inputs] == ["admin", "123456"]  # 写入按顺序
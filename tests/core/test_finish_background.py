@@ -0,0 +1,118 @@
+"""
+Agent.finish(background=True) / await_report 测试: 报告在线程池里渲染.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from pymidscene.core.agent.agent import Agent
+
+
+class _FakeRecorder:
+    def __init__(self):
+        self.calls = 0
+        self.thread = None
+
+    def finish(self):
+        self.calls += 1
+        self.thread = threading.current_thread()
+        return "/tmp/report.html"
+
+
+def make_agent() -> Agent:
+    agent = object.__new__(Agent)
+    agent._http_client_lock = threading.Lock()
+    agent.session_recorder = _FakeRecorder()
+    return agent
+
+
+@pytest.mark.asyncio
+class TestFinishBackground:
+    async def test_background_finish_returns_immediately(self):
+        agent = make_agent()
+        assert agent.finish(background=True) is None
+        assert await agent.await_report() == "/tmp/report.html"
+        assert agent.session_recorder.thread is not threading.main_thread()
+
+    async def test_background_finish_starts_render_once(self):
+        agent = make_agent()
+        agent.finish(background=True)
+        agent.finish(background=True)
+        await agent.await_report()
+        assert agent.session_recorder.calls == 1
+        # 渲染完成后同步 finish 直接复用结果
+        assert agent.finish() == "/tmp/report.html"
+        assert agent.session_recorder.calls == 1
+
+    async def test_await_report_without_background_finish(self):
+        agent = make_agent()
+        assert await agent.await_report() == "/tmp/report.html"
+
+    async def test_pipelined_after_screenshot_lands_before_report(self):
+        import asyncio
+        from types import SimpleNamespace
+
+        agent = make_agent()
+        agent.pipeline_recording = True
+        step = SimpleNamespace(screenshot_after=None)
+        agent.session_recorder.current_step = step
+
+        async def _slow_shot():
+            await asyncio.sleep(0.01)
+            return "after"
+
+        agent._capture_recording_screenshot = _slow_shot
+        await agent._record_screenshot_after()
+        assert step.screenshot_after is None  # 后台截图,动作立即返回
+
+        agent.finish(background=True)
+        assert await agent.await_report() == "/tmp/report.html"
+        assert step.screenshot_after == "after"
+
+
+    async def test_ai_scroll_does_not_wait_for_after_screenshot(self):
+        import asyncio
+        from types import SimpleNamespace
+
+        agent = make_agent()
+        agent.pipeline_recording = True
+        agent._dom_lock = None
+        step = SimpleNamespace(screenshot_after=None)
+        recorder = agent.session_recorder
+        recorder.current_step = step
+        recorder.start_step = lambda *a, **k: step
+        recorder.record_screenshot_before = lambda shot: None
+        recorder.complete_step = lambda status: None
+
+        async def _slow_shot():
+            await asyncio.sleep(0.01)
+            return "after"
+
+        async def _scroll(*args):
+            return None
+
+        agent._capture_recording_screenshot = _slow_shot
+        agent._perform_scroll = _scroll
+        assert await agent.ai_scroll(direction="down") is True
+        assert step.screenshot_after is None
+
+        await agent.flush_recording()
+        assert step.screenshot_after == "after"
+
+
+def test_background_finish_outside_event_loop_is_sync():
+    agent = make_agent()
+    assert agent.finish(background=True) == "/tmp/report.html"
+
+
+@pytest.mark.asyncio
+async def test_async_context_exit_renders_report_off_the_loop():
+    agent = make_agent()
+    agent._http_client = None
+    async with agent:
+        pass
+    assert agent.session_recorder.calls == 1
+    assert agent.session_recorder.thread is not threading.main_thread()
@@ -0,0 +1,153 @@
+"""
+Agent._call_with_httpx 复用同一个 httpx 客户端(连接池), 不再每次请求新建.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import httpx
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.shared.env import ModelConfig
+
+
+def _bare_agent() -> Agent:
+    agent = object.__new__(Agent)
+    agent._http_client_lock = threading.Lock()  # __init__ 里按实例创建
+    return agent
+
+
+def _make_agent(requests: list) -> Agent:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": "ok"}}]}
+        )
+
+    agent = _bare_agent()
+    agent._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return agent
+
+
+def test_requests_share_one_client_and_close_releases_it():
+    requests: list = []
+    agent = _make_agent(requests)
+    client = agent._http_client
+    config = ModelConfig(
+        model_name="m",
+        openai_base_url="https://example.com/v1",
+        openai_api_key="k",
+    )
+
+    for _ in range(2):
+        result = agent._call_with_httpx(config, [{"role": "user", "content": "hi"}])
+        assert result["content"] == "ok"
+
+    assert len(requests) == 2
+    assert requests[0].url == "https://example.com/v1/chat/completions"
+    assert requests[0].headers["authorization"] == "Bearer k"
+    assert agent._get_http_client() is client
+
+    agent.close()
+    assert agent._http_client is None
+    assert client.is_closed
+
+
+def test_chat_completions_url_keeps_existing_version_segment():
+    from pymidscene.core.agent.agent import _chat_completions_url
+
+    assert _chat_completions_url("https://example.com/") == "https://example.com/v1/chat/completions"
+    assert (
+        _chat_completions_url("https://ark.example.com/api/v3/")
+        == "https://ark.example.com/api/v3/chat/completions"
+    )
+    assert (
+        _chat_completions_url("https://example.com/v1beta")
+        == "https://example.com/v1beta/chat/completions"
+    )
+
+
+def test_request_body_is_compact_utf8_json():
+    import json
+
+    requests: list = []
+    agent = _make_agent(requests)
+    config = ModelConfig(
+        model_name="m",
+        openai_base_url="https://example.com/v1",
+        openai_api_key="k",
+    )
+    agent._call_with_httpx(config, [{"role": "user", "content": "找到登录按钮"}])
+
+    body = requests[0].content
+    assert "找到登录按钮".encode("utf-8") in body
+    assert json.loads(body)["messages"][0]["content"] == "找到登录按钮"
+    assert requests[0].headers["content-type"] == "application/json"
+
+
+def test_prewarm_opens_pooled_connection_with_head():
+    requests: list = []
+    agent = _make_agent(requests)
+    config = ModelConfig(
+        model_name="m",
+        openai_base_url="https://example.com/v1",
+        openai_api_key="k",
+    )
+    agent._get_model_config = lambda intent: config
+
+    agent._prewarm_connection()
+    assert [(r.method, str(r.url)) for r in requests] == [("HEAD", "https://example.com/v1")]
+
+    config.model_family = "gemini"  # 走 SDK 的家族不经过 httpx 连接池
+    agent._prewarm_connection()
+    assert len(requests) == 1
+
+    # close() 之后预热不再新建客户端(否则新客户端泄漏); 真正的请求仍可重新打开
+    config.model_family = None
+    agent.close()
+    agent._prewarm_connection()
+    assert agent._http_client is None and len(requests) == 1
+    assert agent._get_http_client() is not None
+    agent.close()
+
+
+def test_prewarm_is_opt_in():
+    import inspect
+
+    assert inspect.signature(Agent.__init__).parameters["prewarm_connection"].default is False
+
+
+def test_native_sdk_clients_are_reused_per_endpoint_and_closed():
+    class _FakeSdkClient:
+        closed = False
+
+        def close(self):
+            self.closed = True
+
+    agent = _bare_agent()
+    built: list = []
+
+    def factory():
+        built.append(_FakeSdkClient())
+        return built[-1]
+
+    first = agent._get_sdk_client("claude", "k", "https://a.example.com", factory)
+    assert agent._get_sdk_client("claude", "k", "https://a.example.com", factory) is first
+    other = agent._get_sdk_client("claude", "k2", "https://a.example.com", factory)
+    assert other is not first and len(built) == 2
+
+    agent.close()
+    assert agent._sdk_clients is None
+    assert all(client.closed for client in built)
+
+
+def test_each_agent_has_its_own_client_lock():
+    config = {
+        "MIDSCENE_MODEL_NAME": "m",
+        "MIDSCENE_MODEL_BASE_URL": "https://example.com/v1",
+        "MIDSCENE_MODEL_API_KEY": "k",
+    }
+    first = Agent(interface=None, model_config=config, enable_recording=False)
+    second = Agent(interface=None, model_config=config, enable_recording=False)
+    assert first._http_client_lock is not second._http_client_lock
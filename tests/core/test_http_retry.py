@@ -0,0 +1,52 @@
+"""
+Agent._call_with_httpx 的重试: 遵守 Retry-After 并加随机抖动, 连接超时单独设置.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import httpx
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.shared.env import ModelConfig
+
+
+def _bare_agent() -> Agent:
+    agent = object.__new__(Agent)
+    agent._http_client_lock = threading.Lock()  # __init__ 里按实例创建
+    return agent
+
+
+def test_retry_honours_retry_after_with_jitter(monkeypatch):
+    import time
+
+    from pymidscene.core.agent import agent as agent_module
+
+    sleeps: list = []
+    monkeypatch.setattr(time, "sleep", sleeps.append)
+    responses = [
+        httpx.Response(429, headers={"retry-after": "3"}, text="slow down"),
+        httpx.Response(503, text="busy"),
+        httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]}),
+    ]
+    timeouts: list = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        timeouts.append(request.extensions["timeout"])
+        return responses.pop(0)
+
+    agent = _bare_agent()
+    agent._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    config = ModelConfig(
+        model_name="m",
+        openai_base_url="https://example.com/v1",
+        openai_api_key="k",
+    )
+
+    assert agent._call_with_httpx(config, [{"role": "user", "content": "hi"}])["content"] == "ok"
+    assert len(sleeps) == 2
+    assert 3 <= sleeps[0] <= 3 + agent_module.RETRY_JITTER
+    assert 2 <= sleeps[1] <= 2 + agent_module.RETRY_JITTER
+    assert timeouts[0]["connect"] == agent_module.CONNECT_TIMEOUT
+    assert agent_module._retry_delay(10) <= agent_module.RETRY_MAX_DELAY + agent_module.RETRY_JITTER
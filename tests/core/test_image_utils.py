@@ -0,0 +1,154 @@
+"""
+发送给模型前的截图预处理(缩放 + JPEG 重编码)测试.
+"""
+
+from __future__ import annotations
+
+import base64
+from io import BytesIO
+
+from PIL import Image
+
+from pymidscene.core.image_utils import (
+    dhash_b64,
+    get_llm_image_format,
+    get_llm_image_options,
+    prepare_for_llm,
+    prepare_messages_for_llm,
+)
+
+
+def _png_b64(width: int, height: int) -> str:
+    img = Image.new("RGB", (width, height), (200, 100, 50))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _size(b64: str) -> tuple[int, int]:
+    return Image.open(BytesIO(base64.b64decode(b64))).size
+
+
+class TestPrepareForLlm:
+    def test_downscales_to_max_side_keeping_aspect(self):
+        out = prepare_for_llm(_png_b64(2560, 1440), max_side=1280)
+        assert _size(out) == (1280, 720)
+        assert Image.open(BytesIO(base64.b64decode(out))).format == "JPEG"
+
+    def test_no_resize_when_max_side_none(self):
+        out = prepare_for_llm(_png_b64(2000, 1000), max_side=None)
+        assert _size(out) == (2000, 1000)
+
+    def test_pixel_space_family_is_never_resized(self, monkeypatch):
+        monkeypatch.delenv("MIDSCENE_SCREENSHOT_MAX_SIDE", raising=False)
+        assert get_llm_image_options("qwen2.5-vl")[0] is None
+        assert get_llm_image_options("glm-v")[0] == 1280
+
+    def test_family_default_max_side_and_env_override(self, monkeypatch):
+        monkeypatch.delenv("MIDSCENE_SCREENSHOT_MAX_SIDE", raising=False)
+        assert get_llm_image_options("doubao-vision")[0] == 1024
+        monkeypatch.setenv("MIDSCENE_SCREENSHOT_MAX_SIDE", "1600")
+        assert get_llm_image_options("doubao-vision")[0] == 1600
+
+    def test_env_zero_disables_resize(self, monkeypatch):
+        monkeypatch.setenv("MIDSCENE_SCREENSHOT_MAX_SIDE", "0")
+        assert get_llm_image_options("gemini")[0] is None
+
+
+def test_prepare_messages_rewrites_image_without_mutating_input():
+    original = _png_b64(2560, 1600)
+    messages = [
+        {"role": "system", "content": "sys"},
+        {
+            "role": "user",
+            "content": [
+                {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{original}", "detail": "high"}},
+                {"type": "text", "text": "find"},
+            ],
+        },
+    ]
+    out = prepare_messages_for_llm(messages, "glm-v")
+    url = out[1]["content"][0]["image_url"]["url"]
+    assert url.startswith("data:image/jpeg;base64,")
+    assert out[1]["content"][0]["image_url"]["detail"] == "high"
+    assert _size(url.split(",", 1)[1]) == (1280, 800)
+    # 原消息不变(报告仍用原图)
+    assert messages[1]["content"][0]["image_url"]["url"].endswith(original)
+
+
+def test_screenshot_format_env_selects_webp_or_original(monkeypatch):
+    original = _png_b64(2560, 1600)
+    messages = [{
+        "role": "user",
+        "content": [{"type": "image_url", "image_url": {"url": f"data:image/png;base64,{original}"}}],
+    }]
+
+    monkeypatch.setenv("MIDSCENE_SCREENSHOT_FORMAT", "webp")
+    url = prepare_messages_for_llm(messages, "glm-v")[0]["content"][0]["image_url"]["url"]
+    assert url.startswith("data:image/webp;base64,")
+    assert Image.open(BytesIO(base64.b64decode(url.split(",", 1)[1]))).format == "WEBP"
+
+    monkeypatch.setenv("MIDSCENE_SCREENSHOT_FORMAT", "original")
+    assert get_llm_image_format() is None
+    assert prepare_messages_for_llm(messages, "glm-v") is messages
+
+
+def test_same_screenshot_is_prepared_once(monkeypatch):
+    from pymidscene.core import image_utils
+
+    original = _png_b64(2560, 1600)
+    calls = []
+    real_prepare = image_utils.prepare_for_llm
+    monkeypatch.setattr(
+        image_utils, "prepare_for_llm",
+        lambda *args, **kwargs: calls.append(1) or real_prepare(*args, **kwargs),
+    )
+    monkeypatch.setattr(image_utils, "_last_prepared", None)
+    messages = [{
+        "role": "user",
+        "content": [{"type": "image_url", "image_url": {"url": f"data:image/png;base64,{original}"}}],
+    }]
+
+    first = prepare_messages_for_llm(messages, "glm-v")
+    second = prepare_messages_for_llm(messages, "glm-v")
+    assert len(calls) == 1
+    assert first == second
+
+
+def test_dhash_ignores_reencoding_but_tracks_layout():
+    def _b64(fmt: str, box) -> str:
+        img = Image.new("RGB", (320, 200), (255, 255, 255))
+        img.paste((0, 0, 0), box)
+        buf = BytesIO()
+        img.save(buf, format=fmt)
+        return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+    left = (20, 20, 120, 80)
+    assert dhash_b64(_b64("PNG", left)) == dhash_b64(_b64("JPEG", left))
+    assert dhash_b64(_b64("PNG", left)) != dhash_b64(_b64("PNG", (200, 120, 300, 180)))
+    assert dhash_b64(_b64("PNG", left)) < 2 ** 64
+
+
+def test_agent_keeps_full_size_frame_when_family_unset(monkeypatch):
+    # 未配置 family 时坐标按像素坐标的 qwen2.5-vl 解析, 截图也不能缩放
+    from types import SimpleNamespace
+
+    from pymidscene.core import image_utils
+    from pymidscene.core.agent.agent import Agent
+
+    monkeypatch.setattr(image_utils, "_last_prepared", None)
+    agent = object.__new__(Agent)
+    agent._get_model_config = lambda intent: SimpleNamespace(
+        model_name="some-vl-model", model_family=None
+    )
+    sent = []
+    agent._call_with_httpx = lambda config, messages: sent.append(messages) or {}
+    original = _png_b64(1920, 1080)
+    messages = [{
+        "role": "user",
+        "content": [{"type": "image_url", "image_url": {"url": f"data:image/png;base64,{original}"}}],
+    }]
+
+    agent._call_ai_with_config(messages)
+    url = sent[0][0]["content"][0]["image_url"]["url"]
+    assert _size(url.split(",", 1)[1]) == (1920, 1080)
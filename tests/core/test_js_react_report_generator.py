@@ -266,3 +266,17 @@ def test_insight_tasks_carry_service_dump_log():
 
     # markedScreenshot 无任何消费方, 不应再写入(白白膨胀报告体积)
     assert "markedScreenshot" not in locate_task
+
+
+def test_streamed_save_writes_same_html_as_generate_html(tmp_path: Path):
+    generator = _build_contract_report_generator()
+    generator.add_task(
+        task_type="Insight",
+        sub_type="Query",
+        prompt="</Script><b>injected</b>",
+        duration_ms=5,
+    )
+
+    saved = Path(generator.save(str(tmp_path), filename="streamed.html"))
+
+    assert saved.read_text(encoding="utf-8") == generator.generate_html()
@@ -0,0 +1,100 @@
+"""
+Agent 进程内定位 memo(LocateMemo)测试: 同一帧 / 视觉相同的截图 + 同一描述不再调 AI.
+"""
+
+from __future__ import annotations
+
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from pymidscene.core.agent.agent import Agent
+
+
+def _white_png_b64(width: int, height: int) -> str:
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _boxed_screenshot_b64(fmt: str) -> str:
+    # 同一画面按不同格式编码: 字节不同, 感知哈希相同
+    img = Image.new("RGB", (400, 300), (255, 255, 255))
+    img.paste((0, 0, 0), (100, 100, 200, 150))
+    buf = BytesIO()
+    img.save(buf, format=fmt)
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _make_locate_agent(model_family: str, responses: list):
+    agent = object.__new__(Agent)
+    agent.session_recorder = None
+    agent.recorder = None
+    agent.task_cache = None
+    agent.interface = SimpleNamespace()
+    state = {"i": 0, "calls": []}
+    img_b64 = _white_png_b64(2000, 2000)
+
+    async def _shot():
+        return img_b64, {"width": 2000, "height": 2000, "dpr": 1}
+
+    async def _call(messages, intent):
+        state["calls"].append(messages)
+        i = state["i"]
+        state["i"] += 1
+        return {"content": responses[i], "usage": None}
+
+    agent._capture_ai_screenshot = _shot
+    agent._call_ai_with_config_async = _call
+    agent._get_model_config = lambda intent: SimpleNamespace(
+        model_name="m", model_family=model_family
+    )
+    agent._resolve_model_family = lambda config: model_family
+    return agent, state
+
+
+@pytest.mark.asyncio
+async def test_locate_memo_skips_ai_call_on_identical_screenshot():
+    # 同一帧截图 + 同一描述:第二次定位直接命中 LRU,不再调 AI
+    from pymidscene.core.agent.task_cache import LocateMemo
+
+    element_resp = '{"bbox": [100, 100, 200, 200]}'
+    agent, state = _make_locate_agent("glm-4v", [element_resp])
+    agent.locate_memo = LocateMemo(maxsize=8)
+
+    first = await agent.ai_locate("a button")
+    second = await agent.ai_locate("a button")
+    assert state["i"] == 1
+    assert second.center == first.center
+
+    # use_cache=False 时绕过 LRU
+    agent2, state2 = _make_locate_agent("glm-4v", [element_resp, element_resp])
+    agent2.locate_memo = LocateMemo(maxsize=8)
+    await agent2.ai_locate("a button", use_cache=False)
+    await agent2.ai_locate("a button", use_cache=False)
+    assert state2["i"] == 2
+
+
+@pytest.mark.asyncio
+async def test_perceptual_memo_hits_on_visually_identical_screenshot():
+    # 同一画面的两次截图字节不同(重新编码),感知哈希相同 → 第二次不调 AI
+    from pymidscene.core.agent.task_cache import LocateMemo
+
+    shots = iter([_boxed_screenshot_b64("PNG"), _boxed_screenshot_b64("JPEG")])
+    agent, state = _make_locate_agent("glm-4v", ['{"bbox": [100, 100, 200, 200]}'])
+
+    async def _shot():
+        return next(shots), {"width": 400, "height": 300, "dpr": 1}
+
+    agent._capture_ai_screenshot = _shot
+    agent.locate_memo = LocateMemo(maxsize=8, perceptual=True)
+
+    first = await agent.ai_locate("a button")
+    second = await agent.ai_locate("a button")
+    assert state["i"] == 1
+    assert second.center == first.center
+    assert agent.locate_memo.get_stats()["misses"] == 1
@@ -0,0 +1,107 @@
+"""
+ai_locate 的 XPath 任务缓存测试: 命中重放与定位成功后的 XPath 写入.
+"""
+
+from __future__ import annotations
+
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from pymidscene.core.agent.agent import Agent
+
+
+def _white_png_b64(width: int, height: int) -> str:
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _make_locate_agent(model_family: str, responses: list):
+    agent = object.__new__(Agent)
+    agent.session_recorder = None
+    agent.recorder = None
+    agent.task_cache = None
+    agent.interface = SimpleNamespace()
+    state = {"i": 0, "calls": []}
+    img_b64 = _white_png_b64(2000, 2000)
+
+    async def _shot():
+        return img_b64, {"width": 2000, "height": 2000, "dpr": 1}
+
+    async def _call(messages, intent):
+        state["calls"].append(messages)
+        i = state["i"]
+        state["i"] += 1
+        return {"content": responses[i], "usage": None}
+
+    agent._capture_ai_screenshot = _shot
+    agent._call_ai_with_config_async = _call
+    agent._get_model_config = lambda intent: SimpleNamespace(
+        model_name="m", model_family=model_family
+    )
+    agent._resolve_model_family = lambda config: model_family
+    return agent, state
+
+
+@pytest.mark.asyncio
+async def test_xpath_cache_hit_scrolls_then_reads_rect_once(tmp_path):
+    # 缓存命中重放:不调 AI,每个候选 XPath 只 滚动 + 取 rect 各一次
+    from pymidscene.core.agent.task_cache import LocateCache, TaskCache
+
+    agent, state = _make_locate_agent("glm-4v", [])
+    agent.task_cache = TaskCache(cache_id="xpath-replay", cache_dir=str(tmp_path))
+    agent.task_cache.append_cache(
+        LocateCache(type="locate", prompt="a button", cache={"xpaths": ["/stale", "/ok"]})
+    )
+    await agent.task_cache.flush()
+    agent.task_cache = TaskCache(cache_id="xpath-replay", cache_dir=str(tmp_path))
+    calls = []
+
+    async def _scroll(xpath, block="center", behavior="instant"):
+        calls.append(("scroll", xpath))
+        return xpath == "/ok"
+
+    async def _get(xpath):
+        calls.append(("get", xpath))
+        if xpath != "/ok":
+            return None
+        return {"rect": {"left": 10, "top": 20, "width": 30, "height": 40}, "center": [25, 40]}
+
+    agent.interface = SimpleNamespace(
+        scroll_element_by_xpath_into_view=_scroll, get_element_by_xpath=_get
+    )
+
+    element = await agent.ai_locate("a button")
+    assert state["i"] == 0
+    assert element.center == [25, 40]
+    assert calls == [
+        ("scroll", "/stale"), ("get", "/stale"), ("scroll", "/ok"), ("get", "/ok"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_empty_xpath_candidates_skip_single_xpath_lookup(tmp_path):
+    from pymidscene.core.agent.task_cache import TaskCache
+
+    agent, _ = _make_locate_agent("glm-4v", ['{"bbox": [100, 100, 200, 200]}'])
+    agent.task_cache = TaskCache(cache_id="xp", cache_dir=str(tmp_path), flush_delay=None)
+    lookups = []
+
+    async def _xpaths(x, y):
+        lookups.append("many")
+        return []
+
+    async def _xpath(x, y):
+        lookups.append("single")
+        return None
+
+    agent.interface.get_element_xpaths = _xpaths
+    agent.interface.get_element_xpath = _xpath
+
+    assert await agent.ai_locate("a button") is not None
+    assert lookups == ["many"]
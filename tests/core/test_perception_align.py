@@ -111,3 +111,14 @@ def test_build_messages_image_detail_high():
     assert image_part["type"] == "image_url"
     assert image_part["image_url"]["detail"] == "high"
     assert "B64DATA" in image_part["image_url"]["url"]
+
+
+def test_build_messages_reuses_image_part_for_same_frame():
+    agent = object.__new__(Agent)
+    shot = "B64DATA" * 4
+    first = agent._build_messages("sys", "find a", shot)
+    second = agent._build_messages("sys", "find b", shot)
+    assert second[1]["content"][0] is first[1]["content"][0]
+    assert second[1]["content"][1]["text"] == "find b"
+    other = agent._build_messages("sys", "find a", "OTHER")
+    assert other[1]["content"][0]["image_url"]["url"].endswith(",OTHER")
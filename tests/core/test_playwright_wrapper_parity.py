@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+from types import SimpleNamespace
 from typing import Any, cast
 
 from pymidscene.web_integration.playwright.agent import PlaywrightAgent
@@ -155,3 +156,149 @@ def test_playwright_agent_ai_assert_normalizes_none_message(monkeypatch: Any) ->
     assert result is True
     fake_agent = cast(_FakeAgent, agent.agent)
     assert fake_agent.ai_assert_calls == [("page is visible", "")]
+
+
+class _FakeContext:
+    def __init__(self, pages: list[Any]) -> None:
+        self.pages = pages
+
+    async def new_page(self) -> str:
+        self.pages.append("new-page")
+        return "new-page"
+
+
+class _FakeChromium:
+    def __init__(self, context: _FakeContext) -> None:
+        self.context = context
+        self.launch_calls: list[tuple[str, dict[str, Any]]] = []
+
+    async def launch_persistent_context(self, user_data_dir: str, **kwargs: Any) -> _FakeContext:
+        self.launch_calls.append((user_data_dir, kwargs))
+        return self.context
+
+
+def test_get_persistent_page_reuses_existing_page(tmp_path: Any) -> None:
+    from types import SimpleNamespace
+
+    from pymidscene.web_integration.playwright import get_persistent_page
+
+    chromium = _FakeChromium(_FakeContext(["existing-page"]))
+    page, owns_context = asyncio.run(
+        get_persistent_page(
+            cast(Any, SimpleNamespace(chromium=chromium)),
+            user_data_dir=str(tmp_path / "profile"),
+            channel="chrome",
+        )
+    )
+
+    assert page == "existing-page" and owns_context is True
+    assert chromium.launch_calls == [
+        (str(tmp_path / "profile"), {"headless": False, "channel": "chrome"})
+    ]
+
+
+def test_get_persistent_page_creates_page_when_context_empty(tmp_path: Any) -> None:
+    from types import SimpleNamespace
+
+    from pymidscene.web_integration.playwright import get_persistent_page
+
+    chromium = _FakeChromium(_FakeContext([]))
+    page, _ = asyncio.run(
+        get_persistent_page(
+            cast(Any, SimpleNamespace(chromium=chromium)),
+            user_data_dir=str(tmp_path / "profile"),
+        )
+    )
+    assert page == "new-page"
+
+
+class _FakeCdpChromium:
+    def __init__(self, contexts: list[_FakeContext]) -> None:
+        self.browser = SimpleNamespace(contexts=contexts, new_context=self._new_context)
+        self.urls: list[str] = []
+
+    async def _new_context(self) -> _FakeContext:
+        context = _FakeContext([])
+        self.browser.contexts.append(context)
+        return context
+
+    async def connect_over_cdp(self, url: str) -> Any:
+        self.urls.append(url)
+        return self.browser
+
+
+def test_get_persistent_page_over_cdp_reports_context_ownership() -> None:
+    from pymidscene.web_integration.playwright import get_persistent_page
+
+    # 用户浏览器已有上下文: 复用它, 调用方不拥有, 不应关闭
+    chromium = _FakeCdpChromium([_FakeContext(["user-tab"])])
+    page, owns_context = asyncio.run(
+        get_persistent_page(
+            cast(Any, SimpleNamespace(chromium=chromium)), cdp_url="http://localhost:9222"
+        )
+    )
+    assert page == "user-tab" and owns_context is False
+    assert chromium.urls == ["http://localhost:9222"]
+
+    # 没有上下文时新建的那个归调用方所有
+    chromium = _FakeCdpChromium([])
+    page, owns_context = asyncio.run(
+        get_persistent_page(
+            cast(Any, SimpleNamespace(chromium=chromium)), cdp_url="http://localhost:9222"
+        )
+    )
+    assert page == "new-page" and owns_context is True
+
+
+class _FingerprintPage(_FakeAsyncPage):
+    def __init__(self) -> None:
+        super().__init__()
+        self.fingerprint = "dom-1"
+        self.screenshot_calls = 0
+        self.screenshot_kwargs: dict[str, Any] = {}
+
+    async def evaluate(self, script: str) -> str:
+        return self.fingerprint
+
+    async def screenshot(self, **kwargs: Any) -> bytes:
+        self.screenshot_calls += 1
+        self.screenshot_kwargs = kwargs
+        return f"shot-{self.screenshot_calls}".encode()
+
+
+def test_web_page_reuses_screenshot_while_fingerprint_unchanged() -> None:
+    page = _FingerprintPage()
+    web_page = WebPage(
+        cast(Any, page), wait_for_navigation_timeout=0, reuse_unchanged_screenshot=True
+    )
+
+    async def _run() -> list[str]:
+        shots = [await web_page.screenshot(), await web_page.screenshot()]
+        page.fingerprint = "dom-2"
+        shots.append(await web_page.screenshot())
+        return shots
+
+    first, second, third = asyncio.run(_run())
+    assert first == second != third
+    assert page.screenshot_calls == 2
+
+
+def test_web_page_screenshot_reuse_is_opt_in() -> None:
+    page = _FingerprintPage()
+    web_page = WebPage(cast(Any, page), wait_for_navigation_timeout=0)
+
+    asyncio.run(web_page.screenshot())
+    asyncio.run(web_page.screenshot())
+
+    assert page.screenshot_calls == 2
+
+
+def test_web_page_screenshot_is_captured_at_css_scale() -> None:
+    # HiDPI 下直接拿 CSS 尺寸的图, Agent 不必再解码缩放一遍
+    page = _FingerprintPage()
+    web_page = WebPage(cast(Any, page), wait_for_navigation_timeout=0)
+
+    asyncio.run(web_page.screenshot())
+
+    assert page.screenshot_kwargs["scale"] == "css"
+    assert page.screenshot_kwargs["type"] == "jpeg"
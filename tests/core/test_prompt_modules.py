@@ -84,3 +84,18 @@ def test_parse_xml_extraction_response_handles_case_insensitive_tags() -> None:
         "thought": "Case insensitive thought",
         "data": {"result": "success"},
     }
+
+
+def test_cached_system_prompts_follow_language_changes(monkeypatch) -> None:
+    monkeypatch.setenv("MIDSCENE_PREFERRED_LANGUAGE", "French")
+    first = system_prompt_to_locate_element("qwen3-vl")
+    assert system_prompt_to_locate_element("qwen3-vl") is first
+    assert "Use French in this field" in system_prompt_to_extract()
+    plan = system_prompt_to_plan()
+    assert system_prompt_to_plan() is plan
+    assert "**Use French**" in plan
+
+    monkeypatch.setenv("MIDSCENE_PREFERRED_LANGUAGE", "German")
+    assert "Use German." in system_prompt_to_locate_element("qwen3-vl")
+    assert "Use German in this field" in system_prompt_to_extract()
+    assert "**Use German**" in system_prompt_to_plan()
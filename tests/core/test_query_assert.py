@@ -0,0 +1,95 @@
+"""
+Agent.ai_query_assert 测试: 提取 + 断言合并为一次 AI 调用.
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.core.ai_model.prompts import extract_and_assert_prompt
+
+
+def make_agent(response: str, calls: list) -> Agent:
+    agent = object.__new__(Agent)
+    agent.session_recorder = None
+    agent.recorder = None
+
+    async def _shot():
+        return "iVBORw0KGgo=", {"width": 100, "height": 100, "dpr": 1}
+
+    async def _call(messages, intent):
+        calls.append(messages)
+        return {"content": response, "usage": None}
+
+    agent._capture_ai_screenshot = _shot
+    agent._call_ai_with_config_async = _call
+    agent._get_model_config = lambda intent: SimpleNamespace(model_name="m")
+    return agent
+
+
+def test_unified_prompt_nests_demand_under_data():
+    prompt = extract_and_assert_prompt({"title": "页面标题"}, "显示了结果")
+    assert '"data"' in prompt and '"title"' in prompt
+    assert "assertion_pass" in prompt and "显示了结果" in prompt
+
+
+@pytest.mark.asyncio
+class TestAiQueryAssert:
+    async def test_single_call_returns_data_and_pass(self):
+        calls: list = []
+        agent = make_agent(
+            '<thought>ok</thought><data-json>{"data": {"title": "百度"}, '
+            '"assertion_pass": true, "reason": "结果可见"}</data-json>',
+            calls,
+        )
+        out = await agent.ai_query_assert({"title": "页面标题"}, "页面显示了搜索结果")
+        assert len(calls) == 1
+        assert out["data"] == {"title": "百度"}
+        assert out["pass"] is True
+        assert out["thought"] == "结果可见"
+
+    async def test_failed_assertion_raises(self):
+        agent = make_agent(
+            '<data-json>{"data": 1, "assertion_pass": false, "reason": "no"}</data-json>',
+            [],
+        )
+        with pytest.raises(AssertionError):
+            await agent.ai_query_assert("count, number", "列表非空")
+
+    async def test_keep_raw_response_returns_failure(self):
+        agent = make_agent(
+            '<data-json>{"data": 1, "assertion_pass": false, "reason": "no"}</data-json>',
+            [],
+        )
+        out = await agent.ai_query_assert(
+            "count, number", "列表非空", keep_raw_response=True
+        )
+        assert out["pass"] is False and out["data"] == 1
+        assert "列表非空" in out["message"]
+
+    async def test_missing_assertion_key_is_parse_error(self):
+        agent = make_agent('<data-json>{"title": "x"}</data-json>', [])
+        with pytest.raises(ValueError):
+            await agent.ai_query_assert({"title": "t"}, "a")
+
+
+@pytest.mark.asyncio
+async def test_large_responses_are_parsed_off_the_event_loop():
+    import threading
+
+    from pymidscene.core.agent.agent import OFFLOAD_PARSE_MIN_CHARS
+
+    threads = []
+
+    def _parse(content):
+        threads.append(threading.get_ident())
+        return len(content)
+
+    assert await Agent._parse_response(_parse, "x" * 10) == 10
+    big = "x" * OFFLOAD_PARSE_MIN_CHARS
+    assert await Agent._parse_response(_parse, big) == OFFLOAD_PARSE_MIN_CHARS
+    assert threads[0] == threading.get_ident()
+    assert threads[1] != threading.get_ident()
@@ -0,0 +1,269 @@
+"""
+Agent.reuse_screenshot 测试: 连续调用复用同一张截图, 页面写操作后作废.
+"""
+
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.shared.types import LocateResultElement
+
+
+def make_agent():
+    agent = object.__new__(Agent)
+    state = {"shots": 0, "clicks": 0}
+
+    async def _screenshot():
+        state["shots"] += 1
+        return f"shot-{state['shots']}"
+
+    async def _get_size():
+        return {"width": 100, "height": 100, "dpr": 1}
+
+    async def _click(x, y):
+        state["clicks"] += 1
+
+    agent.interface = SimpleNamespace(
+        screenshot=_screenshot, get_size=_get_size, click=_click
+    )
+    return agent, state
+
+
+@pytest.mark.asyncio
+class TestReuseScreenshot:
+    async def test_captures_once_within_block(self):
+        agent, state = make_agent()
+        async with agent.reuse_screenshot():
+            first, _ = await agent._capture_ai_screenshot()
+            second, _ = await agent._capture_ai_screenshot()
+        assert first == second == "shot-1"
+        assert state["shots"] == 1
+
+    async def test_page_write_invalidates_frame(self):
+        agent, state = make_agent()
+        async with agent.reuse_screenshot():
+            await agent._capture_ai_screenshot()
+            await agent.interface.click(1, 2)
+            shot, _ = await agent._capture_ai_screenshot()
+        assert shot == "shot-2"
+        assert state["clicks"] == 1
+
+    async def test_no_reuse_outside_block(self):
+        agent, state = make_agent()
+        async with agent.reuse_screenshot():
+            await agent._capture_ai_screenshot()
+        shot, _ = await agent._capture_ai_screenshot()
+        assert shot == "shot-2"
+        assert isinstance(agent.interface, SimpleNamespace)
+
+    async def test_ai_click_records_and_locates_on_one_capture(self):
+        agent, state = make_agent()
+        agent.recorder = None
+        agent.session_recorder = SimpleNamespace(
+            current_step=None,
+            start_group=lambda name: None,
+            start_step=lambda *a, **k: None,
+            record_screenshot_before=lambda shot: None,
+            record_screenshot_after=lambda shot: None,
+            record_element_location=lambda **k: None,
+            complete_step=lambda *a, **k: None,
+        )
+        located_on = []
+
+        async def _locate(prompt, deep_think=False):
+            shot, _ = await agent._capture_ai_screenshot()
+            located_on.append(shot)
+            return LocateResultElement(
+                description=prompt,
+                center=(5, 5),
+                rect={"left": 0, "top": 0, "width": 10, "height": 10},
+            )
+
+        agent.ai_locate = _locate
+        assert await agent.ai_click("按钮", enable_scroll_retry=False) is True
+        assert located_on == ["shot-1"]
+        # 操作前 + 定位共用一帧,点击后的"操作后"截图重新截
+        assert state["shots"] == 2 and state["clicks"] == 1
+
+    async def test_ai_click_on_xpath_cache_hit_records_click_step(self, tmp_path):
+        # 命中 XPath 缓存: 定位不截图, 操作前截图在滚入视口之后才截,
+        # 元素位置 / 操作后截图 / 完成状态记回 click 步骤本身
+        from pymidscene.core.agent.task_cache import LocateCache, TaskCache
+        from pymidscene.core.dump import SessionRecorder
+
+        agent, state = make_agent()
+        agent.recorder = None
+        agent.session_recorder = SessionRecorder(base_dir=str(tmp_path), auto_save=False)
+        agent.task_cache = TaskCache(cache_id="hit", cache_dir=str(tmp_path), flush_delay=None)
+        agent.task_cache.append_cache(
+            LocateCache(type="locate", prompt="按钮", cache={"xpaths": ["/ok"]})
+        )
+        agent.task_cache = TaskCache(cache_id="hit", cache_dir=str(tmp_path))
+        events = []
+
+        async def _scroll(xpath, **kwargs):
+            events.append("scroll")
+            return True
+
+        async def _get(xpath):
+            return {"rect": {"left": 0, "top": 0, "width": 10, "height": 10}, "center": [5, 5]}
+
+        screenshot = agent.interface.screenshot
+
+        async def _screenshot():
+            events.append("shot")
+            return await screenshot()
+
+        agent.interface.screenshot = _screenshot
+        agent.interface.scroll_element_by_xpath_into_view = _scroll
+        agent.interface.get_element_by_xpath = _get
+
+        assert await agent.ai_click("按钮", enable_scroll_retry=False) is True
+        assert events == ["scroll", "shot", "shot"]
+        click_step = agent.session_recorder.steps[0]
+        assert click_step.action_type == "click" and click_step.status == "success"
+        assert click_step.screenshot_before == "shot-1"
+        assert click_step.screenshot_after == "shot-2"
+        assert click_step.element_center == [5, 5]
+
+    async def test_screenshot_and_size_are_fetched_concurrently(self):
+        import asyncio
+
+        agent, _ = make_agent()
+        inflight = {"now": 0, "max": 0}
+
+        def _tracked(result):
+            async def _call():
+                inflight["now"] += 1
+                inflight["max"] = max(inflight["max"], inflight["now"])
+                await asyncio.sleep(0.01)
+                inflight["now"] -= 1
+                return result
+            return _call
+
+        agent.interface.screenshot = _tracked("shot")
+        agent.interface.get_size = _tracked({"width": 100, "height": 100, "dpr": 1})
+        shot, size = await agent._capture_ai_screenshot()
+        assert shot == "shot" and size["width"] == 100
+        assert inflight["max"] == 2
+
+    async def test_cached_plan_replay_shares_frames_between_actions(self, tmp_path):
+        from pymidscene.core.dump import SessionRecorder
+
+        agent, state = make_agent()
+        agent.session_recorder = SessionRecorder(base_dir=str(tmp_path), auto_save=False)
+        actions = [{"type": "Sleep", "param": {"timeMs": 0}} for _ in range(3)]
+        agent._parse_cached_workflow = lambda _yaml: actions
+
+        async def _execute(action_type, param):
+            return True
+
+        agent._execute_planned_action = _execute
+
+        assert await agent._replay_cached_plan("tasks: []") is True
+        steps = agent.session_recorder.steps
+        # 1 张初始截图 + 每个动作后 1 张; 下一个动作的"操作前"复用上一张"操作后"
+        assert state["shots"] == 4
+        assert [s.screenshot_before for s in steps] == ["shot-1", "shot-2", "shot-3"]
+        assert [s.screenshot_after for s in steps] == ["shot-2", "shot-3", "shot-4"]
+
+    async def test_concurrent_blocks_keep_their_own_frames(self):
+        import asyncio
+
+        agent, state = make_agent()
+        first_frames = {}
+
+        async def _action(name, write):
+            async with agent.reuse_screenshot():
+                shot, _ = await agent._capture_ai_screenshot()
+                first_frames[name] = shot
+                await asyncio.sleep(0.01)
+                if write:
+                    await agent.interface.click(1, 2)
+                await asyncio.sleep(0.01)
+                return agent._current_reuse_scope().action_frame
+
+        a, b = await asyncio.gather(_action("a", True), _action("b", False))
+        # 各自的"操作前"帧是自己第一次截到的那张, 不被并发的另一块覆盖
+        assert a == first_frames["a"] and b == first_frames["b"]
+        assert first_frames["a"] != first_frames["b"]
+        # 另一块的点击让复用的帧作废; 两块都退出后 interface 还原
+        shot, _ = await agent._capture_ai_screenshot()
+        assert shot == "shot-3"
+        assert isinstance(agent.interface, SimpleNamespace)
+        assert agent._current_reuse_scope() is None
+
+    async def test_write_in_another_task_invalidates_frame(self):
+        import asyncio
+
+        agent, state = make_agent()
+        async with agent.reuse_screenshot():
+            await agent._capture_ai_screenshot()
+            await asyncio.gather(agent.interface.click(1, 2))
+            shot, _ = await agent._capture_ai_screenshot()
+        assert shot == "shot-2"
+
+    def _input_many_agent(self, tmp_path, hits):
+        from pymidscene.core.dump import SessionRecorder
+
+        agent, state = make_agent()
+        agent.recorder = None
+        agent.task_cache = None
+        agent.session_recorder = SessionRecorder(base_dir=str(tmp_path), auto_save=False)
+        inputs = []
+
+        async def _input_text(text, x, y, clear_first=True):
+            inputs.append(text)
+
+        async def _locate_many(prompts, screenshot_b64, size, use_memo=True):
+            return hits
+
+        agent.interface.input_text = _input_text
+        agent._locate_many = _locate_many
+        return agent, state, inputs
+
+    async def test_ai_input_many_chains_before_and_after_frames(self, tmp_path):
+        rect = {"left": 0, "top": 0, "width": 10, "height": 10}
+        agent, state, inputs = self._input_many_agent(
+            tmp_path, [(rect, (5, 5)), (rect, (5, 25))]
+        )
+        assert await agent.ai_input_many([("用户名", "admin"), ("密码", "123")]) is True
+        steps = agent.session_recorder.steps[-2:]
+        # 第二个字段的"操作前"是第一个字段的"操作后", 不是输入前的定位截图
+        assert [s.screenshot_before for s in steps] == ["shot-1", "shot-2"]
+        assert [s.screenshot_after for s in steps] == ["shot-2", "shot-3"]
+        assert state["shots"] == 3 and inputs == ["admin", "123"]
+
+    async def test_ai_input_many_fails_step_when_input_raises(self, tmp_path):
+        rect = {"left": 0, "top": 0, "width": 10, "height": 10}
+        agent, _, _ = self._input_many_agent(tmp_path, [(rect, (5, 5))])
+
+        async def _broken(text, x, y, clear_first=True):
+            raise RuntimeError("detached")
+
+        agent.interface.input_text = _broken
+        with pytest.raises(RuntimeError):
+            await agent.ai_input_many([("用户名", "admin")])
+        step = agent.session_recorder.steps[-1]
+        assert step.action_type == "input" and step.status == "failed"
+        assert isinstance(agent.interface, SimpleNamespace)
+
+    async def test_ai_input_many_caches_xpaths(self, tmp_path):
+        from pymidscene.core.agent.task_cache import TaskCache
+
+        rect = {"left": 0, "top": 0, "width": 10, "height": 10}
+        agent, _, _ = self._input_many_agent(
+            tmp_path, [(rect, (5, 5)), (rect, (5, 25))]
+        )
+        agent.task_cache = TaskCache(cache_id="many", cache_dir=str(tmp_path), flush_delay=None)
+
+        async def _xpath(x, y):
+            return f"/input[{y}]"
+
+        agent.interface.get_element_xpath = _xpath
+        await agent.ai_input_many([("用户名", "admin"), ("密码", "123")])
+        cached = {c.prompt: c.cache["xpaths"] for c in agent.task_cache.cache.caches}
+        assert cached == {"用户名": ["/input[5]"], "密码": ["/input[25]"]}
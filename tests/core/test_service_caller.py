@@ -52,6 +52,14 @@ def test_safe_parse_json_with_repair_normalizes_repaired_json() -> None:
     }
 
 
+def test_safe_parse_json_with_repair_fast_path_keeps_point_precedence() -> None:
+    assert service_caller.safe_parse_json_with_repair(' {"bbox": [1, 2, 3, 4]}\n') == {
+        "bbox": [1, 2, 3, 4]
+    }
+    # 与完整路径一致: 文本里有 (x,y) 时点坐标优先
+    assert service_caller.safe_parse_json_with_repair('{"point": "(10,20)"}') == [10, 20]
+
+
 def test_safe_parse_json_with_repair_raises_on_invalid_json(monkeypatch: Any) -> None:
     monkeypatch.setattr(service_caller, "repair_json", lambda _value: "still invalid json")
 
@@ -125,3 +133,198 @@ def test_call_ai_applies_qwen_high_resolution_by_model_family(monkeypatch: Any)
     assert fake_client.chat.completions.calls[0]["extra_body"] == {
         "vl_high_resolution_images": True,
     }
+
+
+def test_create_chat_client_reuses_client_per_connection_settings() -> None:
+    config = ModelConfig(model_name="a", base_url="https://example.com/v1", api_key="k")
+    same = ModelConfig(model_name="b", base_url="https://example.com/v1", api_key="k")
+    other = ModelConfig(model_name="a", base_url="https://example.com/v1", api_key="k2")
+
+    client = service_caller.create_chat_client(config)
+    assert service_caller.create_chat_client(same) is client
+    assert service_caller.create_chat_client(other) is not client
+
+
+def test_chat_client_cache_evicts_and_closes_least_recently_used(monkeypatch: Any) -> None:
+    from collections import OrderedDict
+
+    monkeypatch.setattr(service_caller, "_chat_clients", OrderedDict())
+    monkeypatch.setattr(service_caller, "CHAT_CLIENT_CACHE_SIZE", 2)
+    configs = [
+        ModelConfig(model_name="m", base_url="https://example.com/v1", api_key=f"k{i}")
+        for i in range(3)
+    ]
+
+    first = service_caller.create_chat_client(configs[0])
+    second = service_caller.create_chat_client(configs[1])
+    assert service_caller.create_chat_client(configs[0]) is first  # 刷新为最近使用
+    third = service_caller.create_chat_client(configs[2])
+
+    assert second.is_closed()
+    assert not first.is_closed() and not third.is_closed()
+    assert len(service_caller._chat_clients) == 2
+
+    service_caller.close_chat_clients()
+    assert first.is_closed() and third.is_closed()
+    assert not service_caller._chat_clients
+    assert service_caller.create_chat_client(configs[0]) is not first
+    service_caller.close_chat_clients()
+
+
+def test_call_ai_async_runs_off_the_event_loop(monkeypatch: Any) -> None:
+    import asyncio
+    import threading
+
+    threads = []
+    fake_client = _FakeOpenAIClient(_make_response(content='{"result": "ok"}'))
+
+    def _create(_config: Any) -> Any:
+        threads.append(threading.current_thread())
+        return fake_client
+
+    monkeypatch.setattr(service_caller, "create_chat_client", _create)
+
+    result = asyncio.run(
+        service_caller.call_ai_async(
+            messages=[{"role": "user", "content": "hello"}],
+            model_config=ModelConfig(model_name="test-model", retry_count=0),
+        )
+    )
+    assert result["content"] == '{"result": "ok"}'
+    assert threads[0] is not threading.main_thread()
+
+
+def test_call_ai_batch_limits_concurrency_and_keeps_order(monkeypatch: Any) -> None:
+    import asyncio
+    import threading
+    import time
+
+    lock = threading.Lock()
+    in_flight = [0]
+    peak = [0]
+
+    class _SlowCompletions:
+        def create(self, **kwargs: Any) -> Any:
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.02)
+            with lock:
+                in_flight[0] -= 1
+            return _make_response(content=kwargs["messages"][0]["content"])
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=_SlowCompletions()))
+    monkeypatch.setattr(service_caller, "create_chat_client", lambda _config: fake_client)
+
+    results = asyncio.run(
+        service_caller.call_ai_batch(
+            [[{"role": "user", "content": str(i)}] for i in range(6)],
+            ModelConfig(model_name="test-model", retry_count=0),
+            concurrency=2,
+        )
+    )
+    assert [r["content"] for r in results] == [str(i) for i in range(6)]
+    assert peak[0] <= 2
+
+
+def test_submit_and_fetch_batch_round_trip(monkeypatch: Any) -> None:
+    import json
+
+    uploaded: dict[str, Any] = {}
+    output = "\n".join(
+        json.dumps(record)
+        for record in [
+            {
+                "custom_id": "request-1",
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "b"}}]}},
+                "error": None,
+            },
+            {
+                "custom_id": "request-0",
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": "a"}}], "usage": {"total_tokens": 3}}},
+                "error": None,
+            },
+        ]
+    )
+    statuses = ["in_progress", "completed"]
+
+    class _Files:
+        def create(self, file: Any, purpose: str) -> Any:
+            uploaded["jsonl"], uploaded["purpose"] = file[1].decode("utf-8"), purpose
+            return SimpleNamespace(id="file-in")
+
+        def content(self, file_id: str) -> Any:
+            return SimpleNamespace(text=output)
+
+    class _Batches:
+        def create(self, **kwargs: Any) -> Any:
+            uploaded["batch"] = kwargs
+            return SimpleNamespace(id="batch-1")
+
+        def retrieve(self, batch_id: str) -> Any:
+            return SimpleNamespace(
+                status=statuses.pop(0),
+                errors=None,
+                output_file_id="file-out",
+                error_file_id=None,
+                request_counts=SimpleNamespace(total=3),
+            )
+
+    fake_client = SimpleNamespace(files=_Files(), batches=_Batches())
+    monkeypatch.setattr(service_caller, "create_chat_client", lambda _config: fake_client)
+    config = ModelConfig(model_name="test-model", model_family="qwen2.5-vl")
+
+    batch_id = service_caller.submit_batch(
+        [[{"role": "user", "content": "x"}], [{"role": "user", "content": "y"}]], config
+    )
+    lines = [json.loads(line) for line in uploaded["jsonl"].splitlines()]
+    assert batch_id == "batch-1" and uploaded["purpose"] == "batch"
+    assert [line["custom_id"] for line in lines] == ["request-0", "request-1"]
+    assert lines[0]["url"] == uploaded["batch"]["endpoint"] == "/v1/chat/completions"
+    assert lines[0]["body"]["vl_high_resolution_images"] is True
+    assert "extra_body" not in lines[0]["body"]
+
+    results = service_caller.fetch_batch(batch_id, config, poll_interval=0)
+    assert [r["content"] for r in results] == ["a", "b", None]
+    assert results[0]["usage"] == {"total_tokens": 3}
+    assert results[2]["error"] == "missing from batch output"
+
+
+def test_call_ai_does_not_retry_client_errors(monkeypatch: Any) -> None:
+    import httpx
+    import openai
+
+    request = httpx.Request("POST", "https://example.com/v1/chat/completions")
+    errors = [
+        openai.AuthenticationError(
+            "bad key", response=httpx.Response(401, request=request), body=None
+        ),
+        openai.InternalServerError(
+            "busy", response=httpx.Response(503, request=request), body=None
+        ),
+    ]
+    calls: list[Any] = []
+
+    class _FailingCompletions:
+        def create(self, **kwargs: Any) -> Any:
+            calls.append(kwargs)
+            raise errors[0]
+
+    fake_client = SimpleNamespace(chat=SimpleNamespace(completions=_FailingCompletions()))
+    monkeypatch.setattr(service_caller, "create_chat_client", lambda _config: fake_client)
+    sleeps: list[float] = []
+    monkeypatch.setattr(service_caller.time, "sleep", sleeps.append)
+    config = ModelConfig(model_name="test-model", retry_count=2, retry_interval=10)
+
+    for expected_calls in (1, 3):
+        calls.clear()
+        sleeps.clear()
+        try:
+            service_caller.call_ai([{"role": "user", "content": "hi"}], config)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("Expected RuntimeError")
+        assert len(calls) == expected_calls
+        assert len(sleeps) == expected_calls - 1
+        errors.pop(0)
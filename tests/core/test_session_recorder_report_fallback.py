@@ -88,3 +88,30 @@ def test_save_report_raises_only_when_python_native_fallback_also_fails(
 
     assert "Official-style report save failed" in caplog.text
     assert "official template save exploded" in caplog.text
+
+
+def test_element_markers_are_drawn_when_building_the_report(tmp_path: Path):
+    import base64
+    import io
+
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 64), "white").save(buffer, format="PNG")
+    png_b64 = base64.b64encode(buffer.getvalue()).decode()
+
+    recorder = SessionRecorder(base_dir=str(tmp_path), auto_save=False)
+    recorder.start_step("locate", "Checkout button")
+    recorder.record_screenshot_before(png_b64)
+    recorder.record_element_location((4, 4, 20, 20), (12, 12), "Checkout button")
+    step = recorder.current_step
+    recorder.complete_step()
+
+    # 定位时不画, 构建报告时才画
+    assert step.screenshot_marked is None
+    session = recorder._build_report_session()
+    assert session.steps[0].screenshot_marked
+    assert session.steps[0].screenshot_marked != png_b64
+    # 标记图与截图同为 JPEG(整屏 PNG 编码慢一个数量级)
+    marked = base64.b64decode(session.steps[0].screenshot_marked)
+    assert Image.open(io.BytesIO(marked)).format == "JPEG"
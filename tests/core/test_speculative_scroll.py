@@ -0,0 +1,150 @@
+"""
+ai_locate_with_scroll_retry 投机式滚动定位测试: 多屏并发定位, 取最靠前的命中并滚回该屏.
+"""
+
+from __future__ import annotations
+
+import base64
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from pymidscene.core.agent.agent import Agent
+
+
+def _white_png_b64(width: int, height: int) -> str:
+    img = Image.new("RGB", (width, height), (255, 255, 255))
+    buf = BytesIO()
+    img.save(buf, format="PNG")
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+def _make_locate_agent(model_family: str, responses: list):
+    agent = object.__new__(Agent)
+    agent.session_recorder = None
+    agent.recorder = None
+    agent.task_cache = None
+    agent.interface = SimpleNamespace()
+    state = {"i": 0, "calls": []}
+    img_b64 = _white_png_b64(2000, 2000)
+
+    async def _shot():
+        return img_b64, {"width": 2000, "height": 2000, "dpr": 1}
+
+    async def _call(messages, intent):
+        state["calls"].append(messages)
+        i = state["i"]
+        state["i"] += 1
+        return {"content": responses[i], "usage": None}
+
+    agent._capture_ai_screenshot = _shot
+    agent._call_ai_with_config_async = _call
+    agent._get_model_config = lambda intent: SimpleNamespace(
+        model_name="m", model_family=model_family
+    )
+    agent._resolve_model_family = lambda config: model_family
+    return agent, state
+
+
+def _no_sleep(real_sleep):
+    async def _sleep(delay, *args, **kwargs):
+        # 保留短暂让出(测试里的 0.02s),跳过滚动等待的 0.5s
+        return await real_sleep(delay if delay < 0.1 else 0, *args, **kwargs)
+    return _sleep
+
+
+@pytest.mark.asyncio
+async def test_speculative_scroll_locate_returns_earliest_hit_and_scrolls_back(monkeypatch):
+    import asyncio as _asyncio
+
+    agent, _ = _make_locate_agent("glm-4v", [])
+    page = {"y": 0, "scripts": []}
+
+    async def _scroll(direction, distance):
+        page["y"] += distance if direction == "down" else -distance
+
+    async def _evaluate(script):
+        page["scripts"].append(script)
+        if script == "window.scrollY":
+            return page["y"]
+        page["y"] = 500  # window.scrollTo(window.scrollX, 500)
+
+    async def _shot():
+        return f"frame@{page['y']}", {"width": 100, "height": 100, "dpr": 1}
+
+    async def _locate(prompt, image_b64, *args, **kwargs):
+        if image_b64 == "frame@500":
+            await _asyncio.sleep(0.02)  # 更靠前的一屏更慢返回,仍应优先采用
+            return {"left": 1, "top": 2, "width": 3, "height": 4}, (2.5, 4.0)
+        if image_b64 == "frame@1000":
+            return {"left": 9, "top": 9, "width": 1, "height": 1}, (9.5, 9.5)
+        return None
+
+    monkeypatch.setattr(_asyncio, "sleep", _no_sleep(_asyncio.sleep))
+    agent.interface = SimpleNamespace(scroll=_scroll, evaluate_javascript=_evaluate)
+    agent._capture_ai_screenshot = _shot
+    agent._locate_element_in_image = _locate
+
+    element = await agent._speculative_scroll_locate("目标", 3, 500)
+    assert element.center == (2.5, 4.0)
+    assert page["y"] == 500
+    assert page["scripts"][-1] == "window.scrollTo(window.scrollX, 500.0)"
+
+
+@pytest.mark.asyncio
+async def test_speculative_scroll_locate_honours_deep_think_and_caches_hit(
+    monkeypatch, tmp_path
+):
+    import asyncio as _asyncio
+
+    from pymidscene.core.agent.task_cache import LocateMemo, TaskCache
+
+    agent, _ = _make_locate_agent("glm-4v", [])
+    agent.locate_memo = LocateMemo(maxsize=8)
+    agent.task_cache = TaskCache(cache_id="spec", cache_dir=str(tmp_path), flush_delay=None)
+    page = {"y": 0}
+
+    async def _scroll(direction, distance):
+        page["y"] += distance if direction == "down" else -distance
+
+    async def _evaluate(script):
+        if script == "window.scrollY":
+            return page["y"]
+        page["y"] = 500
+
+    async def _xpath(x, y):
+        return f"/target@{page['y']}"
+
+    async def _shot():
+        return f"frame@{page['y']}", {"width": 100, "height": 100, "dpr": 1}
+
+    sections = []
+
+    async def _section(prompt, image_b64, *args):
+        sections.append(image_b64)
+        return None  # section 失败时回退到全图定位
+
+    async def _locate(prompt, image_b64, *args, **kwargs):
+        if image_b64 == "frame@500":
+            return {"left": 1, "top": 2, "width": 3, "height": 4}, (2.5, 4.0)
+        return None
+
+    monkeypatch.setattr(_asyncio, "sleep", _no_sleep(_asyncio.sleep))
+    agent.interface = SimpleNamespace(
+        scroll=_scroll, evaluate_javascript=_evaluate, get_element_xpath=_xpath
+    )
+    agent._capture_ai_screenshot = _shot
+    agent._locate_section = _section
+    agent._locate_element_in_image = _locate
+
+    element = await agent._speculative_scroll_locate("目标", 2, 500, deep_think=True)
+    assert element.center == (2.5, 4.0)
+    # 每屏都按 deepThink 先走 section 粗定位
+    assert sorted(sections) == ["frame@1000", "frame@500"]
+    # 命中屏写回 memo(deepThink 键), XPath 在滚回该屏后取
+    key = LocateMemo.make_key("目标", "frame@500", True)
+    assert agent.locate_memo.get(key) is not None
+    cached = [c.cache["xpaths"] for c in agent.task_cache.cache.caches]
+    assert cached == [["/target@500"]]
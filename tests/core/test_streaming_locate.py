@@ -0,0 +1,54 @@
+"""
+stream_locate: 流式响应里 bbox 一完整就断开, 不等模型写完解释文字.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import httpx
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.shared.env import ModelConfig
+
+
+def _bare_agent() -> Agent:
+    agent = object.__new__(Agent)
+    agent._http_client_lock = threading.Lock()  # __init__ 里按实例创建
+    return agent
+
+
+def test_streaming_locate_stops_once_bbox_is_complete():
+    import json
+
+    from pymidscene.core.agent.agent import _BBOX_COMPLETE_RE, _response_stop_pattern
+
+    requests: list = []
+    pieces = ['```json\n{"bb', 'ox": [10, 20,', ' 30, 40], "errors": []}', "\n```\nThe button is..."]
+    stream = "".join(
+        f"data: {json.dumps({'choices': [{'delta': {'content': p}}]})}\n\n" for p in pieces
+    ) + "data: [DONE]\n\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, headers={"content-type": "text/event-stream"}, content=stream.encode()
+        )
+
+    agent = _bare_agent()
+    agent._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    config = ModelConfig(
+        model_name="m",
+        openai_base_url="https://example.com/v1",
+        openai_api_key="k",
+    )
+
+    token = _response_stop_pattern.set(_BBOX_COMPLETE_RE)
+    try:
+        result = agent._call_with_httpx(config, [{"role": "user", "content": "find"}])
+    finally:
+        _response_stop_pattern.reset(token)
+
+    assert json.loads(requests[0].content)["stream"] is True
+    assert json.loads(result["content"]) == {"bbox": [10, 20, 30, 40]}
+    assert result["usage"] is None
@@ -0,0 +1,56 @@
+"""
+结构化输出: aiAssert 等调用经 OpenAI 兼容协议下发 response_format.
+"""
+
+from __future__ import annotations
+
+import threading
+
+import httpx
+
+from pymidscene.core.agent.agent import Agent
+from pymidscene.shared.env import ModelConfig
+
+
+def _bare_agent() -> Agent:
+    agent = object.__new__(Agent)
+    agent._http_client_lock = threading.Lock()  # __init__ 里按实例创建
+    return agent
+
+
+def _make_agent(requests: list) -> Agent:
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        return httpx.Response(
+            200, json={"choices": [{"message": {"content": "ok"}}]}
+        )
+
+    agent = _bare_agent()
+    agent._http_client = httpx.Client(transport=httpx.MockTransport(handler))
+    return agent
+
+
+def test_structured_output_sends_response_format():
+    import json
+
+    from pymidscene.core.agent.agent import _ASSERT_RESPONSE_FORMAT, _response_format
+
+    requests: list = []
+    agent = _make_agent(requests)
+    config = ModelConfig(
+        model_name="m",
+        openai_base_url="https://example.com/v1",
+        openai_api_key="k",
+    )
+
+    agent._call_with_httpx(config, [{"role": "user", "content": "hi"}])
+    token = _response_format.set(_ASSERT_RESPONSE_FORMAT)
+    try:
+        agent._call_with_httpx(config, [{"role": "user", "content": "hi"}])
+    finally:
+        _response_format.reset(token)
+
+    assert "response_format" not in json.loads(requests[0].content)
+    sent = json.loads(requests[1].content)["response_format"]
+    assert sent["type"] == "json_schema"
+    assert sent["json_schema"]["schema"]["required"] == ["pass", "thought"]
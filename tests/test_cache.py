@@ -11,6 +11,7 @@ from pymidscene.core.agent.task_cache import (
     TaskCache,
     PlanningCache,
     LocateCache,
+    LocateMemo,
 )
 
 
@@ -265,6 +266,28 @@ def test_write_only_multiple_appends_do_not_duplicate(temp_cache_dir):
     assert prompts == ["a", "b", "c"]
 
 
+@pytest.mark.asyncio
+async def test_appends_in_event_loop_are_coalesced_into_background_write(temp_cache_dir):
+    """事件循环里的 append 不同步写盘, 合并后由 flush() 在工作线程里一次写出"""
+    cache = TaskCache(
+        cache_id="test_write_behind",
+        cache_dir=temp_cache_dir,
+        strategy="write-only",
+    )
+    for prompt in ("a", "b"):
+        cache.append_cache(PlanningCache(
+            type="plan", prompt=prompt, yaml_workflow=prompt
+        ))
+    assert not cache.cache_file_path.exists()
+
+    await cache.flush()
+    cache.append_cache(PlanningCache(type="plan", prompt="c", yaml_workflow="c"))
+    cache.flush_pending()
+
+    reloaded = TaskCache(cache_id="test_write_behind", cache_dir=temp_cache_dir)
+    assert [c.prompt for c in reloaded.cache.caches] == ["a", "b", "c"]
+
+
 def test_cache_stats(temp_cache_dir):
     """测试缓存统计"""
     cache = TaskCache(
@@ -329,3 +352,128 @@ def test_cache_reuse_prevention(temp_cache_dir):
     # 第三次匹配应该没有结果
     result3 = cache2.match_plan_cache("相同 prompt")
     assert result3 is None
+
+
+def test_match_index_keys_on_type_and_normalized_prompt(temp_cache_dir):
+    """索引按 (type, prompt) 命中: 结构化 prompt 与键顺序无关, 类型互不串用"""
+    cache = TaskCache(cache_id="test_index", cache_dir=temp_cache_dir)
+    cache.append_cache(LocateCache(
+        type="locate", prompt={"prompt": "搜索框", "deepThink": True}, cache={"xpaths": ["//input"]}
+    ))
+    cache.append_cache(PlanningCache(type="plan", prompt="搜索框", yaml_workflow="flow"))
+
+    cache2 = TaskCache(cache_id="test_index", cache_dir=temp_cache_dir)
+    assert cache2.match_locate_cache("搜索框") is None
+    hit = cache2.match_locate_cache({"deepThink": True, "prompt": "搜索框"})
+    assert hit is not None and hit.cache_content.cache == {"xpaths": ["//input"]}
+    assert cache2.match_plan_cache("搜索框").cache_content.yaml_workflow == "flow"
+    assert cache2.matched_cache_indices == {0, 1}
+
+
+@pytest.mark.parametrize("has_orjson", [True, False])
+def test_prompt_key_is_order_independent(monkeypatch, has_orjson):
+    from pymidscene.core.agent import task_cache
+
+    if has_orjson and not task_cache.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(task_cache, "HAS_ORJSON", has_orjson)
+    assert task_cache._prompt_key("登录") == "登录"
+    assert task_cache._prompt_key({"b": 1, "a": "登录"}) == task_cache._prompt_key(
+        {"a": "登录", "b": 1}
+    )
+
+
+def test_cache_file_is_replaced_atomically(temp_cache_dir, monkeypatch):
+    """写到一半失败时原缓存文件保持完整, 也不留下临时文件"""
+    import os
+    from pathlib import Path
+
+    cache = TaskCache(cache_id="test_atomic", cache_dir=temp_cache_dir)
+    cache.append_cache(PlanningCache(type="plan", prompt="第一条", yaml_workflow="a"))
+    before = cache.cache_file_path.read_bytes()
+
+    def _fail(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, "replace", _fail)
+    cache.append_cache(PlanningCache(type="plan", prompt="第二条", yaml_workflow="b"))
+    assert cache.cache_file_path.read_bytes() == before
+    assert [p.name for p in Path(temp_cache_dir).iterdir()] == [cache.cache_file_path.name]
+
+
+def test_locate_memo_lru_eviction():
+    """定位 LRU 超出容量时淘汰最久未使用的记录"""
+    memo = LocateMemo(maxsize=2)
+    rect = {"left": 0, "top": 0, "width": 10, "height": 10}
+    memo.put("a", rect, (5, 5))
+    memo.put("b", rect, (5, 5))
+    assert memo.get("a") is not None  # a 变为最近使用
+    memo.put("c", rect, (5, 5))
+    assert memo.get("b") is None
+    assert memo.get("a") is not None and memo.get("c") is not None
+    assert memo.get_stats()["hits"] == 3
+
+
+def test_locate_memo_key_depends_on_screenshot():
+    k1 = LocateMemo.make_key("登录按钮", "AAAA")
+    k2 = LocateMemo.make_key("登录按钮", "BBBB")
+    k3 = LocateMemo.make_key("登录按钮", "AAAA", deep_think=True)
+    assert len({k1, k2, k3}) == 3
+
+
+def test_locate_memo_key_falls_back_to_sha1_without_xxhash(monkeypatch):
+    import hashlib
+
+    from pymidscene.core.agent import task_cache
+
+    monkeypatch.setattr(task_cache, "HAS_XXHASH", False)
+    monkeypatch.setattr(task_cache, "_last_frame_digest", None)
+    key = LocateMemo.make_key("登录按钮", "CCCC")
+    assert key.startswith(hashlib.sha1(b"CCCC").hexdigest() + ":0:")
+
+
+def test_frame_digest_keeps_only_the_last_frame(monkeypatch):
+    from pymidscene.core.agent import task_cache
+
+    monkeypatch.setattr(task_cache, "_last_frame_digest", None)
+    first, second = "A" * 64, "B" * 64
+    digest = task_cache._frame_digest(first)
+    assert task_cache._frame_digest(first) == digest
+    task_cache._frame_digest(second)
+    assert task_cache._last_frame_digest[0] is second
+    assert task_cache._frame_digest(first) == digest
+
+
+def test_locate_memo_persists_under_cache_dir(temp_cache_dir):
+    """配了 cache_id 时定位 LRU 落盘, 跨运行复用"""
+    cache = TaskCache(cache_id="memo_case", cache_dir=temp_cache_dir)
+    key = LocateMemo.make_key("搜索框", "AAAA")
+
+    memo = LocateMemo(persist_path=cache.locate_memo_path)
+    memo.put(key, {"left": 1, "top": 2, "width": 3, "height": 4}, (2.5, 4.0))
+    memo.save()
+    assert cache.locate_memo_path.exists()
+
+    reloaded = LocateMemo(persist_path=cache.locate_memo_path)
+    rect, center = reloaded.get(key)
+    assert rect["width"] == 3 and center == (2.5, 4.0)
+
+
+def test_locate_memo_read_only_does_not_write(temp_cache_dir):
+    path = Path(temp_cache_dir) / "ro.locate-memo.json"
+    memo = LocateMemo(persist_path=path, read_only=True)
+    memo.put("k", {"left": 0, "top": 0, "width": 1, "height": 1}, (0, 0))
+    memo.save()
+    assert not path.exists()
+
+
+def test_locate_memo_reads_legacy_file_of_other_format(temp_cache_dir):
+    """msgpack 装上 / 卸载后, 仍能读到另一种格式写下的旧 memo"""
+    legacy = Path(temp_cache_dir) / "case.locate-memo.json"
+    legacy.write_text(
+        '{"entries": {"k": {"rect": {"left": 0, "top": 0, "width": 1, "height": 1}, '
+        '"center": [0, 0]}}}',
+        encoding="utf-8",
+    )
+    memo = LocateMemo(persist_path=legacy.with_suffix(".mpk"))
+    assert memo.get("k") is not None
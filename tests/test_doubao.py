@@ -42,6 +42,21 @@ class TestDoubaoVisionModel:
             assert model.base_url == "https://env.api.com"
             assert model.endpoint_id == "ep-env123"
 
+    def test_instances_share_client_per_endpoint(self):
+        """测试相同 api_key/base_url 的实例复用同一个客户端"""
+        first = DoubaoVisionModel(
+            api_key="share-key", base_url="https://share.api.com", endpoint_id="ep-a"
+        )
+        second = DoubaoVisionModel(
+            api_key="share-key", base_url="https://share.api.com", endpoint_id="ep-b"
+        )
+        other = DoubaoVisionModel(
+            api_key="other-key", base_url="https://share.api.com", endpoint_id="ep-a"
+        )
+
+        assert first.client is second.client
+        assert other.client is not first.client
+
     def test_missing_api_key(self):
         """测试缺少 API 密钥"""
         with patch.dict('os.environ', {}, clear=True):
@@ -218,7 +233,7 @@ class TestModelFamily:
 class TestDeepThinkMapping:
     """测试深度思考参数映射"""
 
-    @patch('pymidscene.core.ai_model.models.doubao.OpenAI')
+    @patch('pymidscene.core.ai_model.models.doubao.create_chat_client')
     def test_deep_think_enabled(self, mock_openai_class):
         """测试深度思考启用"""
         # Mock OpenAI client
@@ -250,7 +265,7 @@ class TestDeepThinkMapping:
             assert 'extra_body' in call_args[1]
             assert call_args[1]['extra_body']['config']['thinking']['type'] == 'enabled'
 
-    @patch('pymidscene.core.ai_model.models.doubao.OpenAI')
+    @patch('pymidscene.core.ai_model.models.doubao.create_chat_client')
     def test_deep_think_disabled(self, mock_openai_class):
         """测试深度思考禁用"""
         mock_client = MagicMock()
@@ -29,3 +29,42 @@ def test_logger_set_level():
     logger.set_level("INFO")
     logger.set_level("WARNING")
     logger.set_level("ERROR")
+
+
+def test_log_manager_skips_extra_serialization_when_level_filtered(tmp_path, monkeypatch):
+    """级别被过滤时不序列化 kwargs"""
+    import json
+    import logging
+    from pymidscene.core import logging_system
+
+    dumped = []
+    real_dumps = json.dumps
+
+    def _counting_dumps(obj, **kwargs):
+        dumped.append(obj)
+        return real_dumps(obj, **kwargs)
+
+    monkeypatch.setattr(logging_system.json, "dumps", _counting_dumps)
+    manager = logging_system.MidsceneLogManager(log_dir=tmp_path)
+    try:
+        manager.get_logger("agent").setLevel(logging.INFO)
+        manager.log("agent", "hidden", level="debug", payload="x" * 1000)
+        manager.log("agent", "shown", level="info", step=1)
+    finally:
+        manager.close()
+
+    assert dumped == [{"step": 1}]
+    content = (tmp_path / "agent.log").read_text(encoding="utf-8")
+    assert "hidden" not in content
+    assert "shown" in content and '"step": 1' in content
+
+
+def test_midscene_formatter_uses_record_time():
+    import logging
+    from pymidscene.core.logging_system import MidsceneFormatter
+
+    record = logging.LogRecord("x", logging.INFO, __file__, 1, "hello %s", ("world",), None)
+    record.created = 0.0
+    formatted = MidsceneFormatter().format(record)
+    assert formatted.endswith("] hello world")
+    assert "1970-01-01" in formatted or "1969-12-31" in formatted
@@ -49,3 +49,5 @@ def test_locate_result_element():
     assert element.description == "登录按钮"
     assert element.center == (100.0, 200.0)
     assert element.rect["width"] == 100.0
+    assert element.bbox_int == (50, 175, 150, 225)
+    assert element.center_int == (100, 200)
@@ -2,11 +2,20 @@
 测试工具函数
 """
 
+from pathlib import Path
+
+import pytest
+
+from pymidscene.shared import utils
 from pymidscene.shared.utils import (
     calculate_hash,
+    dumps_json,
+    write_json_file,
     safe_parse_json,
     extract_json_from_code_block,
+    fast_extract_json,
     get_screenshot_scale,
+    get_image_size_base64,
     format_bbox,
     calculate_center,
 )
@@ -56,6 +65,22 @@ def test_extract_json_from_code_block():
     assert result.strip() == '{"key": "value"}'
 
 
+def test_fast_extract_json():
+    """一次扫描解析第一个 JSON 值, 忽略代码块标记与尾随说明"""
+    fenced = 'Sure:\n```json\n{"bbox": [1, 2, 3, 4]}\n```\nIt is the {blue} button.'
+    assert fast_extract_json(fenced) == {"bbox": [1, 2, 3, 4]}
+    assert fast_extract_json('[{"a": 1}, {"b": 2}]') == [{"a": 1}, {"b": 2}]
+    # 整段解析失败(尾随说明)时仍能取出第一个值
+    assert fast_extract_json('{"a": 1}\nDone.') == {"a": 1}
+    # 第一个括号处不是合法 JSON 时回落到代码块提取
+    assert fast_extract_json('see [the button]\n```json\n{"ok": true}\n```') == {"ok": True}
+    assert fast_extract_json("no json here") is None
+    # 前文里的括号不能抢在代码块里的 JSON 前面
+    prose = 'I pick element [3]:\n```json\n{"bbox":[1,2,3,4]}\n```'
+    assert fast_extract_json(prose) == {"bbox": [1, 2, 3, 4]}
+    assert fast_extract_json(prose) == safe_parse_json(extract_json_from_code_block(prose))
+
+
 def test_get_screenshot_scale():
     """测试截图缩放比例计算"""
     scale = get_screenshot_scale(1920.0, 1920.0)
@@ -68,6 +93,29 @@ def test_get_screenshot_scale():
     assert scale == 0.5
 
 
+def test_get_image_size_base64_reads_header_only(monkeypatch):
+    import base64
+    import os
+    from io import BytesIO
+
+    from PIL import Image
+
+    buffer = BytesIO()
+    # 随机像素: PNG 压缩不掉, base64 远超文件头那一段
+    Image.frombytes("RGB", (300, 200), os.urandom(300 * 200 * 3)).save(buffer, "PNG")
+    b64 = base64.b64encode(buffer.getvalue()).decode()
+    assert len(b64) > utils._IMAGE_HEADER_B64_CHARS
+
+    decoded: list = []
+    real_decode = base64.b64decode
+    monkeypatch.setattr(
+        base64, "b64decode", lambda s: decoded.append(len(s)) or real_decode(s)
+    )
+    assert get_image_size_base64(b64) == (300, 200)
+    assert get_image_size_base64(f"data:image/png;base64,{b64}") == (300, 200)
+    assert decoded == [utils._IMAGE_HEADER_B64_CHARS] * 2
+
+
 def test_format_bbox():
     """测试 bbox 格式化"""
     bbox = (10, 20, 100, 50)
@@ -90,3 +138,21 @@ def test_calculate_center():
     center = calculate_center(rect)
 
     assert center == (60.0, 45.0)  # (10 + 100/2, 20 + 50/2)
+
+
+@pytest.mark.parametrize("has_orjson", [True, False])
+def test_dumps_json_matches_stdlib_layout(monkeypatch, has_orjson):
+    """orjson 与标准库回落输出一致(紧凑 / 2 空格缩进, 非 ASCII 原样)"""
+    if has_orjson and not utils.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(utils, "HAS_ORJSON", has_orjson)
+    data = {"name": "登录按钮", "rect": [1, 2.5], "path": Path("a/b"), "ok": True}
+
+    assert dumps_json(data) == '{"name":"登录按钮","rect":[1,2.5],"path":"a/b","ok":true}'
+    assert dumps_json({"a": [1]}, indent=True) == '{\n  "a": [\n    1\n  ]\n}'
+
+
+def test_write_json_file_round_trips(tmp_path):
+    target = tmp_path / "dump.json"
+    write_json_file(target, {"步骤": 1})
+    assert safe_parse_json(target.read_text(encoding="utf-8")) == {"步骤": 1}